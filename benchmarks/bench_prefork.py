@@ -0,0 +1,121 @@
+"""Measure badge throughput as the number of pre-forked serving processes grows.
+
+Usage: python benchmarks/bench_prefork.py [--processes 1,2,4] [--clients 8] [--seconds 3]
+
+Each case starts `python -m service.server` with `SERVER_PROCESSES=N` against a
+temporary `STATE_DIR` holding one promoted release, then runs client processes
+that request `/all.svg` in a loop. Clients share the host's cores with the
+server, so compare cases run on the same machine rather than absolute numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "tests"))
+
+from service_helpers import citation_payload, promote_payload  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _client(port: int, path: str, seconds: float) -> tuple[int, int]:
+    completed = 0
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                completed += 1
+            else:
+                errors += 1
+        except OSError:
+            errors += 1
+        finally:
+            connection.close()
+    return completed, errors
+
+
+def _wait_until_serving(port: int) -> None:
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("service did not start")
+
+
+def run_case(processes: int, clients: int, seconds: float) -> tuple[float, int]:
+    state_dir = tempfile.mkdtemp(prefix="citation-badge-prefork-bench-")
+    promote_payload(state_dir, citation_payload())
+    port = _free_port()
+    env = dict(
+        os.environ,
+        APP_HOST="127.0.0.1",
+        APP_PORT=str(port),
+        STATE_DIR=state_dir,
+        REFRESH_ON_STARTUP="0",
+        SERVER_PROCESSES=str(processes),
+        RATE_LIMIT_PER_SECOND="0",
+        MAX_INFLIGHT_REQUESTS="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "service.server"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_serving(port)
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.starmap(
+                _client, [(port, "/all.svg", seconds)] * clients
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    completed = sum(result[0] for result in results)
+    errors = sum(result[1] for result in results)
+    return completed / seconds, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", default="1,2,4")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} clients={args.clients} seconds={args.seconds}")
+    print(f"{'processes':>10} {'req/s':>10} {'errors':>8}")
+    for processes in (int(value) for value in args.processes.split(",")):
+        throughput, errors = run_case(processes, args.clients, args.seconds)
+        print(f"{processes:>10} {throughput:>10.0f} {errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare promotion paths: full `copytree`, object store, and rename.
+
+Usage: python benchmarks/bench_promotion.py [--publications 1000 5000] [--changed 50]
+
+Promotes a synthetic release, then a second one where only `--changed`
+badges (plus `citation.json`) differ. `legacy` copies the whole staged
+`dist/` into the release like promotion did before the object store;
+`finalized` is `promote_release`, which renames the staged `dist/` and
+deduplicates it before switching; `deferred` is the refresh runtime's
+`promote_release(finalize=False)`, which switches right after the rename
+and leaves deduplication to a background thread. For the second promotion it
+reports the time until `current` switched and the disk space added to
+`STATE_DIR` (for `deferred`, before the background step).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.promote import promote_release  # noqa: E402
+
+
+def _write_staged_run(parent_dir: str, publications: int, changed: int, generation: int) -> str:
+    staged_run_dir = tempfile.mkdtemp(dir=parent_dir, prefix=".staged-refresh-")
+    dist_dir = os.path.join(staged_run_dir, "dist")
+    os.makedirs(dist_dir)
+    items = []
+    for index in range(publications):
+        citations = index + (generation if index < changed else 0)
+        items.append({"author_pub_id": f"id:pub{index:05d}", "citations": citations})
+        with open(os.path.join(dist_dir, f"id_pub{index:05d}.svg"), "w") as handle:
+            handle.write(
+                '<svg xmlns="http://www.w3.org/2000/svg" width="120" height="20">'
+                f'<rect width="120" height="20"/><text>citations: {citations}</text></svg>'
+            )
+    with open(os.path.join(dist_dir, "citation.json"), "w") as handle:
+        json.dump({"google_scholar": {"publications": items}}, handle)
+    with open(os.path.join(dist_dir, "all.svg"), "w") as handle:
+        handle.write("<svg>all</svg>")
+    return staged_run_dir
+
+
+def _disk_usage(path: str) -> int:
+    seen = set()
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            stat_result = os.lstat(os.path.join(root, name))
+            if stat_result.st_ino not in seen:
+                seen.add(stat_result.st_ino)
+                total += stat_result.st_blocks * 512
+    return total
+
+
+def _legacy_promote(state_dir: str, staged_run_dir: str) -> None:
+    release_dir = os.path.join(state_dir, "releases", os.path.basename(staged_run_dir))
+    shutil.copytree(os.path.join(staged_run_dir, "dist"), os.path.join(release_dir, "dist"))
+
+
+def _run(promote, publications: int, changed: int) -> tuple[float, int]:
+    state_dir = tempfile.mkdtemp(prefix="citation-badge-bench-promotion-")
+    try:
+        for generation in (0, 1):
+            staged_run_dir = _write_staged_run(state_dir, publications, changed, generation)
+            before = _disk_usage(state_dir) - _disk_usage(staged_run_dir)
+            started = time.perf_counter()
+            promote(state_dir, staged_run_dir)
+            elapsed = time.perf_counter() - started
+            shutil.rmtree(staged_run_dir)
+            added = _disk_usage(state_dir) - before
+        return elapsed, added
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def _deferred_promote(state_dir: str, staged_run_dir: str) -> None:
+    promote_release(state_dir, staged_run_dir, finalize=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publications", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--changed", type=int, default=50)
+    args = parser.parse_args()
+
+    cases = {
+        "legacy": _legacy_promote,
+        "finalized": promote_release,
+        "deferred": _deferred_promote,
+    }
+    print(f"{'case':>10} {'files':>6} {'seconds':>9} {'added KiB':>10}")
+    for publications in args.publications:
+        for name, promote in cases.items():
+            seconds, added = _run(promote, publications, args.changed)
+            print(f"{name:>10} {publications:>6} {seconds:>9.4f} {added / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare read-then-write, sendfile and the server's default file responses.
+
+Usage: python benchmarks/bench_sendfile.py [--seconds 1.0]
+
+For each payload size the sender thread repeatedly serves one file into a
+connected TCP socket while a receiver thread drains it. Reported CPU is the
+sender thread's CPU time per response, which is the cost the HTTP handler pays.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.server import send_file_body  # noqa: E402
+
+PAYLOAD_SIZES = (1024, 16 * 1024, 256 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+
+def _read_then_write(connection: socket.socket, wfile, handle, size: int) -> int:
+    body = handle.read()
+    wfile.write(body)
+    return len(body)
+
+
+def _sendfile(connection: socket.socket, wfile, handle, size: int) -> int:
+    return send_file_body(connection, wfile, handle, size, min_sendfile_bytes=0)
+
+
+def _server_default(connection: socket.socket, wfile, handle, size: int) -> int:
+    return send_file_body(connection, wfile, handle, size)
+
+
+def _socket_pair() -> tuple[socket.socket, socket.socket]:
+    listener = socket.create_server(("127.0.0.1", 0))
+    client = socket.create_connection(listener.getsockname())
+    server, _ = listener.accept()
+    listener.close()
+    return server, client
+
+
+def _drain(client: socket.socket, stop: threading.Event) -> None:
+    buffer = bytearray(1024 * 1024)
+    while not stop.is_set():
+        try:
+            if client.recv_into(buffer) == 0:
+                return
+        except OSError:
+            return
+
+
+def run_case(file_path: str, size: int, strategy, seconds: float) -> tuple[int, float, float]:
+    server, client = _socket_pair()
+    stop = threading.Event()
+    drainer = threading.Thread(target=_drain, args=(client, stop), daemon=True)
+    drainer.start()
+    wfile = server.makefile("wb", buffering=0)
+
+    responses = 0
+    wall_started = time.perf_counter()
+    cpu_started = time.thread_time()
+    deadline = wall_started + seconds
+    while time.perf_counter() < deadline:
+        with open(file_path, "rb") as handle:
+            strategy(server, wfile, handle, size)
+        responses += 1
+    cpu_elapsed = time.thread_time() - cpu_started
+    wall_elapsed = time.perf_counter() - wall_started
+
+    stop.set()
+    wfile.close()
+    server.close()
+    drainer.join(timeout=5)
+    client.close()
+    return responses, wall_elapsed, cpu_elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>10} {'strategy':>16} {'req/s':>10} {'MiB/s':>10} {'cpu us/req':>12}"
+    )
+    with tempfile.TemporaryDirectory(prefix="citation-badge-sendfile-") as temp_dir:
+        for size in PAYLOAD_SIZES:
+            file_path = os.path.join(temp_dir, f"payload-{size}.bin")
+            with open(file_path, "wb") as handle:
+                handle.write(os.urandom(size))
+            for name, strategy in (
+                ("read+write", _read_then_write),
+                ("sendfile", _sendfile),
+                ("server default", _server_default),
+            ):
+                responses, wall, cpu = run_case(file_path, size, strategy, args.seconds)
+                print(
+                    f"{size:>10} {name:>16} {responses / wall:>10.0f} "
+                    f"{responses * size / wall / (1024 * 1024):>10.1f} "
+                    f"{cpu / responses * 1e6:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
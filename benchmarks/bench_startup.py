@@ -0,0 +1,171 @@
+"""Measure cold-start cost: import time and time to the first HTTP response.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--image IMAGE] [--max-ttfb-ms N]
+
+Each run starts a fresh service process with `STARTUP_PROFILE=1` against an
+empty temporary `STATE_DIR` and polls `/status` until it answers, recording
+the wall time from spawn to the first response byte. Import time is measured
+separately for `import service.server` and `python main.py --help`.
+
+With `--image`, the service is started from that container image through
+`docker run` instead of the local checkout, which is the number to track for
+the published image. `--max-ttfb-ms` turns the run into a regression check: the
+script exits non-zero when the median time to first byte exceeds the budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLL_INTERVAL_SECONDS = 0.005
+START_TIMEOUT_SECONDS = 60.0
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _time_command(argv: list[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        argv,
+        cwd=REPO_ROOT,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def _first_response_ms(port: int, started: float, process: subprocess.Popen) -> float:
+    deadline = started + START_TIMEOUT_SECONDS
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"service exited early with code {process.returncode}")
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        try:
+            connection.request("GET", "/status")
+            response = connection.getresponse()
+            response.read(1)
+            return (time.perf_counter() - started) * 1000
+        except OSError:
+            time.sleep(POLL_INTERVAL_SECONDS)
+        finally:
+            connection.close()
+    raise RuntimeError("service did not answer before the start timeout")
+
+
+def run_local(port: int) -> float:
+    state_dir = tempfile.mkdtemp(prefix="citation-badge-startup-bench-")
+    env = dict(
+        os.environ,
+        APP_HOST="127.0.0.1",
+        APP_PORT=str(port),
+        STATE_DIR=state_dir,
+        REFRESH_ON_STARTUP="0",
+        STARTUP_PROFILE="1",
+    )
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "service.server"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        return _first_response_ms(port, started, process)
+    finally:
+        process.terminate()
+        process.wait(timeout=15)
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def run_image(image: str, port: int) -> float:
+    name = f"citation-badge-startup-{uuid.uuid4().hex[:8]}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            "docker",
+            "run",
+            "--rm",
+            "--name",
+            name,
+            "-e",
+            "REFRESH_ON_STARTUP=0",
+            "-e",
+            "STARTUP_PROFILE=1",
+            "-p",
+            f"127.0.0.1:{port}:8000",
+            image,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        return _first_response_ms(port, started, process)
+    finally:
+        subprocess.run(
+            ["docker", "rm", "-f", name],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        process.wait(timeout=30)
+
+
+def _summary(values: list[float]) -> str:
+    return (
+        f"median={statistics.median(values):8.1f} "
+        f"min={min(values):8.1f} max={max(values):8.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--image", default="")
+    parser.add_argument("--max-ttfb-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if not args.image:
+        server_import = [
+            _time_command([sys.executable, "-c", "import service.server"])
+            for _ in range(args.runs)
+        ]
+        cli_help = [
+            _time_command([sys.executable, "main.py", "--help"])
+            for _ in range(args.runs)
+        ]
+        print(f"{'import service.server ms':>26} {_summary(server_import)}")
+        print(f"{'main.py --help ms':>26} {_summary(cli_help)}")
+
+    ttfb = []
+    for _ in range(args.runs):
+        port = _free_port()
+        ttfb.append(run_image(args.image, port) if args.image else run_local(port))
+    label = "container first byte ms" if args.image else "first byte ms"
+    print(f"{label:>26} {_summary(ttfb)}")
+
+    if args.max_ttfb_ms and statistics.median(ttfb) > args.max_ttfb_ms:
+        print(
+            f"median time to first byte exceeds budget of {args.max_ttfb_ms:.0f} ms",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare the typed status model with the previous deepcopy-and-merge path.
+
+Usage: python benchmarks/bench_status_model.py [--number 20000]
+
+Each case parses a representative `status.json` payload the way every status
+load and save does: `legacy` is the recursive `_merge_status` over a freshly
+built `empty_status()` that `normalize_status` used before, `model` is the
+current `normalize_status` built on `StatusModel`. The copy rows compare
+`copy.deepcopy` with `copy_status`, which `StatusStore` uses for snapshots.
+"""
+
+from __future__ import annotations
+
+import argparse
+from copy import deepcopy
+import os
+import sys
+import timeit
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.config import Settings  # noqa: E402
+from service.state import copy_status, empty_status, normalize_status  # noqa: E402
+
+
+def _legacy_merge_status(default_value: Any, loaded_value: Any) -> Any:
+    if isinstance(default_value, dict) and not isinstance(loaded_value, dict):
+        return deepcopy(default_value)
+
+    if not isinstance(default_value, dict) or not isinstance(loaded_value, dict):
+        return deepcopy(loaded_value)
+
+    merged = {key: deepcopy(value) for key, value in default_value.items()}
+    for key, value in loaded_value.items():
+        if key in merged:
+            merged[key] = _legacy_merge_status(merged[key], value)
+            continue
+        merged[key] = deepcopy(value)
+
+    return merged
+
+
+def legacy_normalize_status(
+    status: Any,
+    settings: Settings | None = None,
+    *,
+    state_dir: str | None = None,
+) -> dict[str, Any]:
+    baseline = empty_status(settings, state_dir=state_dir)
+    baseline.pop("schema_version", None)
+    if not isinstance(status, dict):
+        return baseline
+    normalized = _legacy_merge_status(baseline, status)
+    normalized["storage"]["state_dir"] = baseline["storage"]["state_dir"]
+    return normalized
+
+
+def _sample_status(settings: Settings) -> dict[str, Any]:
+    payload = empty_status(settings, state_dir="/data")
+    payload["service"]["status"] = "ready"
+    payload["schedule"]["next_run_at"] = "2026-01-01T01:00:00+00:00"
+    payload["storage"]["current_release"] = "/data/releases/run-1"
+    payload["storage"]["has_data"] = True
+    for source in payload["sources"].values():
+        source["last_attempt_at"] = "2026-01-01T00:00:00+00:00"
+        source["last_success_at"] = "2026-01-01T00:00:05+00:00"
+    return payload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    settings = Settings()
+    payload = _sample_status(settings)
+    cases = {
+        "normalize legacy": lambda: legacy_normalize_status(
+            payload, settings, state_dir="/data"
+        ),
+        "normalize model": lambda: normalize_status(payload, settings, state_dir="/data"),
+        "copy deepcopy": lambda: deepcopy(payload),
+        "copy copy_status": lambda: copy_status(payload),
+    }
+    print(f"{'case':>18} {'us/call':>9}")
+    for name, call in cases.items():
+        seconds = min(timeit.repeat(call, number=args.number, repeat=3))
+        print(f"{name:>18} {seconds / args.number * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
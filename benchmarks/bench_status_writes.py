@@ -0,0 +1,78 @@
+"""Count `status.json` writes per refresh with and without write coalescing.
+
+Usage: python benchmarks/bench_status_writes.py [--refreshes 5] [--delays 0,0.25]
+
+Each delay runs the scheduler's refresh path (schedule bookkeeping plus the
+runtime's running and terminal status updates) against `benchmarks/fake_worker.py`
+in a fresh temporary `STATE_DIR`. A delay of `0` writes on every update, which
+is what the service did before `StatusStore`; larger values coalesce a burst of
+updates into one write. Writes are counted after the store has been closed, so
+the final flush is included.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from service.config import Settings  # noqa: E402
+from service.server import create_server  # noqa: E402
+
+FAKE_WORKER_PATH = os.path.join(REPO_ROOT, "benchmarks", "fake_worker.py")
+
+
+def run(delay: float, refreshes: int) -> tuple[int, float]:
+    state_dir = tempfile.mkdtemp(prefix="citation-badge-status-bench-")
+    settings = Settings()
+    settings.app_host = "127.0.0.1"
+    settings.app_port = 0
+    settings.state_dir = state_dir
+    settings.scholar = "bench"
+    settings.refresh_on_startup = False
+    settings.access_log = ""
+    settings.status_flush_delay_seconds = delay
+    server = create_server(
+        settings,
+        worker_python_executable=sys.executable,
+        worker_script_path=FAKE_WORKER_PATH,
+    )
+    try:
+        server.runtime.synchronize_status()
+        server.status_store.flush()
+        baseline = server.status_store.writes
+        started = time.perf_counter()
+        for _ in range(refreshes):
+            server.scheduler._execute_refresh("bench")
+        elapsed = time.perf_counter() - started
+        server.status_store.close()
+        return server.status_store.writes - baseline, elapsed
+    finally:
+        server.server_close()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshes", type=int, default=5)
+    parser.add_argument("--delays", default="0,0.25")
+    args = parser.parse_args()
+
+    print(f"{'delay s':>8} {'writes':>7} {'writes/refresh':>15} {'refresh ms':>11}")
+    for value in args.delays.split(","):
+        delay = float(value)
+        writes, elapsed = run(delay, args.refreshes)
+        print(
+            f"{delay:>8.2f} {writes:>7} {writes / args.refreshes:>15.1f} "
+            f"{elapsed / args.refreshes * 1000:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Time deep validation of a staged `dist/` with and without the thread pool.
+
+Usage: python benchmarks/bench_validation.py [--publications 5000] [--workers 1 4 0]
+
+Builds a synthetic `dist/` shaped like `main.py` output (shields.io-sized
+badges for every publication) and runs `validate_dist` over it with each
+worker count; `0` means the `ThreadPoolExecutor` default.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_worker import SVG_TEMPLATE, build_payload  # noqa: E402
+from service.validation import validate_dist  # noqa: E402
+
+
+def _write_dist(dist_dir: str, publications: int) -> None:
+    payload = build_payload("id", publications, 0)
+    os.makedirs(dist_dir)
+    with open(os.path.join(dist_dir, "citation.json"), "w", encoding="utf-8") as handle:
+        json.dump(payload, handle)
+    with open(os.path.join(dist_dir, "all.svg"), "w", encoding="utf-8") as handle:
+        handle.write(SVG_TEMPLATE.format(label="citations", value=1))
+    for item in payload["google_scholar"]["publications"]:
+        name = item["author_pub_id"].replace(":", "_") + ".svg"
+        with open(os.path.join(dist_dir, name), "w", encoding="utf-8") as handle:
+            handle.write(SVG_TEMPLATE.format(label="citations", value=item["citations"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--publications", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 0])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="citation-badge-bench-validation-")
+    try:
+        dist_dir = os.path.join(work_dir, "dist")
+        _write_dist(dist_dir, args.publications)
+        print(f"{'workers':>8} {'files':>6} {'seconds':>9} {'valid':>6}")
+        for workers in args.workers:
+            started = time.perf_counter()
+            report = validate_dist(dist_dir, max_workers=workers or None)
+            seconds = time.perf_counter() - started
+            print(
+                f"{workers or 'default':>8} {report.checked_files:>6} "
+                f"{seconds:>9.3f} {str(report.valid):>6}"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Compare refresh overhead of the subprocess and in-process worker modes.
+
+Usage: python benchmarks/bench_worker_modes.py [--refreshes 10] [--publications 50]
+
+Runs `main.py` through `run_worker_subprocess` and `run_worker_in_process`
+against offline stand-ins for `scholarly` and `requests` (written to a temp
+directory and put first on the import path), so the timings are the worker
+overhead alone: interpreter startup, imports and the per-profile fork. When
+the real `scholarly` and `requests` are installed, their cold import time is
+reported as well; the subprocess mode pays it on every refresh, the
+in-process mode once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from service.worker import (  # noqa: E402
+    build_worker_argv,
+    run_worker_in_process,
+    run_worker_subprocess,
+)
+
+MAIN_PATH = os.path.join(REPO_ROOT, "main.py")
+FAKE_SCHOLARLY = '''
+class _Scholarly:
+    def fill(self, author_seed):
+        publications = [
+            {{
+                "author_pub_id": f"{{author_seed['scholar_id']}}:pub{{index}}",
+                "num_citations": index,
+                "bib": {{"title": f"Paper {{index}}", "pub_year": "2024"}},
+            }}
+            for index in range({publications})
+        ]
+        return {{"citedby": {publications}, "publications": publications}}
+
+
+scholarly = _Scholarly()
+'''
+FAKE_PROXY_GENERATOR = "class MaxTriesExceededException(Exception):\n    pass\n"
+FAKE_REQUESTS = '''
+class _Response:
+    content = b'<svg xmlns="http://www.w3.org/2000/svg" width="90" height="20"/>'
+
+
+def get(url, timeout):
+    return _Response()
+'''
+
+
+def _write_fake_dependencies(directory: str, publications: int) -> None:
+    os.makedirs(os.path.join(directory, "scholarly"))
+    with open(os.path.join(directory, "scholarly", "__init__.py"), "w") as handle:
+        handle.write(FAKE_SCHOLARLY.format(publications=publications))
+    with open(os.path.join(directory, "scholarly", "_proxy_generator.py"), "w") as handle:
+        handle.write(FAKE_PROXY_GENERATOR)
+    with open(os.path.join(directory, "requests.py"), "w") as handle:
+        handle.write(FAKE_REQUESTS)
+
+
+def _time_refreshes(refreshes: int, refresh) -> list[float]:
+    timings = []
+    for _ in range(refreshes):
+        work_dir = tempfile.mkdtemp(prefix="citation-badge-bench-worker-")
+        try:
+            started = time.perf_counter()
+            completed = refresh(work_dir)
+            timings.append(time.perf_counter() - started)
+            if completed.returncode != 0:
+                raise RuntimeError(completed.stderr or completed.stdout)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return timings
+
+
+def _real_import_seconds() -> float | None:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", "import requests, scholarly"],
+        capture_output=True,
+    )
+    seconds = time.perf_counter() - started
+    return seconds if completed.returncode == 0 else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshes", type=int, default=10)
+    parser.add_argument("--publications", type=int, default=50)
+    args = parser.parse_args()
+
+    real_import_seconds = _real_import_seconds()
+    fake_dir = tempfile.mkdtemp(prefix="citation-badge-bench-deps-")
+    try:
+        _write_fake_dependencies(fake_dir, args.publications)
+        python_path = [fake_dir, os.environ.get("PYTHONPATH", "")]
+        env = {"PYTHONPATH": os.pathsep.join(filter(None, python_path))}
+        argv = build_worker_argv(
+            scholar="bench",
+            python_executable=sys.executable,
+            script_path=MAIN_PATH,
+        )
+        subprocess_timings = _time_refreshes(
+            args.refreshes,
+            lambda work_dir: run_worker_subprocess(
+                argv,
+                working_directory=work_dir,
+                timeout_seconds=60,
+                env=env,
+            ),
+        )
+        sys.path.insert(0, fake_dir)
+        in_process_timings = _time_refreshes(
+            args.refreshes,
+            lambda work_dir: run_worker_in_process(
+                scholar="bench",
+                script_path=MAIN_PATH,
+                working_directory=work_dir,
+                timeout_seconds=60,
+            ),
+        )
+    finally:
+        shutil.rmtree(fake_dir, ignore_errors=True)
+
+    print(f"{'mode':>11} {'first_ms':>9} {'median_ms':>10} {'max_ms':>8}")
+    for mode, timings in (
+        ("subprocess", subprocess_timings),
+        ("in_process", in_process_timings),
+    ):
+        print(
+            f"{mode:>11} {timings[0] * 1000:>9.1f} "
+            f"{statistics.median(timings) * 1000:>10.1f} {max(timings) * 1000:>8.1f}"
+        )
+    if real_import_seconds is None:
+        print("real scholarly/requests not installed; their import cost is not included")
+    else:
+        print(
+            f"python -c 'import requests, scholarly': {real_import_seconds * 1000:.1f} ms "
+            "(paid on every refresh by subprocess mode only)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Stand-in for `main.py` that writes a synthetic `dist/` without network access.
+
+It accepts the same `--scholar` and `--timeout` arguments the service passes
+and writes `dist/citation.json`, `dist/all.svg` and one badge per publication
+into the working directory, like the real batch script does.
+
+Environment:
+- `FAKE_WORKER_PUBLICATIONS` (default 50): number of publications to emit
+- `FAKE_WORKER_DELAY_SECONDS` (default 0): sleep before writing, to mimic scraping
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import json
+import os
+import time
+
+SVG_TEMPLATE = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="120" height="20">'
+    '<rect width="120" height="20" fill="#555"/>'
+    '<text x="6" y="14" fill="#fff" font-size="11">{label}: {value}</text></svg>'
+)
+
+
+def build_payload(scholar_id: str, publications: int, generation: int) -> dict:
+    items = [
+        {
+            "author_pub_id": f"{scholar_id}:pub{index:04d}",
+            "title": f"Synthetic paper {index:04d}",
+            "year": str(2000 + index % 25),
+            "citations": (index * 7 + generation) % 500,
+        }
+        for index in range(publications)
+    ]
+    total = sum(item["citations"] for item in items)
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "google_scholar": {
+            "status": "success",
+            "total_citations": total,
+            "5y_citations": total // 2,
+            "total_hindex": min(publications, 40),
+            "5y_hindex": min(publications, 20),
+            "total_i10index": publications,
+            "5y_i10index": publications // 2,
+            "cites_per_year": {},
+            "publications": items,
+            "error": None,
+        },
+        "web_of_science": {"status": "skipped", "peer_reviews": 0, "error": None},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scholar", default="fake_scholar")
+    parser.add_argument("--timeout", type=int, default=0)
+    args = parser.parse_args()
+
+    time.sleep(float(os.environ.get("FAKE_WORKER_DELAY_SECONDS", "0")))
+    scholar_id = args.scholar.split(",")[0].strip() or "fake_scholar"
+    publications = int(os.environ.get("FAKE_WORKER_PUBLICATIONS", "50"))
+    payload = build_payload(scholar_id, publications, generation=int(time.time()))
+
+    dist_dir = os.path.join(os.getcwd(), "dist")
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(dist_dir, "citation.json"), "w", encoding="utf-8") as handle:
+        json.dump(payload, handle)
+    google_scholar = payload["google_scholar"]
+    with open(os.path.join(dist_dir, "all.svg"), "w", encoding="utf-8") as handle:
+        handle.write(SVG_TEMPLATE.format(label="citations", value=google_scholar["total_citations"]))
+    for item in google_scholar["publications"]:
+        name = item["author_pub_id"].replace(":", "_") + ".svg"
+        with open(os.path.join(dist_dir, name), "w", encoding="utf-8") as handle:
+            handle.write(SVG_TEMPLATE.format(label="cited", value=item["citations"]))
+
+
+if __name__ == "__main__":
+    main()
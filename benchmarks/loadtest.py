@@ -0,0 +1,216 @@
+"""Drive concurrent HTTP traffic at the service and report latency percentiles.
+
+Usage: python benchmarks/loadtest.py [--scenarios hot-badge,many-badge,status-polling,promotion-under-load]
+                                     [--clients 8] [--seconds 5] [--publications 200]
+
+Each scenario starts `create_server` in this process against a fresh temporary
+`STATE_DIR`, runs one refresh through `benchmarks/fake_worker.py` so a release
+is promoted, then spawns client processes that issue requests until the
+deadline. Scenarios:
+
+- hot-badge: every client requests `/all.svg`
+- many-badge: clients pick random publication badges and `citation.json`
+- status-polling: clients poll `/status`
+- promotion-under-load: many-badge traffic while refreshes promote new
+  releases back to back; any non-200 response counts as an error
+
+Rate limiting and the in-flight cap are disabled so the numbers reflect the
+serving path. Clients share the host's cores with the server, so compare runs
+made on the same machine rather than absolute numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+from array import array
+from collections import Counter
+import http.client
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from service.config import Settings  # noqa: E402
+from service.server import create_server  # noqa: E402
+
+FAKE_WORKER_PATH = os.path.join(REPO_ROOT, "benchmarks", "fake_worker.py")
+FAKE_SCHOLAR_ID = "loadtest"
+SCENARIOS = ("hot-badge", "many-badge", "status-polling", "promotion-under-load")
+
+
+def _client(
+    port: int,
+    paths: list[str],
+    seconds: float,
+    seed: int,
+) -> tuple[array, dict[str, int]]:
+    rng = random.Random(seed)
+    latencies = array("d")
+    outcomes: Counter[str] = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        path = paths[0] if len(paths) == 1 else rng.choice(paths)
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started)
+            outcomes[str(response.status)] += 1
+        except OSError as error:
+            outcomes[type(error).__name__] += 1
+        finally:
+            connection.close()
+    return latencies, dict(outcomes)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _scenario_paths(scenario: str, publications: int) -> list[str]:
+    if scenario == "hot-badge":
+        return ["/all.svg"]
+    if scenario == "status-polling":
+        return ["/status"]
+    badges = [
+        f"/{FAKE_SCHOLAR_ID}_pub{index:04d}.svg" for index in range(publications)
+    ]
+    return badges + ["/citation.json", "/all.svg"]
+
+
+def _build_settings(state_dir: str) -> Settings:
+    settings = Settings()
+    settings.app_host = "127.0.0.1"
+    settings.app_port = 0
+    settings.state_dir = state_dir
+    settings.scholar = FAKE_SCHOLAR_ID
+    settings.refresh_on_startup = False
+    settings.rate_limit_per_second = 0
+    settings.max_inflight_requests = 0
+    settings.access_log = ""
+    return settings
+
+
+def run_scenario(
+    scenario: str,
+    *,
+    clients: int,
+    seconds: float,
+    publications: int,
+) -> dict[str, object]:
+    os.environ["FAKE_WORKER_PUBLICATIONS"] = str(publications)
+    state_dir = tempfile.mkdtemp(prefix="citation-badge-loadtest-")
+    server = create_server(
+        _build_settings(state_dir),
+        worker_python_executable=sys.executable,
+        worker_script_path=FAKE_WORKER_PATH,
+    )
+    serving = threading.Thread(target=server.serve_forever, daemon=True)
+    serving.start()
+
+    refreshes = 0
+    stop_refreshing = threading.Event()
+
+    def _refresh_loop() -> None:
+        nonlocal refreshes
+        while not stop_refreshing.is_set():
+            server.runtime.refresh("loadtest")
+            refreshes += 1
+
+    try:
+        server.runtime.synchronize_status()
+        server.runtime.refresh("loadtest")
+        port = server.server_address[1]
+        paths = _scenario_paths(scenario, publications)
+        refresher = None
+        if scenario == "promotion-under-load":
+            refresher = threading.Thread(target=_refresh_loop, daemon=True)
+            refresher.start()
+
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(clients) as pool:
+            results = pool.starmap(
+                _client,
+                [(port, paths, seconds, seed) for seed in range(clients)],
+            )
+        stop_refreshing.set()
+        if refresher is not None:
+            refresher.join()
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    latencies = sorted(value for result in results for value in result[0])
+    outcomes: Counter[str] = Counter()
+    for _, client_outcomes in results:
+        outcomes.update(client_outcomes)
+    completed = sum(outcomes.values())
+    errors = completed - outcomes.get("200", 0)
+    return {
+        "scenario": scenario,
+        "requests": completed,
+        "throughput": completed / seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+        "outcomes": dict(sorted(outcomes.items())),
+        "refreshes": refreshes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--publications", type=int, default=200)
+    args = parser.parse_args()
+
+    scenarios = [value.strip() for value in args.scenarios.split(",") if value.strip()]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    print(
+        f"cpus={os.cpu_count()} clients={args.clients} seconds={args.seconds} "
+        f"publications={args.publications}"
+    )
+    print(
+        f"{'scenario':>22} {'requests':>9} {'req/s':>8} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'refreshes':>9}"
+    )
+    for scenario in scenarios:
+        report = run_scenario(
+            scenario,
+            clients=args.clients,
+            seconds=args.seconds,
+            publications=args.publications,
+        )
+        print(
+            f"{report['scenario']:>22} {report['requests']:>9} "
+            f"{report['throughput']:>8.0f} {report['p50_ms']:>8.2f} "
+            f"{report['p95_ms']:>8.2f} {report['p99_ms']:>8.2f} "
+            f"{report['errors']:>7} {report['refreshes']:>9}"
+        )
+        if report["errors"]:
+            print(f"{'':>22} outcomes={report['outcomes']}")
+
+
+if __name__ == "__main__":
+    main()
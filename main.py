@@ -1,26 +1,132 @@
 import argparse
+import contextvars
 import hashlib
 import json
 import multiprocessing
 import os
 import shutil
+import signal
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
 
-import requests
-from scholarly import scholarly
-from scholarly._proxy_generator import MaxTriesExceededException
-
 
 DIST_DIR = Path("dist")
 STAGING_DIR = DIST_DIR / ".staging"
+UPDATE_FLAG_FILENAME = "citation_updated.flag"
+SUMMARY_FILENAME = "summary.md"
+CANCEL_POLL_INTERVAL_SECONDS = 0.2
+# Connect and read timeout of one shields.io request. A `stop_event` with a
+# deadline (`remaining_seconds()`) shortens it to what is left of the run.
+BADGE_REQUEST_TIMEOUT_SECONDS = 10.0
+MIN_BADGE_REQUEST_TIMEOUT_SECONDS = 0.05
+# When set, `main` writes JSON-lines progress events to this file descriptor.
+PROGRESS_FD_ENV = "CITATION_PROGRESS_FD"
+# Repeating events (fetch heartbeats, badge counts) are sent at most this often.
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+# Where progress messages go; `run` points it at the caller's stream so an
+# in-process refresh does not write to the host process's stdout.
+_OUTPUT = contextvars.ContextVar("citation_badge_output", default=None)
+_PROGRESS = contextvars.ContextVar("citation_badge_progress", default=None)
 
 
 class ScholarProfileTimeout(TimeoutError):
     pass
 
 
+class ScholarMaxTriesExceeded(RuntimeError):
+    pass
+
+
+class RefreshCancelled(RuntimeError):
+    """Raised inside `run` once its `stop_event` is set."""
+
+
+def _log(message: str) -> None:
+    print(message, file=_OUTPUT.get(), flush=True)
+
+
+class _ProgressReporter:
+    """Send progress events to `sink`; a sink that raises is dropped."""
+
+    def __init__(self, sink) -> None:
+        self._sink = sink
+        self._started = time.monotonic()
+        self._last_repeated: dict[tuple, float] = {}
+
+    def emit(self, event: str, repeated: bool, fields: dict) -> None:
+        if self._sink is None:
+            return
+        now = time.monotonic()
+        if repeated:
+            # The first repeated event of every profile is always sent.
+            key = (event, fields.get("profile"))
+            last = self._last_repeated.get(key)
+            if last is not None and now - last < PROGRESS_INTERVAL_SECONDS:
+                return
+            self._last_repeated[key] = now
+        try:
+            self._sink(
+                {
+                    "event": event,
+                    "elapsed_seconds": round(now - self._started, 3),
+                    **fields,
+                }
+            )
+        except Exception as e:
+            self._sink = None
+            _log(f"Progress reporting disabled: {e}")
+
+
+def _progress(event: str, *, repeated: bool = False, **fields) -> None:
+    reporter = _PROGRESS.get()
+    if reporter is not None:
+        reporter.emit(event, repeated, fields)
+
+
+def _seconds_since(started: float) -> float:
+    return round(time.monotonic() - started, 3)
+
+
+def _check_cancelled(stop_event) -> None:
+    if stop_event is not None and stop_event.is_set():
+        raise RefreshCancelled("Refresh cancelled")
+
+
+# `scholarly` and `requests` pull in large dependency trees; import them only
+# when a profile is actually fetched so `--help` and argument errors stay fast.
+def _requests_module():
+    import requests
+
+    return requests
+
+
+def _scholarly():
+    from scholarly import scholarly
+
+    return scholarly
+
+
+def _max_tries_exceeded_exception() -> type[Exception]:
+    from scholarly._proxy_generator import MaxTriesExceededException
+
+    return MaxTriesExceededException
+
+
+def preload_dependencies() -> None:
+    """Import the scraping dependencies now instead of on the first fetch.
+
+    A long-lived caller of `run` pays for the imports once, and the forked
+    per-profile workers inherit the loaded modules.
+    """
+
+    _requests_module()
+    _scholarly()
+    _max_tries_exceeded_exception()
+
+
 def _get_env_str(name: str) -> str | None:
     value = os.getenv(name)
     if value is None:
@@ -60,12 +166,25 @@ def _new_citation_metadata() -> dict:
     }
 
 
-def _write_badge(path: Path, label: str, value: str, color: str) -> None:
+def _badge_request_timeout(stop_event) -> float:
+    remaining_seconds = getattr(stop_event, "remaining_seconds", None)
+    if remaining_seconds is None:
+        return BADGE_REQUEST_TIMEOUT_SECONDS
+    return max(
+        MIN_BADGE_REQUEST_TIMEOUT_SECONDS,
+        min(BADGE_REQUEST_TIMEOUT_SECONDS, remaining_seconds()),
+    )
+
+
+def _write_badge(
+    path: Path, label: str, value: str, color: str, stop_event=None
+) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "wb") as f:
         f.write(
-            requests.get(
-                f"https://img.shields.io/badge/{label}-{value}-_.svg?color={color}&style=flat-square"
+            _requests_module().get(
+                f"https://img.shields.io/badge/{label}-{value}-_.svg?color={color}&style=flat-square",
+                timeout=_badge_request_timeout(stop_event),
             ).content
         )
 
@@ -81,7 +200,7 @@ def _load_json(path: Path) -> dict:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception as e:
-        print(f"Could not load previous citation data from {path}: {e}", flush=True)
+        _log(f"Could not load previous citation data from {path}: {e}")
         return {}
 
 
@@ -95,41 +214,78 @@ def _has_successful_google_scholar(path: Path) -> bool:
     return _load_json(path).get("google_scholar", {}).get("status") == "success"
 
 
-def _dist_snapshot() -> dict[str, str]:
+def _dist_snapshot(dist_dir: Path) -> dict[str, str]:
     snapshot = {}
-    if not DIST_DIR.exists():
+    if not dist_dir.exists():
         return snapshot
 
-    for path in DIST_DIR.rglob("*"):
+    for path in dist_dir.rglob("*"):
         if not path.is_file():
             continue
-        relative_parts = path.relative_to(DIST_DIR).parts
+        relative_parts = path.relative_to(dist_dir).parts
         if relative_parts[0] in {".git", ".staging"}:
             continue
-        snapshot[str(path.relative_to(DIST_DIR))] = hashlib.sha256(path.read_bytes()).hexdigest()
+        snapshot[str(path.relative_to(dist_dir))] = hashlib.sha256(path.read_bytes()).hexdigest()
     return snapshot
 
 
+def _is_max_tries_exceeded(error: Exception) -> bool:
+    try:
+        return isinstance(error, _max_tries_exceeded_exception())
+    except ImportError:
+        return False
+
+
 def _fill_author_worker(author_seed: dict, result_queue) -> None:
+    # Runs in the forked child, which has already imported scholarly; classify
+    # the error here so the parent never has to import it. A service running
+    # `run` in-process has its own signal handlers; the child must still die
+    # on the SIGTERM that `_stop_process` sends.
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, signal.SIG_DFL)
     try:
-        result_queue.put(("success", scholarly.fill(author_seed)))
+        result_queue.put(("success", _scholarly().fill(author_seed)))
     except Exception as e:
-        result_queue.put(("error", e.__class__.__name__, str(e), traceback.format_exc()))
+        kind = "max_tries" if _is_max_tries_exceeded(e) else "error"
+        result_queue.put((kind, e.__class__.__name__, str(e), traceback.format_exc()))
+
+
+def _stop_process(process) -> None:
+    process.terminate()
+    process.join(5)
+    if process.is_alive():
+        process.kill()
+        process.join()
 
 
-def _fill_author_with_timeout(author_seed: dict, timeout_seconds: int) -> dict:
+def _fill_author_with_timeout(
+    author_seed: dict, timeout_seconds: int, stop_event=None
+) -> dict:
     context = multiprocessing.get_context("fork")
     result_queue = context.Queue(maxsize=1)
     process = context.Process(target=_fill_author_worker, args=(author_seed, result_queue))
     process.start()
-    process.join(timeout_seconds)
+    started = time.monotonic()
+    deadline = started + timeout_seconds
+    while process.is_alive():
+        remaining_seconds = deadline - time.monotonic()
+        if remaining_seconds <= 0:
+            break
+        if stop_event is not None and stop_event.is_set():
+            _stop_process(process)
+            raise RefreshCancelled("Refresh cancelled")
+        process.join(min(CANCEL_POLL_INTERVAL_SECONDS, remaining_seconds))
+        if process.is_alive():
+            # Heartbeat: the fetch is still running, not hung in this process.
+            _progress(
+                "profile_fetching",
+                repeated=True,
+                profile=author_seed["scholar_id"],
+                fetch_seconds=_seconds_since(started),
+            )
 
     if process.is_alive():
-        process.terminate()
-        process.join(5)
-        if process.is_alive():
-            process.kill()
-            process.join()
+        _stop_process(process)
         raise ScholarProfileTimeout(
             f"Google Scholar profile timed out after {timeout_seconds} seconds"
         )
@@ -141,16 +297,19 @@ def _fill_author_with_timeout(author_seed: dict, timeout_seconds: int) -> dict:
     if result[0] == "success":
         return result[1]
 
-    _, error_name, error_message, remote_traceback = result
-    if error_name == MaxTriesExceededException.__name__:
-        raise MaxTriesExceededException(error_message)
+    kind, _, error_message, remote_traceback = result
+    if kind == "max_tries":
+        raise ScholarMaxTriesExceeded(error_message)
     raise RuntimeError(f"{error_message}\n{remote_traceback}")
 
 
 def generate_scholar_to_dir(
-    scholar_id: str, output_dir: Path, profile_timeout_seconds: int
+    scholar_id: str, output_dir: Path, profile_timeout_seconds: int, stop_event=None
 ) -> dict:
     citation_metadata = _new_citation_metadata()
+    stats = {"fetch_seconds": None, "badges_seconds": None, "badges_written": 0}
+    fetch_started = time.monotonic()
+    badges_started = None
 
     try:
         author_seed = {
@@ -165,11 +324,22 @@ def generate_scholar_to_dir(
             "url_picture": "",
             "container_type": "Author",
         }
-        print(f"Loading Google Scholar profile {scholar_id}...", flush=True)
-        print("Google Scholar profile found", flush=True)
-        author = _fill_author_with_timeout(author_seed, profile_timeout_seconds)
-        print("Google Scholar profile filled", flush=True)
+        _log(f"Loading Google Scholar profile {scholar_id}...")
+        _log("Google Scholar profile found")
+        author = _fill_author_with_timeout(
+            author_seed, profile_timeout_seconds, stop_event
+        )
+        _log("Google Scholar profile filled")
+        stats["fetch_seconds"] = _seconds_since(fetch_started)
         total_cite = author["citedby"]
+        publications = author["publications"]
+        _progress(
+            "profile_fetched",
+            profile=scholar_id,
+            publications=len(publications),
+            fetch_seconds=stats["fetch_seconds"],
+        )
+        badges_started = time.monotonic()
 
         citation_metadata["google_scholar"]["status"] = "success"
         citation_metadata["google_scholar"]["total_citations"] = total_cite
@@ -188,11 +358,15 @@ def generate_scholar_to_dir(
             "cites_per_year", {}
         )
 
-        _write_badge(output_dir / "all.svg", "citations", str(total_cite), "3388ee")
-        print("All.svg generated", flush=True)
+        _write_badge(
+            output_dir / "all.svg", "citations", str(total_cite), "3388ee", stop_event
+        )
+        stats["badges_written"] += 1
+        _log("All.svg generated")
 
         publications_data = []
-        for pub in author["publications"]:
+        for processed, pub in enumerate(publications, start=1):
+            _check_cancelled(stop_event)
             pub_id = pub["author_pub_id"].replace(":", "_")
             pub_cite = pub["num_citations"]
             publications_data.append(
@@ -203,47 +377,69 @@ def generate_scholar_to_dir(
                     "citations": pub_cite,
                 }
             )
-            _write_badge(output_dir / f"{pub_id}.svg", "citations", str(pub_cite), "3388ee")
+            _write_badge(
+                output_dir / f"{pub_id}.svg", "citations", str(pub_cite), "3388ee", stop_event
+            )
+            stats["badges_written"] += 1
+            _progress(
+                "badges",
+                repeated=True,
+                profile=scholar_id,
+                publications_processed=processed,
+                publications=len(publications),
+                badges_written=stats["badges_written"],
+            )
 
         citation_metadata["google_scholar"]["publications"] = publications_data
         _write_json(output_dir / "citation.json", citation_metadata)
-        print("All pub svg generated", flush=True)
+        _log("All pub svg generated")
         return {
             "success": True,
             "metadata": citation_metadata,
             "reason": f"Total citations: {total_cite}",
+            "stats": stats,
         }
-    except MaxTriesExceededException:
-        print(f"Max tries exceeded, skip google scholar badges for {scholar_id}", flush=True)
+    except RefreshCancelled:
+        raise
+    except ScholarMaxTriesExceeded:
+        _log(f"Max tries exceeded, skip google scholar badges for {scholar_id}")
         citation_metadata["google_scholar"]["status"] = "failed"
         citation_metadata["google_scholar"]["error"] = "Max proxy retries exceeded"
         return {
             "success": False,
             "metadata": citation_metadata,
             "reason": "Max proxy retries exceeded",
+            "stats": stats,
         }
     except ScholarProfileTimeout as e:
-        print(f"{e}, skip google scholar badges for {scholar_id}", flush=True)
+        _log(f"{e}, skip google scholar badges for {scholar_id}")
         citation_metadata["google_scholar"]["status"] = "failed"
         citation_metadata["google_scholar"]["error"] = str(e)
         return {
             "success": False,
             "metadata": citation_metadata,
             "reason": str(e),
+            "stats": stats,
         }
     except Exception as e:
-        print(
-            f"An unexpected error occurred with Google Scholar profile {scholar_id}: {e}",
-            flush=True,
-        )
-        traceback.print_exc()
+        # A badge request cut short by the run's deadline ends the run.
+        _check_cancelled(stop_event)
+        _log(f"An unexpected error occurred with Google Scholar profile {scholar_id}: {e}")
+        traceback.print_exc(file=_OUTPUT.get())
         citation_metadata["google_scholar"]["status"] = "failed"
         citation_metadata["google_scholar"]["error"] = str(e)
         return {
             "success": False,
             "metadata": citation_metadata,
             "reason": f"Unexpected error: {e}",
+            "stats": stats,
         }
+    finally:
+        # `stats` is shared with the returned result, so this still lands in it.
+        if stats["fetch_seconds"] is None:
+            stats["fetch_seconds"] = _seconds_since(fetch_started)
+        elif badges_started is not None:
+            stats["badges_seconds"] = _seconds_since(badges_started)
 
 
 def _promote_profile(staged_profile_dir: Path, profile_dir: Path) -> None:
@@ -252,12 +448,12 @@ def _promote_profile(staged_profile_dir: Path, profile_dir: Path) -> None:
     shutil.move(str(staged_profile_dir), str(profile_dir))
 
 
-def _mirror_first_profile_to_root(profile_dir: Path) -> None:
-    for svg_path in DIST_DIR.glob("*.svg"):
+def _mirror_first_profile_to_root(dist_dir: Path, profile_dir: Path) -> None:
+    for svg_path in dist_dir.glob("*.svg"):
         svg_path.unlink()
 
     for svg_path in profile_dir.glob("*.svg"):
-        shutil.copy2(svg_path, DIST_DIR / svg_path.name)
+        shutil.copy2(svg_path, dist_dir / svg_path.name)
 
 
 def _profile_wos_metadata(
@@ -282,20 +478,20 @@ def _profile_wos_metadata(
             },
         )
 
-    print(f"Using WOS overwrite: {wos_overwrite_raw}", flush=True)
+    _log(f"Using WOS overwrite: {wos_overwrite_raw}")
     try:
         review_count = int(wos_overwrite_raw)
         if review_count < 0:
             raise ValueError("WOS_OVERWRITE must be a non-negative integer")
 
         _write_wos_badge(first_profile_dir, str(review_count))
-        print("Review badge generated", flush=True)
+        _log("Review badge generated")
         return (
             {"status": "success", "peer_reviews": review_count, "error": None},
             {"success": True, "reason": f"Peer reviews: {review_count} (override)"},
         )
     except Exception as e:
-        print(f"An error occurred during WOS overwrite processing: {e}", flush=True)
+        _log(f"An error occurred during WOS overwrite processing: {e}")
         return (
             {"status": "failed", "peer_reviews": 0, "error": str(e)},
             {"success": False, "reason": f"WOS Override Error: {e}"},
@@ -310,12 +506,14 @@ def _select_profile_wos(previous_profile_data: dict, current_wos: dict) -> dict:
     return current_wos
 
 
-def _save_update_flag(updated: bool) -> None:
-    with open("citation_updated.flag", "w") as f:
+def _save_update_flag(work_dir: Path, updated: bool) -> None:
+    with open(work_dir / UPDATE_FLAG_FILENAME, "w") as f:
         f.write("true" if updated else "false")
 
 
-def _write_summary(profile_statuses: list[dict], wos_status: dict, include_wos: bool) -> None:
+def _write_summary(
+    work_dir: Path, profile_statuses: list[dict], wos_status: dict, include_wos: bool
+) -> None:
     summary_content = """
 # Citation Badge Generation
 
@@ -340,55 +538,49 @@ def _write_summary(profile_statuses: list[dict], wos_status: dict, include_wos:
     else:
         summary_content += f"| Web of Science  | ⚠️ Skipped | {wos_status['reason']:<32} |\n"
 
-    with open("summary.md", "w", encoding="utf-8") as f:
+    with open(work_dir / SUMMARY_FILENAME, "w", encoding="utf-8") as f:
         f.write(summary_content)
-    print("Summary written to summary.md", flush=True)
-
-
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Get citations from Google Scholar")
-    parser.add_argument("--scholar", type=str, required=True, help="Google Scholar ID")
-    parser.add_argument(
-        "--timeout",
-        type=int,
-        required=True,
-        help="Per-profile Google Scholar timeout in seconds",
-    )
-    parser.add_argument(
-        "--gen_summary", action="store_true", help="Generate summary for github actions"
-    )
-    args = parser.parse_args()
-    if args.timeout <= 0:
-        parser.error("--timeout must be a positive number of seconds")
+    _log(f"Summary written to {SUMMARY_FILENAME}")
 
-    scholar_ids = parse_scholar_ids(args.scholar)
-    if not scholar_ids:
-        parser.error("--scholar must include at least one non-empty Google Scholar ID")
 
-    DIST_DIR.mkdir(exist_ok=True)
-    if STAGING_DIR.exists():
-        shutil.rmtree(STAGING_DIR)
-    initial_dist_snapshot = _dist_snapshot()
-    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+def _run(
+    scholar_ids: list[str],
+    profile_timeout_seconds: int,
+    work_dir: Path,
+    gen_summary: bool,
+    stop_event,
+) -> dict:
+    dist_dir = work_dir / DIST_DIR
+    staging_dir = work_dir / STAGING_DIR
+    dist_dir.mkdir(exist_ok=True)
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    initial_dist_snapshot = _dist_snapshot(dist_dir)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    refresh_started = time.monotonic()
+    _progress("refresh_started", profiles=len(scholar_ids))
 
     wos_overwrite_raw = _get_env_str("WOS_OVERWRITE")
-    profile_timeout_seconds = args.timeout
     profile_results = {}
     profile_statuses = []
     previous_profile_data = {}
     previous_profile_review = {}
 
-    for scholar_id in scholar_ids:
-        staged_profile_dir = STAGING_DIR / scholar_id
-        profile_dir = DIST_DIR / scholar_id
+    for index, scholar_id in enumerate(scholar_ids, start=1):
+        _check_cancelled(stop_event)
+        _progress(
+            "profile_started", profile=scholar_id, index=index, profiles=len(scholar_ids)
+        )
+        staged_profile_dir = staging_dir / scholar_id
+        profile_dir = dist_dir / scholar_id
         previous_profile_data[scholar_id] = _load_json(profile_dir / "citation.json")
         review_path = profile_dir / "review.svg"
         if review_path.exists():
             previous_profile_review[scholar_id] = review_path.read_bytes()
-        elif scholar_id == scholar_ids[0] and (DIST_DIR / "review.svg").exists():
-            previous_profile_review[scholar_id] = (DIST_DIR / "review.svg").read_bytes()
+        elif scholar_id == scholar_ids[0] and (dist_dir / "review.svg").exists():
+            previous_profile_review[scholar_id] = (dist_dir / "review.svg").read_bytes()
         result = generate_scholar_to_dir(
-            scholar_id, staged_profile_dir, profile_timeout_seconds
+            scholar_id, staged_profile_dir, profile_timeout_seconds, stop_event
         )
         profile_results[scholar_id] = result
 
@@ -412,10 +604,16 @@ def main() -> None:
                 profile_statuses.append(
                     {"scholar_id": scholar_id, "status": "failed", "reason": result["reason"]}
                 )
+        _progress(
+            "profile_finished",
+            profile=scholar_id,
+            status=profile_statuses[-1]["status"],
+            **result["stats"],
+        )
 
     first_id = scholar_ids[0]
     first_result = profile_results[first_id]
-    first_profile_dir = DIST_DIR / first_id
+    first_profile_dir = dist_dir / first_id
     first_profile_has_data = first_result["success"] or _has_successful_google_scholar(
         first_profile_dir / "citation.json"
     )
@@ -439,27 +637,121 @@ def main() -> None:
         ):
             (first_profile_dir / "review.svg").write_bytes(previous_profile_review[first_id])
         _write_json(first_profile_dir / "citation.json", first_profile_data)
-        _mirror_first_profile_to_root(first_profile_dir)
-        shutil.copy2(first_profile_dir / "citation.json", DIST_DIR / "citation.json")
-        print("Citation metadata mirrored from first profile", flush=True)
-    elif not (DIST_DIR / "citation.json").exists():
-        print(
+        _mirror_first_profile_to_root(dist_dir, first_profile_dir)
+        shutil.copy2(first_profile_dir / "citation.json", dist_dir / "citation.json")
+        _log("Citation metadata mirrored from first profile")
+    elif not (dist_dir / "citation.json").exists():
+        _log(
             "No successful root Google Scholar data and no previous citation.json - "
-            "skipping citation.json",
-            flush=True,
+            "skipping citation.json"
         )
     else:
-        print("No root citation metadata update - preserving existing citation.json", flush=True)
+        _log("No root citation metadata update - preserving existing citation.json")
+
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+
+    updated = _dist_snapshot(dist_dir) != initial_dist_snapshot
+    _save_update_flag(work_dir, updated)
+    _log(f"Citation update flag set to {str(updated).lower()}")
+    _progress("refresh_finished", updated=updated, seconds=_seconds_since(refresh_started))
+
+    if gen_summary:
+        _write_summary(work_dir, profile_statuses, wos_status, wos_overwrite_raw is not None)
+
+    return {"updated": updated, "profiles": profile_statuses, "web_of_science": wos_status}
+
+
+def run(
+    scholar_ids: list[str],
+    profile_timeout_seconds: int,
+    *,
+    work_dir: str | os.PathLike = ".",
+    gen_summary: bool = False,
+    stop_event=None,
+    output=None,
+    progress=None,
+) -> dict:
+    """Refresh `work_dir/dist` for `scholar_ids`; the library form of `main`.
+
+    Each profile is still fetched in a forked child with its own timeout.
+    Setting `stop_event` (anything with `is_set()`) stops the refresh at the
+    next profile or badge, terminating a running profile child, and raises
+    `RefreshCancelled`. Badge requests time out after
+    `BADGE_REQUEST_TIMEOUT_SECONDS`, or sooner when `stop_event` also has a
+    `remaining_seconds()` deadline. Progress messages go to `output` instead
+    of stdout, and `progress` (a callable) receives one dict per progress
+    event: the profile being fetched, publications processed, badges written
+    and the time each stage took. Returns whether `dist/` changed and the
+    per-source statuses.
+    """
+
+    token = _OUTPUT.set(output)
+    progress_token = _PROGRESS.set(
+        _ProgressReporter(progress) if progress is not None else None
+    )
+    try:
+        return _run(
+            scholar_ids,
+            profile_timeout_seconds,
+            Path(work_dir),
+            gen_summary,
+            stop_event,
+        )
+    finally:
+        _PROGRESS.reset(progress_token)
+        _OUTPUT.reset(token)
+
+
+def _open_progress_stream():
+    raw_fd = _get_env_str(PROGRESS_FD_ENV)
+    if raw_fd is None:
+        return None
+    try:
+        return os.fdopen(int(raw_fd), "w", buffering=1, encoding="utf-8")
+    except (OSError, ValueError) as e:
+        _log(f"Ignoring {PROGRESS_FD_ENV}={raw_fd}: {e}")
+        return None
 
-    if STAGING_DIR.exists():
-        shutil.rmtree(STAGING_DIR)
 
-    updated = _dist_snapshot() != initial_dist_snapshot
-    _save_update_flag(updated)
-    print(f"Citation update flag set to {str(updated).lower()}", flush=True)
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Get citations from Google Scholar")
+    parser.add_argument("--scholar", type=str, required=True, help="Google Scholar ID")
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        required=True,
+        help="Per-profile Google Scholar timeout in seconds",
+    )
+    parser.add_argument(
+        "--gen_summary", action="store_true", help="Generate summary for github actions"
+    )
+    args = parser.parse_args()
+    if args.timeout <= 0:
+        parser.error("--timeout must be a positive number of seconds")
+
+    scholar_ids = parse_scholar_ids(args.scholar)
+    if not scholar_ids:
+        parser.error("--scholar must include at least one non-empty Google Scholar ID")
 
-    if args.gen_summary:
-        _write_summary(profile_statuses, wos_status, wos_overwrite_raw is not None)
+    progress_stream = _open_progress_stream()
+    try:
+        run(
+            scholar_ids,
+            args.timeout,
+            gen_summary=args.gen_summary,
+            progress=(
+                None
+                if progress_stream is None
+                else lambda event: progress_stream.write(json.dumps(event) + "\n")
+            ),
+        )
+    finally:
+        if progress_stream is not None:
+            try:
+                progress_stream.close()
+            except OSError:
+                pass
 
 
 if __name__ == "__main__":
@@ -1,5 +1,10 @@
 """Self-hosted service contract for citation badge runtime."""
 
+import time
+
+# Reference point for `STARTUP_PROFILE`: the earliest moment package code runs.
+IMPORT_STARTED_AT = time.perf_counter()
+
 __version__ = "0.1.0"
 
 from .config import Settings
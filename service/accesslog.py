@@ -0,0 +1,203 @@
+"""Buffered, sampled JSON-lines access logging off the request hot path."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from typing import IO, Any, NamedTuple
+
+from .config import Settings
+from .metrics import ServiceMetrics
+
+STDOUT_TARGET = "-"
+DEFAULT_BATCH_SIZE = 256
+_LOGGER = logging.getLogger("citation_badge.service")
+_STOP = object()
+
+
+class AccessRecord(NamedTuple):
+    """Raw request facts captured by the handler; formatting happens in the writer."""
+
+    timestamp: float
+    remote: str
+    method: str
+    path: str
+    status: int
+    response_bytes: int
+    duration_seconds: float
+    route: str
+
+
+def format_access_record(record: AccessRecord) -> str:
+    return json.dumps(
+        {
+            "ts": datetime.fromtimestamp(record.timestamp, timezone.utc).isoformat(),
+            "remote": record.remote,
+            "method": record.method,
+            "path": record.path,
+            "status": record.status,
+            "bytes": record.response_bytes,
+            "latency_ms": round(record.duration_seconds * 1000, 3),
+            "route": record.route,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+class AccessLogger:
+    """Queue access records for a background thread that writes them in batches.
+
+    `log()` never blocks: records are sampled, then dropped (and counted) when
+    the bounded queue is full, so a slow disk cannot stall request threads.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        *,
+        sample_rate: float = 1.0,
+        queue_size: int = 10_000,
+        flush_interval_seconds: float = 1.0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        metrics: ServiceMetrics | None = None,
+    ) -> None:
+        self.target = target
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.flush_interval_seconds = max(0.01, flush_interval_seconds)
+        self.batch_size = max(1, batch_size)
+        self._metrics = metrics
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, queue_size))
+        self._random = random.random
+        self._thread = threading.Thread(
+            target=self._run,
+            name="citation-access-log",
+            daemon=True,
+        )
+        self._closed = False
+        self._stream: IO[str] | None = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        *,
+        metrics: ServiceMetrics | None = None,
+    ) -> AccessLogger | None:
+        if not settings.access_log:
+            return None
+        return cls(
+            settings.access_log,
+            sample_rate=settings.access_log_sample_rate,
+            queue_size=settings.access_log_queue_size,
+            flush_interval_seconds=settings.access_log_flush_interval_seconds,
+            metrics=metrics,
+        )
+
+    def start(self) -> None:
+        if self.target == STDOUT_TARGET:
+            self._stream = sys.stdout
+        else:
+            self._stream = open(self.target, "a", encoding="utf-8")
+        self._thread.start()
+
+    def log(self, record: AccessRecord) -> None:
+        if self._closed:
+            return
+        if self.sample_rate < 1.0 and self._random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._count("dropped")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued records and stop the writer thread."""
+
+        if self._closed:
+            return
+        self._closed = True
+        if not self._thread.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        while self._thread.is_alive():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                self._queue.put(_STOP, timeout=min(remaining, 0.1))
+                break
+            except queue.Full:
+                # Keep the writer draining; it will pick the sentinel up next.
+                continue
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            _LOGGER.warning(
+                "access log writer did not stop within %.1fs; pending=%s",
+                timeout,
+                self._queue.qsize(),
+            )
+            return
+        if self._stream is not None and self._stream is not sys.stdout:
+            self._stream.close()
+
+    def _count(self, result: str, amount: int = 1) -> None:
+        if self._metrics is not None:
+            self._metrics.access_log_records.inc(result, amount=amount)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            # A batch is written once it is full or its first record has
+            # waited `flush_interval_seconds`, whichever comes first.
+            deadline = time.monotonic() + self.flush_interval_seconds
+            batch: list[AccessRecord] = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list[AccessRecord]) -> None:
+        if not batch or self._stream is None:
+            return
+        try:
+            self._stream.write(
+                "".join(format_access_record(record) + "\n" for record in batch)
+            )
+            self._stream.flush()
+        except Exception as error:
+            # Any failure (I/O, encoding, a closed stream) drops this batch
+            # only; the writer thread must keep draining the queue.
+            self._count("dropped", len(batch))
+            _LOGGER.warning(
+                "access log write failed: records=%s error=%s", len(batch), error
+            )
+            return
+        self._count("written", len(batch))
+
+
+__all__ = [
+    "AccessLogger",
+    "AccessRecord",
+    "STDOUT_TARGET",
+    "format_access_record",
+]
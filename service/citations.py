@@ -0,0 +1,23 @@
+"""Names shared by everything that reads a release's `citation.json`."""
+
+from __future__ import annotations
+
+CITATION_JSON_FILENAME = "citation.json"
+GOOGLE_SCHOLAR_METRICS = (
+    "total_citations",
+    "5y_citations",
+    "total_hindex",
+    "5y_hindex",
+    "total_i10index",
+    "5y_i10index",
+)
+WEB_OF_SCIENCE_METRICS = ("peer_reviews",)
+SUPPORTED_METRICS = GOOGLE_SCHOLAR_METRICS + WEB_OF_SCIENCE_METRICS
+
+
+__all__ = [
+    "CITATION_JSON_FILENAME",
+    "GOOGLE_SCHOLAR_METRICS",
+    "SUPPORTED_METRICS",
+    "WEB_OF_SCIENCE_METRICS",
+]
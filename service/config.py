@@ -12,6 +12,31 @@ DEFAULT_CRON_SCHEDULE = "0 * * * *"
 DEFAULT_TIMEZONE = "UTC"
 DEFAULT_REFRESH_ON_STARTUP = True
 DEFAULT_WORKER_TIMEOUT_SECONDS = 180
+# Per-client rate limiting is opt-in: behind a reverse proxy every visitor
+# shares the proxy's address, and so one bucket.
+DEFAULT_RATE_LIMIT_PER_SECOND = 0.0
+DEFAULT_RATE_LIMIT_BURST = 100
+DEFAULT_MAX_INFLIGHT_REQUESTS = 128
+DEFAULT_SERVER_PROCESSES = 1
+DEFAULT_ACCESS_LOG_SAMPLE_RATE = 1.0
+DEFAULT_ACCESS_LOG_QUEUE_SIZE = 10_000
+DEFAULT_ACCESS_LOG_FLUSH_INTERVAL_SECONDS = 1.0
+DEFAULT_STARTUP_PROFILE = False
+DEFAULT_STATUS_FLUSH_DELAY_SECONDS = 0.25
+DEFAULT_MAX_EVENT_STREAMS = 32
+DEFAULT_RELEASE_RETENTION = 3
+STATE_BACKEND_JSON = "json"
+STATE_BACKEND_SQLITE = "sqlite"
+STATE_BACKENDS = (STATE_BACKEND_JSON, STATE_BACKEND_SQLITE)
+DEFAULT_STATE_BACKEND = STATE_BACKEND_JSON
+WORKER_MODE_SUBPROCESS = "subprocess"
+WORKER_MODE_IN_PROCESS = "in_process"
+WORKER_MODES = (WORKER_MODE_SUBPROCESS, WORKER_MODE_IN_PROCESS)
+DEFAULT_WORKER_MODE = WORKER_MODE_SUBPROCESS
+# Refresh resource budgets; 0 disables a budget.
+DEFAULT_REFRESH_WALL_BUDGET_SECONDS = 0.0
+DEFAULT_REFRESH_CPU_BUDGET_SECONDS = 0.0
+DEFAULT_REFRESH_MAX_RSS_BUDGET_MB = 0.0
 
 
 def _get_env_str(name: str, default: str) -> str:
@@ -37,6 +62,26 @@ def _get_env_int(name: str, default: int) -> int:
         return default
 
 
+def _get_env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None:
+        return default
+
+    value = value.strip()
+    if not value:
+        return default
+
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _get_env_choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = _get_env_str(name, default).lower()
+    return value if value in choices else default
+
+
 def _get_env_bool(name: str, default: bool) -> bool:
     value = os.getenv(name)
     if value is None:
@@ -79,6 +124,74 @@ class Settings:
             "WORKER_TIMEOUT_SECONDS",
             DEFAULT_WORKER_TIMEOUT_SECONDS,
         )
+        self.worker_mode = _get_env_choice(
+            "WORKER_MODE",
+            DEFAULT_WORKER_MODE,
+            WORKER_MODES,
+        )
+        self.refresh_wall_budget_seconds = _get_env_float(
+            "REFRESH_WALL_BUDGET_SECONDS",
+            DEFAULT_REFRESH_WALL_BUDGET_SECONDS,
+        )
+        self.refresh_cpu_budget_seconds = _get_env_float(
+            "REFRESH_CPU_BUDGET_SECONDS",
+            DEFAULT_REFRESH_CPU_BUDGET_SECONDS,
+        )
+        self.refresh_max_rss_budget_mb = _get_env_float(
+            "REFRESH_MAX_RSS_BUDGET_MB",
+            DEFAULT_REFRESH_MAX_RSS_BUDGET_MB,
+        )
+        self.rate_limit_per_second = _get_env_float(
+            "RATE_LIMIT_PER_SECOND",
+            DEFAULT_RATE_LIMIT_PER_SECOND,
+        )
+        self.rate_limit_burst = _get_env_int(
+            "RATE_LIMIT_BURST",
+            DEFAULT_RATE_LIMIT_BURST,
+        )
+        self.max_inflight_requests = _get_env_int(
+            "MAX_INFLIGHT_REQUESTS",
+            DEFAULT_MAX_INFLIGHT_REQUESTS,
+        )
+        self.max_event_streams = _get_env_int(
+            "MAX_EVENT_STREAMS",
+            DEFAULT_MAX_EVENT_STREAMS,
+        )
+        self.server_processes = max(
+            1,
+            _get_env_int("SERVER_PROCESSES", DEFAULT_SERVER_PROCESSES),
+        )
+        self.access_log = _get_env_optional_str("ACCESS_LOG")
+        self.access_log_sample_rate = _get_env_float(
+            "ACCESS_LOG_SAMPLE_RATE",
+            DEFAULT_ACCESS_LOG_SAMPLE_RATE,
+        )
+        self.access_log_queue_size = _get_env_int(
+            "ACCESS_LOG_QUEUE_SIZE",
+            DEFAULT_ACCESS_LOG_QUEUE_SIZE,
+        )
+        self.access_log_flush_interval_seconds = _get_env_float(
+            "ACCESS_LOG_FLUSH_INTERVAL_SECONDS",
+            DEFAULT_ACCESS_LOG_FLUSH_INTERVAL_SECONDS,
+        )
+        self.startup_profile = _get_env_bool(
+            "STARTUP_PROFILE",
+            DEFAULT_STARTUP_PROFILE,
+        )
+        self.state_backend = _get_env_choice(
+            "STATE_BACKEND",
+            DEFAULT_STATE_BACKEND,
+            STATE_BACKENDS,
+        )
+        self.status_flush_delay_seconds = _get_env_float(
+            "STATUS_FLUSH_DELAY_SECONDS",
+            DEFAULT_STATUS_FLUSH_DELAY_SECONDS,
+        )
+        self.release_retention = max(
+            1,
+            _get_env_int("RELEASE_RETENTION", DEFAULT_RELEASE_RETENTION),
+        )
+        self.admin_token = _get_env_optional_str("ADMIN_TOKEN")
 
     @property
     def wos_enabled(self) -> bool:
@@ -93,5 +206,23 @@ class Settings:
             "timezone": self.timezone,
             "refresh_on_startup": self.refresh_on_startup,
             "worker_timeout_seconds": self.worker_timeout_seconds,
+            "worker_mode": self.worker_mode,
+            "refresh_wall_budget_seconds": self.refresh_wall_budget_seconds,
+            "refresh_cpu_budget_seconds": self.refresh_cpu_budget_seconds,
+            "refresh_max_rss_budget_mb": self.refresh_max_rss_budget_mb,
+            "rate_limit_per_second": self.rate_limit_per_second,
+            "rate_limit_burst": self.rate_limit_burst,
+            "max_inflight_requests": self.max_inflight_requests,
+            "max_event_streams": self.max_event_streams,
+            "server_processes": self.server_processes,
+            "access_log": self.access_log,
+            "access_log_sample_rate": self.access_log_sample_rate,
+            "access_log_queue_size": self.access_log_queue_size,
+            "access_log_flush_interval_seconds": self.access_log_flush_interval_seconds,
+            "startup_profile": self.startup_profile,
+            "state_backend": self.state_backend,
+            "status_flush_delay_seconds": self.status_flush_delay_seconds,
+            "release_retention": self.release_retention,
+            "admin_token_configured": bool(self.admin_token),
             "wos_overwrite_configured": bool(self.wos_overwrite),
         }
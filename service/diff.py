@@ -0,0 +1,177 @@
+"""Structured change records between two releases.
+
+A diff lists the `dist/`-relative artifacts that were added, removed or whose
+SHA-256 changed, and, for every `citation.json` that changed, the Google
+Scholar metric and per-publication citation deltas. The diff against the
+previously current release is written to `diff.json` when a release is
+finalized, so downstream caches can invalidate only what changed.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+import json
+import os
+from typing import Any
+
+from .citations import CITATION_JSON_FILENAME, GOOGLE_SCHOLAR_METRICS
+from .storage import atomic_write_json
+
+DIFF_FILENAME = "diff.json"
+DIFF_VERSION = 1
+
+
+def _artifact_key(entry: Mapping[str, Any]) -> tuple[Any, Any]:
+    return entry.get("sha256"), entry.get("size")
+
+
+def diff_artifacts(
+    before: Mapping[str, Mapping[str, Any]],
+    after: Mapping[str, Mapping[str, Any]],
+) -> dict[str, list[str]]:
+    """Compare two manifests keyed by path; entries need `sha256` and `size`."""
+
+    return {
+        "added": sorted(path for path in after if path not in before),
+        "removed": sorted(path for path in before if path not in after),
+        "modified": sorted(
+            path
+            for path, entry in after.items()
+            if path in before and _artifact_key(before[path]) != _artifact_key(entry)
+        ),
+    }
+
+
+def _count(value: Any) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def _delta(before: int | None, after: int | None) -> dict[str, int | None]:
+    return {"from": before, "to": after, "delta": (after or 0) - (before or 0)}
+
+
+def _scholar_section(payload: Any) -> Mapping[str, Any]:
+    if isinstance(payload, Mapping):
+        section = payload.get("google_scholar")
+        if isinstance(section, Mapping):
+            return section
+    return {}
+
+
+def _publication_counts(section: Mapping[str, Any]) -> dict[str, int | None]:
+    publications = section.get("publications")
+    if not isinstance(publications, list):
+        return {}
+    return {
+        item["author_pub_id"]: _count(item.get("citations"))
+        for item in publications
+        if isinstance(item, Mapping) and isinstance(item.get("author_pub_id"), str)
+    }
+
+
+def diff_citation_payloads(before: Any, after: Any) -> dict[str, Any]:
+    """Return the changed metrics and publication citation counts.
+
+    A publication only in `after` has `from: null`; one only in `before` has
+    `to: null`.
+    """
+
+    before_section = _scholar_section(before)
+    after_section = _scholar_section(after)
+    metrics = {}
+    for name in GOOGLE_SCHOLAR_METRICS:
+        old, new = _count(before_section.get(name)), _count(after_section.get(name))
+        if old != new:
+            metrics[name] = _delta(old, new)
+
+    old_counts = _publication_counts(before_section)
+    new_counts = _publication_counts(after_section)
+    publications = [
+        {"author_pub_id": author_pub_id, **_delta(old_counts.get(author_pub_id), new)}
+        for author_pub_id, new in new_counts.items()
+        if author_pub_id not in old_counts or old_counts[author_pub_id] != new
+    ]
+    publications.extend(
+        {"author_pub_id": author_pub_id, **_delta(old, None)}
+        for author_pub_id, old in old_counts.items()
+        if author_pub_id not in new_counts
+    )
+    publications.sort(key=lambda item: item["author_pub_id"])
+    return {"metrics": metrics, "publications": publications}
+
+
+def _load_payload(dist_dir: str, path: str) -> Any:
+    try:
+        with open(os.path.join(dist_dir, path), "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def build_release_diff(
+    from_release: str,
+    from_dist_dir: str,
+    from_artifacts: Mapping[str, Mapping[str, Any]],
+    to_release: str,
+    to_dist_dir: str,
+    to_artifacts: Mapping[str, Mapping[str, Any]],
+) -> dict[str, Any]:
+    """Diff two releases given each one's `dist/` and artifact entries.
+
+    Only `citation.json` files whose digest changed are parsed.
+    """
+
+    artifacts = diff_artifacts(from_artifacts, to_artifacts)
+    citations = []
+    for path in sorted(
+        {*artifacts["added"], *artifacts["removed"], *artifacts["modified"]}
+    ):
+        if os.path.basename(path) != CITATION_JSON_FILENAME:
+            continue
+        change = diff_citation_payloads(
+            _load_payload(from_dist_dir, path) if path in from_artifacts else None,
+            _load_payload(to_dist_dir, path) if path in to_artifacts else None,
+        )
+        if change["metrics"] or change["publications"]:
+            citations.append({"path": path, **change})
+    return {
+        "version": DIFF_VERSION,
+        "from": from_release,
+        "to": to_release,
+        "artifacts": artifacts,
+        "unchanged": len(to_artifacts)
+        - len(artifacts["added"])
+        - len(artifacts["modified"]),
+        "citations": citations,
+    }
+
+
+def write_release_diff(release_dir: str, diff: Mapping[str, Any]) -> None:
+    atomic_write_json(os.path.join(release_dir, DIFF_FILENAME), diff, compact=True)
+
+
+def load_release_diff(release_dir: str) -> dict[str, Any] | None:
+    """Return the diff stored with a release, or None when it has none."""
+
+    try:
+        with open(
+            os.path.join(release_dir, DIFF_FILENAME), "r", encoding="utf-8"
+        ) as handle:
+            diff = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(diff, dict) or diff.get("version") != DIFF_VERSION:
+        return None
+    return diff
+
+
+__all__ = [
+    "DIFF_FILENAME",
+    "build_release_diff",
+    "diff_artifacts",
+    "diff_citation_payloads",
+    "load_release_diff",
+    "write_release_diff",
+]
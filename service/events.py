@@ -0,0 +1,110 @@
+"""In-process event fan-out for `/events` streams and `/status` long-polls."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from typing import Any
+
+DEFAULT_EVENT_HISTORY = 64
+
+REFRESH_STARTED = "refresh_started"
+REFRESH_FINISHED = "refresh_finished"
+RELEASE_CHANGED = "release_changed"
+_LOGGER = logging.getLogger("citation_badge.service")
+
+
+@dataclass(frozen=True)
+class ServiceEvent:
+    """One published notification with a broker-wide sequence number."""
+
+    sequence: int
+    event_type: str
+    data: Mapping[str, Any] = field(default_factory=dict)
+
+
+class EventBroker:
+    """Wake blocked waiters when events are published, without polling.
+
+    Waiters block on a condition variable keyed by the last sequence they saw;
+    a bounded history lets reconnecting SSE clients resume via Last-Event-ID.
+    """
+
+    def __init__(self, history: int = DEFAULT_EVENT_HISTORY) -> None:
+        self._condition = threading.Condition()
+        self._events: deque[ServiceEvent] = deque(maxlen=max(1, history))
+        self._sequence = 0
+        self._closed = False
+        self._listeners: list[Callable[[ServiceEvent], object]] = []
+
+    @property
+    def sequence(self) -> int:
+        with self._condition:
+            return self._sequence
+
+    @property
+    def closed(self) -> bool:
+        with self._condition:
+            return self._closed
+
+    def publish(
+        self,
+        event_type: str,
+        data: Mapping[str, Any] | None = None,
+    ) -> ServiceEvent:
+        with self._condition:
+            self._sequence += 1
+            event = ServiceEvent(self._sequence, event_type, dict(data or {}))
+            self._events.append(event)
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as error:
+                _LOGGER.warning(
+                    "event listener failed: event=%s error=%s", event.event_type, error
+                )
+        return event
+
+    def add_listener(self, listener: Callable[[ServiceEvent], object]) -> None:
+        """Call `listener` with every event published after this point."""
+
+        with self._condition:
+            self._listeners.append(listener)
+
+    def events_after(self, sequence: int) -> list[ServiceEvent]:
+        with self._condition:
+            return [event for event in self._events if event.sequence > sequence]
+
+    def wait_for(self, sequence: int, timeout: float) -> list[ServiceEvent]:
+        """Block until an event newer than `sequence` exists, the timeout, or close."""
+
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._condition:
+            while self._sequence <= sequence and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+            return [event for event in self._events if event.sequence > sequence]
+
+    def close(self) -> None:
+        """Release every waiter, for example during server shutdown."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+__all__ = [
+    "EventBroker",
+    "REFRESH_FINISHED",
+    "REFRESH_STARTED",
+    "RELEASE_CHANGED",
+    "ServiceEvent",
+]
@@ -0,0 +1,636 @@
+"""In-memory lookup indexes built once per promoted release."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from email.utils import formatdate
+import json
+import os
+import re
+import threading
+from typing import Any
+
+from .citations import (
+    CITATION_JSON_FILENAME,
+    GOOGLE_SCHOLAR_METRICS,
+    SUPPORTED_METRICS,
+    WEB_OF_SCIENCE_METRICS,
+)
+from .metrics import ServiceMetrics
+from .promote import (
+    DIST_DIRNAME,
+    MANIFEST_FILENAME,
+    artifact_content_type,
+    compute_release_diff,
+    current_release_path,
+    load_manifest,
+)
+from .storage import get_state_layout
+
+DIFF_CACHE_ENTRIES = 16
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_ROOT_SVG_PATH = re.compile(r"^/[A-Za-z0-9][A-Za-z0-9_.-]*\.svg$")
+_PROFILE_ARTIFACT_PATH = re.compile(
+    r"^/(?P<profile>[A-Za-z0-9_-]{1,64})"
+    r"/(?P<artifact>citation\.json|[A-Za-z0-9][A-Za-z0-9_.-]*\.svg)$"
+)
+_SERVABLE_SUFFIXES = (".svg", ".json")
+PUBLICATION_SORT_KEYS = ("citations", "year", "title")
+# Natural direction per sort key: most cited and newest first, titles A-Z.
+DEFAULT_SORT_DESCENDING = {"citations": True, "year": True, "title": False}
+
+
+def badge_id(author_pub_id: str) -> str:
+    """Return the badge filename stem that `main.py` writes for a publication."""
+
+    return author_pub_id.replace(":", "_")
+
+
+def artifact_route(path: str) -> tuple[str, str] | None:
+    """Classify a request path shaped like a release artifact.
+
+    Returns the route label and the `dist/`-relative name, or None when the
+    path can never name an artifact.
+    """
+
+    if path == "/citation.json":
+        return "citation_json", CITATION_JSON_FILENAME
+    if _ROOT_SVG_PATH.fullmatch(path) is not None:
+        return "svg", path[1:]
+    profile_match = _PROFILE_ARTIFACT_PATH.fullmatch(path)
+    if profile_match is None:
+        return None
+    if profile_match.group("artifact") == CITATION_JSON_FILENAME:
+        return "profile_citation_json", path[1:]
+    return "profile_svg", path[1:]
+
+
+def _source_section(payload: Mapping[str, Any], source_name: str) -> Mapping[str, Any]:
+    section = payload.get(source_name)
+    if not isinstance(section, Mapping):
+        return {}
+    return section
+
+
+def _parse_year(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+    return None
+
+
+def _parse_citations(value: Any) -> int:
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return 0
+
+
+class PublicationIndex:
+    """Precomputed orderings over the publication list for paginated queries."""
+
+    def __init__(self, publications: Sequence[Mapping[str, Any]]) -> None:
+        records: list[dict[str, Any]] = []
+        for publication in publications:
+            author_pub_id = publication.get("author_pub_id")
+            if not isinstance(author_pub_id, str) or not author_pub_id:
+                continue
+            title = publication.get("title")
+            records.append(
+                {
+                    "author_pub_id": author_pub_id,
+                    "badge_id": badge_id(author_pub_id),
+                    "title": title if isinstance(title, str) else "",
+                    "year": publication.get("year"),
+                    "citations": publication.get("citations"),
+                }
+            )
+        self.records = tuple(records)
+
+        years = [_parse_year(record["year"]) for record in records]
+        citations = [_parse_citations(record["citations"]) for record in records]
+        title_keys = [record["title"].casefold() for record in records]
+        positions = range(len(records))
+
+        # Ties always fall back to A-Z title order, in both directions, so
+        # every ordering is deterministic and reversing never flips ties.
+        by_title = sorted(positions, key=lambda position: (title_keys[position], position))
+        title_rank = {position: rank for rank, position in enumerate(by_title)}
+        # Publications without a year sort after dated ones in either direction.
+        self._orders: dict[tuple[str, bool], tuple[int, ...]] = {
+            ("title", False): tuple(by_title),
+            # sorted(reverse=True) is stable, so equal titles keep position order.
+            ("title", True): tuple(
+                sorted(by_title, key=title_keys.__getitem__, reverse=True)
+            ),
+            ("citations", True): tuple(
+                sorted(
+                    positions,
+                    key=lambda position: (-citations[position], title_rank[position]),
+                )
+            ),
+            ("citations", False): tuple(
+                sorted(
+                    positions,
+                    key=lambda position: (citations[position], title_rank[position]),
+                )
+            ),
+            ("year", True): tuple(
+                sorted(
+                    positions,
+                    key=lambda position: (
+                        years[position] is None,
+                        -(years[position] or 0),
+                        title_rank[position],
+                    ),
+                )
+            ),
+            ("year", False): tuple(
+                sorted(
+                    positions,
+                    key=lambda position: (
+                        years[position] is None,
+                        years[position] or 0,
+                        title_rank[position],
+                    ),
+                )
+            ),
+        }
+        self._ranks = {
+            key: {position: rank for rank, position in enumerate(order)}
+            for key, order in self._orders.items()
+        }
+        self._sorted_title_keys = [title_keys[position] for position in by_title]
+
+        # Dated publications in both year orders, with parallel year keys for
+        # bisecting a year range; descending keys are negated to stay ascending.
+        dated_count = sum(year is not None for year in years)
+        self._dated = {
+            descending: self._orders[("year", descending)][:dated_count]
+            for descending in (False, True)
+        }
+        self._dated_year_keys = {
+            descending: [
+                -years[position] if descending else years[position]
+                for position in dated
+            ]
+            for descending, dated in self._dated.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _title_matches(self, title_prefix: str) -> Sequence[int]:
+        prefix = title_prefix.casefold()
+        start = bisect_left(self._sorted_title_keys, prefix)
+        end = start
+        while end < len(self._sorted_title_keys) and self._sorted_title_keys[
+            end
+        ].startswith(prefix):
+            end += 1
+        return self._orders[("title", False)][start:end]
+
+    def _year_range(
+        self,
+        year_from: int | None,
+        year_to: int | None,
+        *,
+        descending: bool,
+    ) -> Sequence[int]:
+        """Slice the dated year order to `[year_from, year_to]` by bisection."""
+
+        keys = self._dated_year_keys[descending]
+        low, high = (year_to, year_from) if descending else (year_from, year_to)
+        if descending:
+            low = None if low is None else -low
+            high = None if high is None else -high
+        start = 0 if low is None else bisect_left(keys, low)
+        end = len(keys) if high is None else bisect_right(keys, high)
+        return self._dated[descending][start:end]
+
+    def _in_order(
+        self, positions: Iterable[int], order_key: tuple[str, bool]
+    ) -> list[int]:
+        return sorted(positions, key=self._ranks[order_key].__getitem__)
+
+    def query(
+        self,
+        *,
+        sort: str = "citations",
+        descending: bool | None = None,
+        offset: int = 0,
+        limit: int = 20,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        title_prefix: str | None = None,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        """Return the total match count and one page of publication records."""
+
+        if sort not in DEFAULT_SORT_DESCENDING:
+            raise ValueError(
+                f"Unsupported sort '{sort}'. Expected one of {list(PUBLICATION_SORT_KEYS)}"
+            )
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must be non-negative")
+
+        if descending is None:
+            descending = DEFAULT_SORT_DESCENDING[sort]
+        order_key = (sort, descending)
+        filter_years = year_from is not None or year_to is not None
+
+        positions: Sequence[int]
+        if filter_years:
+            in_range = self._year_range(
+                year_from, year_to, descending=sort == "year" and descending
+            )
+            if title_prefix:
+                matches = set(self._title_matches(title_prefix))
+                in_range = [position for position in in_range if position in matches]
+            positions = in_range if sort == "year" else self._in_order(in_range, order_key)
+        elif title_prefix:
+            matches = self._title_matches(title_prefix)
+            positions = (
+                matches
+                if order_key == ("title", False)
+                else self._in_order(matches, order_key)
+            )
+        else:
+            positions = self._orders[order_key]
+
+        page = positions[offset : offset + limit]
+        return len(positions), [self.records[position] for position in page]
+
+
+def _scan_servable_files(directory: str) -> dict[str, str]:
+    files: dict[str, str] = {}
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return files
+    for entry in entries:
+        if entry.name.startswith(".") or not entry.name.endswith(_SERVABLE_SUFFIXES):
+            continue
+        if entry.is_file(follow_symlinks=False):
+            files[entry.name] = entry.path
+    return files
+
+
+def _manifest_artifacts(
+    release_dir: str, manifest: Mapping[str, Any]
+) -> dict[str, str]:
+    """Map the servable files a manifest lists, with the layout `scan` accepts."""
+
+    dist_dir = os.path.join(release_dir, DIST_DIRNAME)
+    artifacts: dict[str, str] = {}
+    for name in manifest:
+        parts = name.split("/")
+        if len(parts) > 2 or not name.endswith(_SERVABLE_SUFFIXES):
+            continue
+        if any(part.startswith(".") for part in parts):
+            continue
+        if len(parts) == 2 and not PROFILE_ID_PATTERN.fullmatch(parts[0]):
+            continue
+        artifacts[name] = os.path.join(dist_dir, *parts)
+    return artifacts
+
+
+@dataclass(frozen=True, slots=True)
+class Artifact:
+    """A servable release file and the response headers known for it."""
+
+    route: str
+    file_path: str
+    content_type: str
+    size: int | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+def _build_artifact(
+    route: str,
+    name: str,
+    file_path: str,
+    entry: Mapping[str, Any] | None,
+) -> Artifact:
+    content_type = artifact_content_type(name)
+    if entry is None:
+        return Artifact(route, file_path, content_type)
+    size = entry.get("size")
+    digest = entry.get("sha256")
+    mtime = entry.get("mtime")
+    if isinstance(entry.get("content_type"), str):
+        content_type = entry["content_type"]
+    return Artifact(
+        route,
+        file_path,
+        content_type,
+        size=size if isinstance(size, int) and not isinstance(size, bool) else None,
+        etag=f'"{digest}"' if isinstance(digest, str) and digest else None,
+        last_modified=(
+            formatdate(mtime, usegmt=True)
+            if isinstance(mtime, (int, float)) and not isinstance(mtime, bool)
+            else None
+        ),
+    )
+
+
+def scan_release_artifacts(release_dir: str) -> dict[str, str]:
+    """Map each servable `dist/` file, including per-profile ones, to its path.
+
+    Keys are slash-separated paths relative to `dist/`, such as `all.svg` or
+    `<scholar_id>/citation.json`; only one level of profile directories is
+    scanned because that is the only layout `main.py` writes.
+    """
+
+    dist_dir = os.path.join(release_dir, DIST_DIRNAME)
+    artifacts = _scan_servable_files(dist_dir)
+    try:
+        entries = list(os.scandir(dist_dir))
+    except OSError:
+        return artifacts
+    for entry in entries:
+        if not PROFILE_ID_PATTERN.fullmatch(entry.name):
+            continue
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        for filename, path in _scan_servable_files(entry.path).items():
+            artifacts[f"{entry.name}/{filename}"] = path
+    return artifacts
+
+
+class ReleaseIndex:
+    """Immutable lookup tables over one release's `citation.json` and `dist/` tree."""
+
+    def __init__(
+        self,
+        release_dir: str,
+        citation_payload: Any,
+        artifacts: Mapping[str, str] | None = None,
+        manifest: Mapping[str, Mapping[str, Any]] | None = None,
+    ) -> None:
+        self.release_dir = release_dir
+        self.has_manifest = manifest is not None
+        self.artifacts = dict(artifacts or {})
+        self.profile_ids = frozenset(
+            name.split("/", 1)[0] for name in self.artifacts if "/" in name
+        )
+        # Request path -> artifact for every servable file, so hits and misses
+        # alike are answered without filesystem probes. With a manifest, the
+        # size, ETag and Last-Modified headers are known up front as well.
+        routes: dict[str, Artifact] = {}
+        for name, path in self.artifacts.items():
+            route = artifact_route("/" + name)
+            if route is not None:
+                routes["/" + name] = _build_artifact(
+                    route[0],
+                    name,
+                    path,
+                    manifest.get(name) if manifest is not None else None,
+                )
+        self.routes = routes
+        payload = citation_payload if isinstance(citation_payload, Mapping) else {}
+        google_scholar = _source_section(payload, "google_scholar")
+        web_of_science = _source_section(payload, "web_of_science")
+
+        metrics: dict[str, Any] = {
+            name: google_scholar.get(name) for name in GOOGLE_SCHOLAR_METRICS
+        }
+        metrics.update(
+            {name: web_of_science.get(name) for name in WEB_OF_SCIENCE_METRICS}
+        )
+        self.metrics = metrics
+
+        citations_by_id: dict[str, Any] = {}
+        publications = google_scholar.get("publications")
+        if not isinstance(publications, list):
+            publications = []
+        publications = [item for item in publications if isinstance(item, Mapping)]
+        self.publications = PublicationIndex(publications)
+        for record in self.publications.records:
+            # Accept both the Scholar id and the badge filename stem.
+            citations_by_id[record["author_pub_id"]] = record["citations"]
+            citations_by_id[record["badge_id"]] = record["citations"]
+        self.citations_by_id = citations_by_id
+
+    @property
+    def run_id(self) -> str:
+        return os.path.basename(self.release_dir)
+
+    def artifact_path(self, relative_path: str) -> str | None:
+        """Resolve a `dist/`-relative artifact name without touching the filesystem."""
+
+        return self.artifacts.get(relative_path)
+
+    def counts(
+        self,
+        publication_ids: Iterable[str],
+        metric_names: Iterable[str],
+    ) -> dict[str, Any]:
+        """Look up each requested id and metric, reporting unknown keys as null."""
+
+        return {
+            "release": self.run_id,
+            "metrics": {name: self.metrics.get(name) for name in metric_names},
+            "publications": {
+                publication_id: self.citations_by_id.get(publication_id)
+                for publication_id in publication_ids
+            },
+        }
+
+
+def build_release_index(release_dir: str) -> ReleaseIndex:
+    """Parse a release's `citation.json` and list its artifacts once.
+
+    The artifacts come from `manifest.json`; releases promoted before
+    manifests existed are scanned instead.
+    """
+
+    citation_json_path = os.path.join(
+        release_dir, DIST_DIRNAME, CITATION_JSON_FILENAME
+    )
+    try:
+        with open(citation_json_path, "r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, json.JSONDecodeError, TypeError, ValueError):
+        payload = None
+    manifest = load_manifest(release_dir)
+    if manifest is None:
+        return ReleaseIndex(release_dir, payload, scan_release_artifacts(release_dir))
+    return ReleaseIndex(
+        release_dir,
+        payload,
+        _manifest_artifacts(release_dir, manifest),
+        manifest,
+    )
+
+
+class ReleaseIndexCache:
+    """Hold the index for the most recently requested release."""
+
+    def __init__(self, metrics: ServiceMetrics | None = None) -> None:
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._index: ReleaseIndex | None = None
+
+    def _is_current(self, index: ReleaseIndex | None, release_dir: str) -> bool:
+        if index is None or index.release_dir != release_dir:
+            return False
+        # A renamed release goes live before its manifest is written; pick
+        # the manifest up once it appears.
+        return index.has_manifest or not os.path.exists(
+            os.path.join(release_dir, MANIFEST_FILENAME)
+        )
+
+    def get(self, release_dir: str) -> ReleaseIndex:
+        index = self._index
+        hit = self._is_current(index, release_dir)
+        if self._metrics is not None:
+            self._metrics.record_cache_lookup("release_index", hit)
+        if hit and index is not None:
+            return index
+
+        with self._lock:
+            index = self._index
+            if not self._is_current(index, release_dir):
+                index = build_release_index(release_dir)
+                self._index = index
+            return index
+
+    def warm(self, release_dir: str) -> ReleaseIndex:
+        """Build the index for a newly promoted release ahead of the first request."""
+
+        index = build_release_index(release_dir)
+        with self._lock:
+            self._index = index
+        return index
+
+
+class ReleaseDiffCache:
+    """Hold the most recently requested diffs between retained releases.
+
+    Releases never change once promoted, so a diff stays valid as long as its
+    releases exist. Diffs are computed from manifests only (a release without
+    one raises `MissingManifestError`) and one at a time, so `/diff` requests
+    cannot make the service hash release files.
+    """
+
+    def __init__(
+        self,
+        metrics: ServiceMetrics | None = None,
+        *,
+        max_entries: int = DIFF_CACHE_ENTRIES,
+    ) -> None:
+        self._metrics = metrics
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._diffs: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+
+    def get(self, from_release_dir: str, to_release_dir: str) -> dict[str, Any]:
+        key = (from_release_dir, to_release_dir)
+        with self._lock:
+            diff = self._diffs.get(key)
+            if self._metrics is not None:
+                self._metrics.record_cache_lookup("release_diff", diff is not None)
+            if diff is not None:
+                self._diffs.move_to_end(key)
+                return diff
+            diff = compute_release_diff(
+                from_release_dir, to_release_dir, require_manifests=True
+            )
+            self._diffs[key] = diff
+            if len(self._diffs) > self._max_entries:
+                self._diffs.popitem(last=False)
+            return diff
+
+
+def _pointer_key(current_pointer: str) -> tuple[int, int] | None:
+    try:
+        stat_result = os.lstat(current_pointer)
+    except FileNotFoundError:
+        return None
+    return stat_result.st_ino, stat_result.st_mtime_ns
+
+
+class CurrentRelease:
+    """Memoize which release `STATE_DIR/current` points at, and its index.
+
+    Each lookup costs one `lstat` of the pointer: promotion replaces the
+    symlink, so its inode and mtime change and the next lookup re-resolves it,
+    whichever process promoted. The snapshot is a single tuple replaced in one
+    assignment, so request threads never see a key paired with another index.
+    """
+
+    def __init__(
+        self,
+        state_dir: str,
+        indexes: ReleaseIndexCache,
+        *,
+        metrics: ServiceMetrics | None = None,
+    ) -> None:
+        self.state_dir = state_dir
+        self.current_pointer = get_state_layout(state_dir).current_pointer
+        self._indexes = indexes
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._snapshot: tuple[object, ReleaseIndex | None] = (object(), None)
+
+    def get(self) -> ReleaseIndex | None:
+        key = _pointer_key(self.current_pointer)
+        cached_key, index = self._snapshot
+        # A pointer whose target is missing is retried on every lookup.
+        hit = key == cached_key and (index is not None or key is None)
+        if self._metrics is not None:
+            self._metrics.record_cache_lookup("current_release", hit)
+        if hit:
+            return index
+        return self.reload()
+
+    def reload(self) -> ReleaseIndex | None:
+        """Re-resolve the pointer now, for example after a release vanished."""
+
+        with self._lock:
+            # Read the key first: if the pointer moves while resolving, the
+            # stored key is already stale and the next lookup resolves again.
+            key = _pointer_key(self.current_pointer)
+            release_dir = current_release_path(self.state_dir)
+            index = self._indexes.get(release_dir) if release_dir else None
+            self._snapshot = (key, index)
+            return index
+
+    def set(self, release_dir: str) -> ReleaseIndex | None:
+        """Adopt a release this process just promoted."""
+
+        self._indexes.warm(release_dir)
+        return self.reload()
+
+
+__all__ = [
+    "Artifact",
+    "CurrentRelease",
+    "DEFAULT_SORT_DESCENDING",
+    "GOOGLE_SCHOLAR_METRICS",
+    "PROFILE_ID_PATTERN",
+    "PUBLICATION_SORT_KEYS",
+    "PublicationIndex",
+    "ReleaseIndex",
+    "ReleaseDiffCache",
+    "ReleaseIndexCache",
+    "SUPPORTED_METRICS",
+    "WEB_OF_SCIENCE_METRICS",
+    "artifact_route",
+    "badge_id",
+    "build_release_index",
+    "scan_release_artifacts",
+]
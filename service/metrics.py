@@ -0,0 +1,389 @@
+"""In-process metrics registry with Prometheus text exposition for the service."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+import math
+import threading
+
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+DEFAULT_REFRESH_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 180.0, 300.0, 600.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(
+    labelnames: Sequence[str],
+    labelvalues: Sequence[str],
+    extra: Sequence[tuple[str, str]] = (),
+) -> str:
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in pairs
+    )
+    return "{" + rendered + "}"
+
+
+class _Metric(ABC):
+    metric_type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_key(self, labelvalues: Sequence[object]) -> LabelValues:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labelvalues)}"
+            )
+        return tuple(str(value) for value in labelvalues)
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Return the exposition lines for this metric, header included."""
+
+
+class Counter(_Metric):
+    """Monotonic counter keyed by label values."""
+
+    metric_type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: object, amount: float = 1.0) -> None:
+        key = self._label_key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: object) -> float:
+        key = self._label_key(labelvalues)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def snapshot(self) -> dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Gauge(_Metric):
+    """Point-in-time value keyed by label values."""
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labelvalues: object) -> None:
+        key = self._label_key(labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def add(self, amount: float, *labelvalues: object) -> None:
+        key = self._label_key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: object) -> float:
+        key = self._label_key(labelvalues)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def snapshot(self) -> dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram(_Metric):
+    """Bucketed distribution that stores per-bucket counts and cumulates on render."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        if not self.buckets:
+            raise ValueError(f"Histogram '{name}' requires at least one bucket")
+        # Each series is [bucket counts..., +Inf count, sum]; observe() only
+        # touches one bucket slot so the locked section stays constant-time.
+        self._series: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, *labelvalues: object) -> None:
+        key = self._label_key(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = series
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: object) -> int:
+        key = self._label_key(labelvalues)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return 0
+            return int(sum(series[:-1]))
+
+    def snapshot(self) -> dict[LabelValues, list[float]]:
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, series in sorted(self.snapshot().items()):
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, key, (("le", _format_value(bound)),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            cumulative += series[len(self.buckets)]
+            labels = _format_labels(self.labelnames, key, (("le", "+Inf"),))
+            lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            plain_labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{plain_labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{plain_labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together on `/metrics`."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ServiceMetrics:
+    """The fixed metric set recorded by the HTTP handler and refresh runtime."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        self.registry = registry or MetricsRegistry()
+        self.http_requests = self.registry.counter(
+            "citation_badge_http_requests_total",
+            "HTTP requests served, by route, method and status code.",
+            ("route", "method", "status"),
+        )
+        self.http_request_duration = self.registry.histogram(
+            "citation_badge_http_request_duration_seconds",
+            "HTTP request handling latency in seconds, by route.",
+            ("route",),
+        )
+        self.http_response_bytes = self.registry.counter(
+            "citation_badge_http_response_bytes_total",
+            "HTTP response body bytes sent, by route.",
+            ("route",),
+        )
+        self.http_rejections = self.registry.counter(
+            "citation_badge_http_rejections_total",
+            "HTTP requests refused before routing, by reason.",
+            ("reason",),
+        )
+        self.access_log_records = self.registry.counter(
+            "citation_badge_access_log_records_total",
+            "Access log records, by result (written or dropped).",
+            ("result",),
+        )
+        self.cache_lookups = self.registry.counter(
+            "citation_badge_cache_lookups_total",
+            "In-memory cache lookups, by cache and result (hit or miss).",
+            ("cache", "result"),
+        )
+        self.refresh_duration = self.registry.histogram(
+            "citation_badge_refresh_duration_seconds",
+            "Refresh wall time in seconds, by trigger and outcome.",
+            ("trigger", "outcome"),
+            buckets=DEFAULT_REFRESH_BUCKETS,
+        )
+        self.artifact_integrity_failures = self.registry.counter(
+            "citation_badge_artifact_integrity_failures_total",
+            "Artifact responses refused because the file size on disk did not match the release manifest.",
+        )
+        self.worker_exits = self.registry.counter(
+            "citation_badge_worker_exits_total",
+            "Worker subprocess exits, by exit code or terminal reason.",
+            ("code",),
+        )
+        self.refresh_budget_exceeded = self.registry.counter(
+            "citation_badge_refresh_budget_exceeded_total",
+            "Refreshes that went over a configured resource budget, by budget.",
+            ("budget",),
+        )
+
+    def observe_request(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        response_bytes: int,
+        duration_seconds: float,
+    ) -> None:
+        self.http_requests.inc(route, method, status)
+        self.http_request_duration.observe(duration_seconds, route)
+        if response_bytes:
+            self.http_response_bytes.inc(route, amount=response_bytes)
+
+    def record_cache_lookup(self, cache: str, hit: bool) -> None:
+        self.cache_lookups.inc(cache, "hit" if hit else "miss")
+
+    def render(self) -> str:
+        return self.registry.render() + self._render_cache_hit_ratios()
+
+    def _render_cache_hit_ratios(self) -> str:
+        totals: dict[str, list[float]] = {}
+        for (cache, result), value in self.cache_lookups.snapshot().items():
+            hits_and_total = totals.setdefault(cache, [0.0, 0.0])
+            if result == "hit":
+                hits_and_total[0] += value
+            hits_and_total[1] += value
+
+        name = "citation_badge_cache_hit_ratio"
+        lines = [
+            f"# HELP {name} Fraction of cache lookups served from memory, by cache.",
+            f"# TYPE {name} gauge",
+        ]
+        for cache, (hits, total) in sorted(totals.items()):
+            ratio = hits / total if total else 0.0
+            lines.append(f'{name}{{cache="{_escape_label_value(cache)}"}} {ratio!r}')
+        return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "Counter",
+    "DEFAULT_LATENCY_BUCKETS",
+    "DEFAULT_REFRESH_BUCKETS",
+    "EXPOSITION_CONTENT_TYPE",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "ServiceMetrics",
+]
@@ -0,0 +1,242 @@
+"""Content-addressed blob store shared by all retained releases.
+
+Every file of a promoted release is a hardlink to
+`STATE_DIR/objects/<first two hex digits>/<rest of the SHA-256>`, so bytes that
+did not change between refreshes are stored once and a promotion only writes
+the blobs it has not seen before. Blobs are read-only and never modified in
+place. A blob whose only remaining link is its store entry belongs to no
+release and is removed by `collect_objects`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import tempfile
+
+_READ_CHUNK_BYTES = 1024 * 1024
+_TEMP_SUFFIX = ".tmp"
+# Filesystems without hardlinks get plain copies instead.
+_NO_HARDLINK_ERRNOS = frozenset(
+    {errno.EPERM, errno.EXDEV, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP}
+)
+_LOGGER = logging.getLogger("citation_badge.service")
+
+
+@dataclass(frozen=True, slots=True)
+class StoredFile:
+    """One file linked into a release by `link_tree`."""
+
+    relative_path: str
+    digest: str
+    size: int
+    written: int
+
+
+def object_path(objects_dir: str, digest: str) -> str:
+    return os.path.join(objects_dir, digest[:2], digest[2:])
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_READ_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_object(objects_dir: str, source_path: str) -> tuple[str, str, int]:
+    """Add `source_path` to the store; return its blob, digest and bytes written.
+
+    Nothing is written when a blob with the same content already exists.
+    """
+
+    digest = file_digest(source_path)
+    blob_path = object_path(objects_dir, digest)
+    if os.path.exists(blob_path):
+        return blob_path, digest, 0
+
+    blob_dir = os.path.dirname(blob_path)
+    os.makedirs(blob_dir, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=blob_dir,
+        prefix=".",
+        suffix=_TEMP_SUFFIX,
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb") as handle:
+            with open(source_path, "rb") as source:
+                shutil.copyfileobj(source, handle, _READ_CHUNK_BYTES)
+            written = handle.tell()
+        os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        try:
+            os.link(temp_path, blob_path)
+        except FileExistsError:
+            # Another promotion stored the same content first.
+            written = 0
+        except OSError as error:
+            if error.errno not in _NO_HARDLINK_ERRNOS:
+                raise
+            os.replace(temp_path, blob_path)
+    finally:
+        if os.path.lexists(temp_path):
+            os.unlink(temp_path)
+    return blob_path, digest, written
+
+
+def _link_or_copy(blob_path: str, destination: str) -> None:
+    try:
+        os.link(blob_path, destination)
+    except OSError as error:
+        if error.errno not in _NO_HARDLINK_ERRNOS:
+            raise
+        shutil.copyfile(blob_path, destination)
+
+
+def link_tree(source_dir: str, target_dir: str, objects_dir: str) -> list[StoredFile]:
+    """Recreate `source_dir` at `target_dir` as hardlinks into the store.
+
+    Relative paths in the result use `/` separators.
+    """
+
+    stored_files = []
+    for root, _, filenames in os.walk(source_dir, followlinks=True):
+        relative_root = os.path.relpath(root, source_dir)
+        destination_root = os.path.normpath(os.path.join(target_dir, relative_root))
+        os.makedirs(destination_root, exist_ok=True)
+        for filename in filenames:
+            source_path = os.path.join(root, filename)
+            destination = os.path.join(destination_root, filename)
+            try:
+                blob_path, digest, written = store_object(objects_dir, source_path)
+                _link_or_copy(blob_path, destination)
+            except FileNotFoundError:
+                # `collect_objects` removed the blob between lookup and link
+                # because no release used it yet; store it again.
+                blob_path, digest, written = store_object(objects_dir, source_path)
+                _link_or_copy(blob_path, destination)
+            relative_path = os.path.relpath(destination, target_dir)
+            stored_files.append(
+                StoredFile(
+                    relative_path.replace(os.sep, "/"),
+                    digest,
+                    os.stat(destination).st_size,
+                    written,
+                )
+            )
+    return stored_files
+
+
+def _adopt_file(objects_dir: str, path: str) -> tuple[str, int]:
+    digest = file_digest(path)
+    blob_path = object_path(objects_dir, digest)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    try:
+        # New content: the file itself becomes the blob, without a copy.
+        os.link(path, blob_path)
+        os.chmod(blob_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        return digest, os.stat(path).st_size
+    except FileExistsError:
+        pass
+    except OSError as error:
+        if error.errno not in _NO_HARDLINK_ERRNOS:
+            raise
+        return digest, 0
+
+    # Known content: swap the duplicate for a link to the existing blob.
+    temp_path = os.path.join(
+        os.path.dirname(path),
+        f".{os.path.basename(path)}.{digest[:16]}{_TEMP_SUFFIX}",
+    )
+    try:
+        os.link(blob_path, temp_path)
+        os.replace(temp_path, path)
+    except FileNotFoundError:
+        # Collected since the link attempt; adopt this copy instead.
+        return _adopt_file(objects_dir, path)
+    except OSError as error:
+        if os.path.lexists(temp_path):
+            os.unlink(temp_path)
+        if error.errno not in _NO_HARDLINK_ERRNOS:
+            raise
+    return digest, 0
+
+
+def adopt_tree(directory: str, objects_dir: str) -> list[StoredFile]:
+    """Move the files of `directory` into the store in place, without copies.
+
+    Files with new content become blobs themselves; files whose content is
+    already stored are replaced by links to the existing blob. Each
+    replacement is an atomic rename of identical bytes, so the tree can be
+    served while this runs.
+    """
+
+    stored_files = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.endswith(_TEMP_SUFFIX):
+                continue
+            path = os.path.join(root, filename)
+            if os.path.islink(path):
+                continue
+            digest, written = _adopt_file(objects_dir, path)
+            stored_files.append(
+                StoredFile(
+                    os.path.relpath(path, directory).replace(os.sep, "/"),
+                    digest,
+                    os.stat(path).st_size,
+                    written,
+                )
+            )
+    return stored_files
+
+
+def collect_objects(objects_dir: str) -> tuple[int, int]:
+    """Delete blobs no release links to; return (blobs, bytes) removed."""
+
+    removed = 0
+    removed_bytes = 0
+    try:
+        fanout = os.scandir(objects_dir)
+    except FileNotFoundError:
+        return 0, 0
+    with fanout:
+        blob_dirs = [entry.path for entry in fanout if entry.is_dir()]
+    for blob_dir in blob_dirs:
+        with os.scandir(blob_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat_result = entry.stat(follow_symlinks=False)
+                    if stat_result.st_nlink > 1:
+                        continue
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+                except OSError as error:
+                    _LOGGER.warning(
+                        "failed to delete unused object: path=%s error=%s",
+                        entry.path,
+                        error,
+                    )
+                    continue
+                removed += 1
+                removed_bytes += stat_result.st_size
+    return removed, removed_bytes
+
+
+__all__ = [
+    "StoredFile",
+    "adopt_tree",
+    "collect_objects",
+    "file_digest",
+    "link_tree",
+    "object_path",
+    "store_object",
+]
@@ -0,0 +1,389 @@
+"""Pre-fork supervisor that runs several serving processes on one port.
+
+The supervisor itself starts no threads, so forking stays safe for respawns.
+Slot 0 is the owner process: it runs `ServiceScheduler` and `ServiceRuntime`
+and is the only writer of `STATE_DIR`. The remaining slots serve read-only
+from the promoted `current` release. Every process binds its own listening
+socket with `SO_REUSEPORT`, so the kernel spreads connections across them.
+
+Promotion is coordinated with signals instead of restarts: the owner sends
+`SIGUSR1` to the supervisor after promoting a release, and the supervisor
+relays `SIGHUP` to each read-only process, which then rebuilds its in-memory
+release state in a background thread.
+
+Refresh events reach the read-only processes the same way: the owner appends
+each `refresh_started`/`refresh_finished` event to a small relay file in
+`STATE_DIR` and sends `SIGUSR2`; the supervisor relays `SIGUSR2`, and each
+replica republishes the events it has not seen yet to its own `/events`
+streams and `/status?wait` long-polls.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from importlib import import_module
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from types import FrameType
+from typing import Any
+
+from .config import Settings
+from .events import REFRESH_FINISHED, REFRESH_STARTED, ServiceEvent
+from .storage import atomic_write_json
+
+OWNER_SLOT = 0
+PROMOTION_NOTIFY_SIGNAL = signal.SIGUSR1
+RELOAD_SIGNAL = signal.SIGHUP
+EVENT_NOTIFY_SIGNAL = signal.SIGUSR2
+EVENT_RELAY_FILENAME = ".prefork-events.json"
+EVENT_RELAY_HISTORY = 32
+RELAYED_EVENT_TYPES = frozenset({REFRESH_STARTED, REFRESH_FINISHED})
+RESPAWN_BACKOFF_SECONDS = 1.0
+_LOGGER = logging.getLogger("citation_badge.service")
+
+
+def reuse_port_supported() -> bool:
+    return hasattr(socket, "SO_REUSEPORT")
+
+
+def _reserve_port(host: str) -> socket.socket:
+    """Bind, without listening, a reuse-port socket to pin an ephemeral port."""
+
+    reservation = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    reservation.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    reservation.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    reservation.bind((host, 0))
+    return reservation
+
+
+class EventRelay:
+    """Hand owner-process events to read-only processes through one JSON file.
+
+    The owner rewrites the file atomically with its most recent events, tagged
+    with its pid and broker sequence. Each reader remembers the last event it
+    republished, so a signal delivers only events it has not seen, and a new
+    owner (after a respawn) is recognized by its pid.
+    """
+
+    def __init__(self, path: str, history: int = EVENT_RELAY_HISTORY) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._written: deque[dict[str, Any]] = deque(maxlen=max(1, history))
+        self._seen: tuple[int, int] = (0, 0)
+
+    def append(self, event: ServiceEvent) -> None:
+        with self._lock:
+            self._written.append(
+                {
+                    "owner": os.getpid(),
+                    "sequence": event.sequence,
+                    "event": event.event_type,
+                    "data": dict(event.data),
+                }
+            )
+            atomic_write_json(self.path, {"events": list(self._written)})
+
+    def prime(self) -> None:
+        """Mark everything already in the file as seen, at replica start-up."""
+
+        with self._lock:
+            events = self._load()
+            if events:
+                self._seen = (events[-1]["owner"], events[-1]["sequence"])
+
+    def read_new(self) -> list[dict[str, Any]]:
+        with self._lock:
+            seen_owner, seen_sequence = self._seen
+            fresh = [
+                item
+                for item in self._load()
+                if item["owner"] != seen_owner or item["sequence"] > seen_sequence
+            ]
+            if fresh:
+                self._seen = (fresh[-1]["owner"], fresh[-1]["sequence"])
+            return fresh
+
+    def _load(self) -> list[dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return []
+        events = payload.get("events") if isinstance(payload, dict) else None
+        if not isinstance(events, list):
+            return []
+        return [
+            item
+            for item in events
+            if isinstance(item, dict)
+            and isinstance(item.get("owner"), int)
+            and isinstance(item.get("sequence"), int)
+            and isinstance(item.get("event"), str)
+        ]
+
+
+def event_relay_path(state_dir: str) -> str:
+    return os.path.join(os.path.abspath(state_dir), EVENT_RELAY_FILENAME)
+
+
+class PreforkSupervisor:
+    """Fork, supervise and signal a fixed number of serving processes."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        processes: int,
+        *,
+        worker_python_executable: str = "python",
+        worker_script_path: str | None = None,
+    ) -> None:
+        if processes < 1:
+            raise ValueError("Prefork processes must be at least 1")
+        self.settings = settings
+        self.processes = processes
+        self.worker_python_executable = worker_python_executable
+        self.worker_script_path = worker_script_path
+        self._children: dict[int, int] = {}
+        self._started_at: dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        reservation: socket.socket | None = None
+        if self.settings.app_port == 0:
+            reservation = _reserve_port(self.settings.app_host)
+            self.settings.app_port = reservation.getsockname()[1]
+
+        # Import serving code once here so every forked child starts warm and
+        # shares the imported modules' pages instead of re-importing them.
+        _server_module()
+        import_module("service.scheduler").import_scheduler_backend()
+
+        previous_handlers = self._install_supervisor_signal_handlers()
+        try:
+            _LOGGER.info(
+                "prefork supervisor starting: pid=%s processes=%s port=%s",
+                os.getpid(),
+                self.processes,
+                self.settings.app_port,
+            )
+            for slot in range(self.processes):
+                self._spawn(slot)
+            self._supervise()
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            if reservation is not None:
+                reservation.close()
+            _LOGGER.info("prefork supervisor stopped")
+
+    def _supervise(self) -> None:
+        while self._children:
+            try:
+                pid, wait_status = os.wait()
+            except ChildProcessError:
+                return
+
+            slot = self._children.pop(pid, None)
+            if slot is None:
+                continue
+            exit_code = os.waitstatus_to_exitcode(wait_status)
+            if self._stopping:
+                _LOGGER.info("prefork child exited: slot=%s pid=%s code=%s", slot, pid, exit_code)
+                continue
+
+            _LOGGER.warning(
+                "prefork child died, respawning: slot=%s pid=%s code=%s",
+                slot,
+                pid,
+                exit_code,
+            )
+            if time.monotonic() - self._started_at.get(slot, 0.0) < RESPAWN_BACKOFF_SECONDS:
+                time.sleep(RESPAWN_BACKOFF_SECONDS)
+            if not self._stopping:
+                self._spawn(slot)
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self._run_child(slot)
+            except BaseException:
+                _LOGGER.exception("prefork child crashed: slot=%s", slot)
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        self._children[pid] = slot
+        self._started_at[slot] = time.monotonic()
+
+    def _run_child(self, slot: int) -> None:
+        for signum in (signal.SIGINT, signal.SIGTERM, PROMOTION_NOTIFY_SIGNAL):
+            signal.signal(signum, signal.SIG_DFL)
+        # Relayed signals may arrive before this child installs its handlers;
+        # ignore them until then rather than dying on the default action.
+        for signum in (RELOAD_SIGNAL, EVENT_NOTIFY_SIGNAL):
+            signal.signal(signum, signal.SIG_IGN)
+
+        server_module = _server_module()
+        read_only = slot != OWNER_SLOT
+        server = server_module.create_server(
+            self.settings,
+            worker_python_executable=self.worker_python_executable,
+            worker_script_path=self.worker_script_path,
+            read_only=read_only,
+            reuse_port=True,
+        )
+        relay = EventRelay(event_relay_path(self.settings.state_dir))
+
+        if read_only:
+            relay.prime()
+
+            def _reload(_: int, __: FrameType | None) -> None:
+                threading.Thread(
+                    target=server.reload_current_release,
+                    name="citation-release-reload",
+                    daemon=True,
+                ).start()
+
+            def _republish() -> None:
+                for item in relay.read_new():
+                    server.events.publish(item["event"], item.get("data") or {})
+
+            def _relay_events(_: int, __: FrameType | None) -> None:
+                threading.Thread(
+                    target=_republish,
+                    name="citation-event-relay",
+                    daemon=True,
+                ).start()
+
+            signal.signal(RELOAD_SIGNAL, _reload)
+            signal.signal(EVENT_NOTIFY_SIGNAL, _relay_events)
+        else:
+            supervisor_pid = os.getppid()
+
+            def _notify_supervisor(signum: int) -> None:
+                # If the supervisor died we were re-parented; never signal
+                # whichever process adopted us.
+                if os.getppid() != supervisor_pid:
+                    _LOGGER.warning(
+                        "prefork supervisor is gone; skipping notification: pid=%s signum=%s",
+                        supervisor_pid,
+                        signum,
+                    )
+                    return
+                os.kill(supervisor_pid, signum)
+
+            def _relay_event(event: ServiceEvent) -> None:
+                if event.event_type not in RELAYED_EVENT_TYPES:
+                    return
+                relay.append(event)
+                _notify_supervisor(EVENT_NOTIFY_SIGNAL)
+
+            server.release_promoted_listeners.append(
+                lambda _: _notify_supervisor(PROMOTION_NOTIFY_SIGNAL)
+            )
+            server.events.add_listener(_relay_event)
+
+        _LOGGER.info(
+            "prefork child serving: slot=%s pid=%s read_only=%s",
+            slot,
+            os.getpid(),
+            read_only,
+        )
+        server_module.serve(server)
+
+    def _install_supervisor_signal_handlers(self) -> dict[int, Any]:
+        handled = (
+            signal.SIGINT,
+            signal.SIGTERM,
+            PROMOTION_NOTIFY_SIGNAL,
+            EVENT_NOTIFY_SIGNAL,
+        )
+        previous_handlers = {signum: signal.getsignal(signum) for signum in handled}
+
+        def _handle_stop(signum: int, _: FrameType | None) -> None:
+            if self._stopping:
+                return
+            self._stopping = True
+            _LOGGER.info("prefork supervisor stopping: signum=%s", signum)
+            self._signal_children(signal.SIGTERM)
+
+        def _handle_promotion(_: int, __: FrameType | None) -> None:
+            self._signal_children(RELOAD_SIGNAL, include_owner=False)
+
+        def _handle_events(_: int, __: FrameType | None) -> None:
+            self._signal_children(EVENT_NOTIFY_SIGNAL, include_owner=False)
+
+        signal.signal(signal.SIGINT, _handle_stop)
+        signal.signal(signal.SIGTERM, _handle_stop)
+        signal.signal(PROMOTION_NOTIFY_SIGNAL, _handle_promotion)
+        signal.signal(EVENT_NOTIFY_SIGNAL, _handle_events)
+        return previous_handlers
+
+    def _signal_children(self, signum: int, *, include_owner: bool = True) -> None:
+        for pid, slot in list(self._children.items()):
+            if slot == OWNER_SLOT and not include_owner:
+                continue
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                continue
+
+
+def _server_module() -> Any:
+    from . import server
+
+    return server
+
+
+def serve_prefork(
+    settings: Settings,
+    *,
+    worker_python_executable: str = "python",
+    worker_script_path: str | None = None,
+) -> None:
+    """Serve with `settings.server_processes` processes, or one if unsupported."""
+
+    processes = settings.server_processes
+    if processes > 1 and not reuse_port_supported():
+        _LOGGER.warning(
+            "SO_REUSEPORT is unavailable; falling back to one serving process"
+        )
+        processes = 1
+
+    if processes == 1:
+        server_module = _server_module()
+        server_module.serve(
+            server_module.create_server(
+                settings,
+                worker_python_executable=worker_python_executable,
+                worker_script_path=worker_script_path,
+            )
+        )
+        return
+
+    PreforkSupervisor(
+        settings,
+        processes,
+        worker_python_executable=worker_python_executable,
+        worker_script_path=worker_script_path,
+    ).run()
+
+
+__all__ = [
+    "EVENT_NOTIFY_SIGNAL",
+    "EventRelay",
+    "OWNER_SLOT",
+    "PROMOTION_NOTIFY_SIGNAL",
+    "PreforkSupervisor",
+    "RELOAD_SIGNAL",
+    "event_relay_path",
+    "reuse_port_supported",
+    "serve_prefork",
+]
@@ -0,0 +1,172 @@
+"""Structured progress reported by the refresh worker.
+
+`main.py` emits one JSON object per progress event: to the file descriptor
+named by `PROGRESS_FD_ENV` when it runs as a subprocess, or straight to a
+callback when it runs in-process. `RefreshProgress` folds those events into
+the `service.progress` block of `/status`, so a refresh that is slowly
+fetching a profile can be told apart from one that stopped moving.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+import copy
+from datetime import datetime, timezone
+import json
+import threading
+from typing import Any
+
+# Must match `PROGRESS_FD_ENV` in main.py.
+PROGRESS_FD_ENV = "CITATION_PROGRESS_FD"
+
+STAGE_STARTING = "starting"
+STAGE_FETCHING = "fetching"
+STAGE_WRITING_BADGES = "writing_badges"
+STAGE_FINISHING = "finishing"
+STAGE_PROMOTING = "promoting"
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+
+def _timestamp_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _number(value: Any) -> int | float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _text(value: Any) -> str | None:
+    return value if isinstance(value, str) and value else None
+
+
+def parse_progress_line(line: str) -> dict[str, Any] | None:
+    """Decode one progress line; anything but a JSON object with `event` is None."""
+
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict) or not _text(event.get("event")):
+        return None
+    return event
+
+
+class RefreshProgress:
+    """Thread-safe fold of one refresh's progress events.
+
+    Every method returns a copy of the folded state, ready to be stored as
+    `service.progress`. Malformed fields are ignored rather than rejected.
+    """
+
+    def __init__(self, *, started_at: str | None = None) -> None:
+        started_at = started_at or _timestamp_now()
+        self._lock = threading.Lock()
+        self._state: dict[str, Any] = {
+            "stage": STAGE_STARTING,
+            "started_at": started_at,
+            "updated_at": started_at,
+            "elapsed_seconds": 0.0,
+            "profile": None,
+            "profiles_total": None,
+            "profiles_done": 0,
+            "publications": None,
+            "publications_processed": None,
+            "badges_written": None,
+            "timings": {},
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return copy.deepcopy(self._state)
+
+    def set_stage(self, stage: str) -> dict[str, Any]:
+        with self._lock:
+            self._state["stage"] = stage
+            self._state["updated_at"] = _timestamp_now()
+            return copy.deepcopy(self._state)
+
+    def apply(self, event: Mapping[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            self._apply(event)
+            return copy.deepcopy(self._state)
+
+    def _profile_timings(self, profile: str | None) -> dict[str, Any] | None:
+        if profile is None:
+            return None
+        return self._state["timings"].setdefault(profile, {})
+
+    def _apply(self, event: Mapping[str, Any]) -> None:
+        state = self._state
+        state["updated_at"] = _timestamp_now()
+        elapsed_seconds = _number(event.get("elapsed_seconds"))
+        if elapsed_seconds is not None:
+            state["elapsed_seconds"] = elapsed_seconds
+
+        kind = event.get("event")
+        profile = _text(event.get("profile"))
+        if kind == "refresh_started":
+            state["stage"] = STAGE_FETCHING
+            state["profiles_total"] = _number(event.get("profiles"))
+        elif kind == "profile_started":
+            state.update(
+                stage=STAGE_FETCHING,
+                profile=profile,
+                publications=None,
+                publications_processed=None,
+                badges_written=None,
+            )
+            profiles_total = _number(event.get("profiles"))
+            if profiles_total is not None:
+                state["profiles_total"] = profiles_total
+            self._profile_timings(profile)
+        elif kind == "profile_fetching":
+            timings = self._profile_timings(profile)
+            if timings is not None:
+                timings["fetch_seconds"] = _number(event.get("fetch_seconds"))
+        elif kind == "profile_fetched":
+            state.update(
+                stage=STAGE_WRITING_BADGES,
+                profile=profile,
+                publications=_number(event.get("publications")),
+                publications_processed=0,
+                badges_written=0,
+            )
+            timings = self._profile_timings(profile)
+            if timings is not None:
+                timings["fetch_seconds"] = _number(event.get("fetch_seconds"))
+        elif kind == "badges":
+            state.update(
+                stage=STAGE_WRITING_BADGES,
+                publications=_number(event.get("publications")),
+                publications_processed=_number(event.get("publications_processed")),
+                badges_written=_number(event.get("badges_written")),
+            )
+        elif kind == "profile_finished":
+            state["profiles_done"] += 1
+            state["badges_written"] = _number(event.get("badges_written"))
+            timings = self._profile_timings(profile)
+            if timings is not None:
+                timings.update(
+                    status=_text(event.get("status")),
+                    fetch_seconds=_number(event.get("fetch_seconds")),
+                    badges_seconds=_number(event.get("badges_seconds")),
+                )
+        elif kind == "refresh_finished":
+            state["stage"] = STAGE_FINISHING
+            state["worker_seconds"] = _number(event.get("seconds"))
+
+
+__all__ = [
+    "PROGRESS_FD_ENV",
+    "ProgressCallback",
+    "RefreshProgress",
+    "STAGE_FETCHING",
+    "STAGE_FINISHING",
+    "STAGE_PROMOTING",
+    "STAGE_STARTING",
+    "STAGE_WRITING_BADGES",
+    "parse_progress_line",
+]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import errno
 import json
 import logging
 import os
@@ -10,13 +11,28 @@ import tempfile
 import uuid
 from typing import Any
 
-from .storage import CURRENT_RELEASE_POINTER, get_state_layout
+from .diff import build_release_diff, write_release_diff
+from .objects import StoredFile, adopt_tree, collect_objects, file_digest, link_tree
+from .storage import CURRENT_RELEASE_POINTER, atomic_write_json, get_state_layout
+from .validation import VALIDATION_FILENAME, ValidationReport, validate_dist
 
 DIST_DIRNAME = "dist"
 REQUIRED_DIST_FILENAMES = ("citation.json", "all.svg")
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+_CONTENT_TYPES = {
+    ".json": "application/json; charset=utf-8",
+    ".svg": "image/svg+xml",
+}
+_PARTIAL_RELEASE_SUFFIX = ".tmp"
 _LOGGER = logging.getLogger("citation_badge.service")
 
 
+class MissingManifestError(ValueError):
+    """Raised when a diff must come from manifests and a release has none yet."""
+
+
 def staged_dist_path(staged_run_dir: str) -> str:
     """Return the canonical dist directory for a staged worker run."""
 
@@ -53,22 +69,276 @@ def _resolve_run_id(staged_run_dir: str) -> str:
     return run_id
 
 
-def _copy_release(staged_run_dir: str, release_dir: str) -> str:
-    staged_dist_dir = staged_dist_path(staged_run_dir)
-    releases_dir = os.path.dirname(release_dir)
+def artifact_content_type(name: str) -> str:
+    return _CONTENT_TYPES.get(os.path.splitext(name)[1].lower(), DEFAULT_CONTENT_TYPE)
+
+
+def _write_manifest(
+    release_dir: str,
+    run_id: str,
+    stored_files: list[StoredFile],
+) -> None:
+    dist_dir = os.path.join(release_dir, DIST_DIRNAME)
+    artifacts = [
+        {
+            "path": item.relative_path,
+            "size": item.size,
+            "sha256": item.digest,
+            "mtime": os.stat(os.path.join(dist_dir, item.relative_path)).st_mtime,
+            "content_type": artifact_content_type(item.relative_path),
+        }
+        for item in sorted(stored_files, key=lambda item: item.relative_path)
+    ]
+    atomic_write_json(
+        os.path.join(release_dir, MANIFEST_FILENAME),
+        {"version": MANIFEST_VERSION, "release": run_id, "artifacts": artifacts},
+        compact=True,
+    )
+
+
+def load_manifest(release_dir: str) -> dict[str, dict[str, Any]] | None:
+    """Return a release's manifest entries keyed by `dist/`-relative path.
+
+    Releases promoted before manifests existed, and unreadable manifests,
+    yield None.
+    """
+
+    try:
+        with open(
+            os.path.join(release_dir, MANIFEST_FILENAME), "r", encoding="utf-8"
+        ) as handle:
+            manifest = json.load(handle)
+    except (OSError, json.JSONDecodeError, TypeError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    artifacts = manifest.get("artifacts")
+    if not isinstance(artifacts, list):
+        return None
+    return {
+        item["path"]: item
+        for item in artifacts
+        if isinstance(item, dict) and isinstance(item.get("path"), str)
+    }
+
+
+def _scan_artifacts(dist_dir: str) -> dict[str, dict[str, Any]]:
+    artifacts = {}
+    for directory, _, filenames in os.walk(dist_dir):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            relative_path = os.path.relpath(path, dist_dir).replace(os.sep, "/")
+            artifacts[relative_path] = {
+                "sha256": file_digest(path),
+                "size": os.path.getsize(path),
+            }
+    return artifacts
+
+
+def _release_artifacts(
+    release_dir: str, *, require_manifest: bool = False
+) -> dict[str, dict[str, Any]]:
+    """Return manifest entries, hashing the files of releases without one."""
+
+    manifest = load_manifest(release_dir)
+    if manifest is not None:
+        return manifest
+    if require_manifest:
+        raise MissingManifestError(
+            f"Release '{os.path.basename(release_dir)}' has no manifest yet"
+        )
+    return _scan_artifacts(os.path.join(release_dir, DIST_DIRNAME))
+
+
+def compute_release_diff(
+    from_release_dir: str,
+    to_release_dir: str,
+    *,
+    require_manifests: bool = False,
+) -> dict[str, Any]:
+    """Diff two release directories; see `service.diff` for the format.
+
+    Releases without a manifest have their files hashed, unless
+    `require_manifests` is set, in which case `MissingManifestError` is raised.
+    """
+
+    return build_release_diff(
+        os.path.basename(from_release_dir),
+        os.path.join(from_release_dir, DIST_DIRNAME),
+        _release_artifacts(from_release_dir, require_manifest=require_manifests),
+        os.path.basename(to_release_dir),
+        os.path.join(to_release_dir, DIST_DIRNAME),
+        _release_artifacts(to_release_dir, require_manifest=require_manifests),
+    )
+
+
+def _write_diff(
+    release_dir: str,
+    run_id: str,
+    stored_files: list[StoredFile],
+    previous_release_dir: str,
+) -> None:
+    try:
+        diff = build_release_diff(
+            os.path.basename(previous_release_dir),
+            os.path.join(previous_release_dir, DIST_DIRNAME),
+            _release_artifacts(previous_release_dir),
+            run_id,
+            os.path.join(release_dir, DIST_DIRNAME),
+            {
+                item.relative_path: {"sha256": item.digest, "size": item.size}
+                for item in stored_files
+            },
+        )
+        write_release_diff(release_dir, diff)
+    except OSError as error:
+        # The previous release may have been collected meanwhile; the diff
+        # can still be computed on demand for any two retained releases.
+        _LOGGER.warning(
+            "release diff failed: release=%s previous=%s error=%s",
+            run_id,
+            previous_release_dir,
+            error,
+        )
+
+
+def _finalize(
+    release_dir: str,
+    objects_dir: str,
+    run_id: str,
+    previous_release_dir: str | None,
+) -> None:
+    stored_files = adopt_tree(os.path.join(release_dir, DIST_DIRNAME), objects_dir)
+    if previous_release_dir is not None:
+        _write_diff(release_dir, run_id, stored_files, previous_release_dir)
+    _write_manifest(release_dir, run_id, stored_files)
+
+
+def finalize_release(
+    state_dir: str,
+    release_dir: str,
+    previous_release_dir: str | None = None,
+) -> bool:
+    """Deduplicate a moved release into the object store and write its manifest.
+
+    With `previous_release_dir`, the diff against it is stored as `diff.json`.
+    Returns False when the release already has a manifest. Safe to run while
+    the release is served: files are only swapped for identical links.
+    """
+
+    if os.path.exists(os.path.join(release_dir, MANIFEST_FILENAME)):
+        return False
+    _finalize(
+        release_dir,
+        get_state_layout(state_dir).objects_dir,
+        os.path.basename(release_dir),
+        previous_release_dir,
+    )
+    _LOGGER.info("release finalized: release=%s", release_dir)
+    return True
+
+
+def _make_temp_release_dir(release_dir: str, report: ValidationReport) -> str:
     temp_release_dir = tempfile.mkdtemp(
-        dir=releases_dir,
+        dir=os.path.dirname(release_dir),
         prefix=f".{os.path.basename(release_dir)}.",
-        suffix=".tmp",
+        suffix=_PARTIAL_RELEASE_SUFFIX,
     )
+    try:
+        atomic_write_json(
+            os.path.join(temp_release_dir, VALIDATION_FILENAME),
+            report.to_dict(),
+        )
+    except Exception:
+        shutil.rmtree(temp_release_dir, ignore_errors=True)
+        raise
+    return temp_release_dir
+
+
+def _same_device(path: str, other_path: str) -> bool:
+    try:
+        return os.stat(path).st_dev == os.stat(other_path).st_dev
+    except OSError:
+        return False
+
+
+def _move_release(
+    staged_run_dir: str,
+    release_dir: str,
+    objects_dir: str,
+    report: ValidationReport,
+    previous_release_dir: str | None,
+    *,
+    finalize: bool,
+) -> bool:
+    """Rename the staged `dist/` into place; False means it must be copied.
+
+    The rename is one syscall whatever the number of artifacts.
+    """
+
+    staged_dist_dir = staged_dist_path(staged_run_dir)
+    if not _same_device(staged_dist_dir, os.path.dirname(release_dir)):
+        return False
+    temp_release_dir = _make_temp_release_dir(release_dir, report)
+    try:
+        try:
+            os.rename(staged_dist_dir, os.path.join(temp_release_dir, DIST_DIRNAME))
+        except OSError as error:
+            # Bind mounts can share a device number yet refuse the rename.
+            if error.errno != errno.EXDEV:
+                raise
+            shutil.rmtree(temp_release_dir, ignore_errors=True)
+            return False
+        if finalize:
+            _finalize(
+                temp_release_dir,
+                objects_dir,
+                os.path.basename(release_dir),
+                previous_release_dir,
+            )
+        os.replace(temp_release_dir, release_dir)
+    except Exception:
+        shutil.rmtree(temp_release_dir, ignore_errors=True)
+        raise
+
+    _LOGGER.info("release moved: release=%s finalized=%s", release_dir, finalize)
+    return True
+
+
+def _link_release(
+    staged_run_dir: str,
+    release_dir: str,
+    objects_dir: str,
+    report: ValidationReport,
+    previous_release_dir: str | None,
+) -> str:
+    staged_dist_dir = staged_dist_path(staged_run_dir)
+    temp_release_dir = _make_temp_release_dir(release_dir, report)
 
     try:
-        shutil.copytree(staged_dist_dir, os.path.join(temp_release_dir, DIST_DIRNAME))
+        stored_files = link_tree(
+            staged_dist_dir,
+            os.path.join(temp_release_dir, DIST_DIRNAME),
+            objects_dir,
+        )
+        if previous_release_dir is not None:
+            _write_diff(
+                temp_release_dir,
+                os.path.basename(release_dir),
+                stored_files,
+                previous_release_dir,
+            )
+        _write_manifest(temp_release_dir, os.path.basename(release_dir), stored_files)
         os.replace(temp_release_dir, release_dir)
     except Exception:
         shutil.rmtree(temp_release_dir, ignore_errors=True)
         raise
 
+    _LOGGER.info(
+        "release linked: release=%s new_object_bytes=%s",
+        release_dir,
+        sum(item.written for item in stored_files),
+    )
     return release_dir
 
 
@@ -94,46 +364,148 @@ def _atomic_switch_current(current_pointer: str, release_dir: str) -> None:
         raise
 
 
-def _is_managed_release(releases_dir: str, release_dir: str) -> bool:
+def _release_age_key(entry: os.DirEntry[str]) -> tuple[int, str]:
     try:
-        return os.path.commonpath([releases_dir, release_dir]) == releases_dir
-    except ValueError:
-        return False
+        return entry.stat(follow_symlinks=False).st_mtime_ns, entry.name
+    except OSError:
+        return 0, entry.name
 
 
-def _delete_previous_release(
-    layout: Any, previous_release_dir: str | None, release_dir: str
-) -> None:
-    if previous_release_dir is None:
-        return
-    if previous_release_dir == release_dir:
-        return
-    if not _is_managed_release(layout.releases_dir, previous_release_dir):
-        _LOGGER.warning(
-            "skipping deletion of unmanaged previous release: %s",
-            previous_release_dir,
-        )
-        return
-    if not os.path.exists(previous_release_dir):
-        return
+def list_releases(state_dir: str) -> list[str]:
+    """Return managed release directories, most recently made current first.
+
+    Promotion and rollback touch the release they switch to, so directory
+    mtime orders releases by when they were last current.
+    """
 
+    releases_dir = get_state_layout(state_dir).releases_dir
     try:
-        shutil.rmtree(previous_release_dir)
-    except OSError as error:
-        _LOGGER.warning(
-            "failed to delete previous release: previous_release=%s error=%s",
-            previous_release_dir,
-            error,
+        with os.scandir(releases_dir) as entries:
+            releases = [
+                entry
+                for entry in entries
+                # `_link_release` builds into a `.tmp` directory first.
+                if not entry.name.endswith(_PARTIAL_RELEASE_SUFFIX)
+                and entry.is_dir(follow_symlinks=False)
+            ]
+    except FileNotFoundError:
+        return []
+    releases.sort(key=_release_age_key, reverse=True)
+    return [entry.path for entry in releases]
+
+
+def collect_releases(state_dir: str, keep: int) -> list[str]:
+    """Delete all but the `keep` most recent releases; never the current one.
+
+    Objects that no remaining release links to are deleted as well.
+    """
+
+    current = current_release_path(state_dir)
+    deleted = []
+    for release_dir in list_releases(state_dir)[max(1, keep):]:
+        if current is not None and os.path.realpath(release_dir) == current:
+            continue
+        try:
+            shutil.rmtree(release_dir)
+        except OSError as error:
+            _LOGGER.warning(
+                "failed to delete old release: release=%s error=%s",
+                release_dir,
+                error,
+            )
+            continue
+        deleted.append(release_dir)
+    removed_objects, removed_bytes = collect_objects(
+        get_state_layout(state_dir).objects_dir
+    )
+    if deleted or removed_objects:
+        _LOGGER.info(
+            "old releases collected: deleted=%s kept=%s objects=%s object_bytes=%s",
+            len(deleted),
+            max(1, keep),
+            removed_objects,
+            removed_bytes,
         )
+    return deleted
+
+
+def resolve_release(state_dir: str, release: str) -> str:
+    """Return the directory of the retained release named `release`.
+
+    Raises `ValueError` for names that are not a plain release run id or that
+    no retained release has.
+    """
+
+    if (
+        release in ("", ".", "..")
+        or os.path.basename(release) != release
+        or release.endswith(_PARTIAL_RELEASE_SUFFIX)
+    ):
+        raise ValueError(f"Invalid release name: {release!r}")
+    release_dir = os.path.join(get_state_layout(state_dir).releases_dir, release)
+    if not os.path.isdir(release_dir):
+        raise ValueError(f"Release '{release}' is not retained")
+    return release_dir
 
 
-def promote_release(state_dir: str, staged_run_dir: str) -> str:
-    """Promote a validated staged run into the public current release pointer."""
+def rollback_release(state_dir: str, release: str | None = None) -> str:
+    """Point `current` at an earlier retained release and return its path.
+
+    Only the symlink is replaced, so the cost does not depend on release size.
+    Without `release`, the most recent release other than the current one is
+    used.
+    """
+
+    layout = get_state_layout(state_dir)
+    current = current_release_path(state_dir)
+    if release is None:
+        candidates = [
+            path
+            for path in list_releases(state_dir)
+            if os.path.realpath(path) != current
+        ]
+        if not candidates:
+            raise ValueError("No earlier release is retained to roll back to")
+        release_dir = candidates[0]
+    else:
+        release_dir = resolve_release(state_dir, release)
+
+    if not validate_staged_release(release_dir):
+        raise ValueError(
+            f"Release '{os.path.basename(release_dir)}' is incomplete and cannot be restored"
+        )
+    _atomic_switch_current(layout.current_pointer, release_dir)
+    os.utime(release_dir)
+    _LOGGER.info(
+        "release rolled back: previous=%s current=%s",
+        current,
+        release_dir,
+    )
+    return release_dir
+
+
+def promote_release(
+    state_dir: str,
+    staged_run_dir: str,
+    *,
+    finalize: bool = True,
+) -> str:
+    """Promote a validated staged run into the public current release pointer.
+
+    Every file is deep-checked first with `validate_dist`; the report is kept
+    as `validation.json` in the release. A staged run on the same filesystem
+    as `STATE_DIR` is renamed into `releases/` instead of copied. With `finalize=False` the renamed release
+    goes live before it is deduplicated and given a manifest, so promotion
+    time does not depend on the artifact count; call `finalize_release`
+    afterwards. Staged runs on another filesystem are always copied and
+    finalized. Finalizing here also stores the diff against the release that
+    was current before as `diff.json`.
+    """
 
     layout = get_state_layout(state_dir)
-    previous_release_dir = current_release_path(state_dir)
     os.makedirs(layout.state_dir, exist_ok=True)
     os.makedirs(layout.releases_dir, exist_ok=True)
+    os.makedirs(layout.objects_dir, exist_ok=True)
 
     if not validate_staged_release(staged_run_dir):
         raise ValueError(
@@ -145,9 +517,36 @@ def promote_release(state_dir: str, staged_run_dir: str) -> str:
     if os.path.exists(release_dir):
         raise FileExistsError(f"Release already exists for run id '{run_id}'")
 
-    _copy_release(staged_run_dir, release_dir)
+    report = validate_dist(staged_dist_path(staged_run_dir))
+    if not report.valid:
+        raise ValueError(f"Staged release failed validation: {report.summary()}")
+    _LOGGER.info(
+        "staged release validated: run_id=%s %s in %.3fs warnings=%s",
+        run_id,
+        report.summary(),
+        report.duration_seconds,
+        report.warning_count,
+    )
+
+    previous_release_dir = current_release_path(state_dir)
+    if not _move_release(
+        staged_run_dir,
+        release_dir,
+        layout.objects_dir,
+        report,
+        previous_release_dir,
+        finalize=finalize,
+    ):
+        _link_release(
+            staged_run_dir,
+            release_dir,
+            layout.objects_dir,
+            report,
+            previous_release_dir,
+        )
+    os.utime(release_dir)
     _atomic_switch_current(layout.current_pointer, release_dir)
-    _delete_previous_release(layout, previous_release_dir, release_dir)
+    # Older releases stay on disk for rollback until `collect_releases` runs.
     return release_dir
 
 
@@ -172,8 +571,18 @@ def current_release_path(state_dir: str) -> str | None:
 
 
 __all__ = [
+    "MANIFEST_FILENAME",
+    "MissingManifestError",
+    "artifact_content_type",
+    "collect_releases",
+    "compute_release_diff",
     "current_release_path",
+    "finalize_release",
+    "list_releases",
+    "load_manifest",
     "promote_release",
+    "resolve_release",
+    "rollback_release",
     "staged_dist_path",
     "validate_staged_release",
 ]
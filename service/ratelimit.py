@@ -0,0 +1,140 @@
+"""Per-client token buckets and a global in-flight cap for the HTTP server."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+import math
+import threading
+import time
+
+DEFAULT_MAX_TRACKED_CLIENTS = 10_000
+
+Clock = Callable[[], float]
+
+
+@dataclass(frozen=True)
+class Rejection:
+    """Why a request was refused and how long the client should back off."""
+
+    reason: str
+    status: int
+    retry_after_seconds: int
+
+
+class TokenBucketLimiter:
+    """Refill-on-demand token buckets keyed by client address.
+
+    Buckets live in an LRU map capped at `max_clients`; evicting the least
+    recently seen client only forgets a bucket that would refill anyway.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        *,
+        max_clients: int = DEFAULT_MAX_TRACKED_CLIENTS,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self.rate_per_second = float(rate_per_second)
+        self.burst = max(1, int(burst))
+        self.max_clients = max(1, int(max_clients))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def acquire(self, client: str) -> float:
+        """Take one token; return 0 on success or the seconds until one refills."""
+
+        if not self.enabled:
+            return 0.0
+
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = [float(self.burst), now]
+                self._buckets[client] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                tokens = bucket[0] + (now - bucket[1]) * self.rate_per_second
+                bucket[0] = min(float(self.burst), tokens)
+                bucket[1] = now
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / self.rate_per_second
+
+    def tracked_clients(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+class InFlightLimiter:
+    """Non-blocking global cap on concurrently handled requests."""
+
+    def __init__(self, max_inflight: int) -> None:
+        self.max_inflight = int(max_inflight)
+        self._semaphore = (
+            threading.BoundedSemaphore(self.max_inflight)
+            if self.max_inflight > 0
+            else None
+        )
+
+    def try_acquire(self) -> bool:
+        if self._semaphore is None:
+            return True
+        return self._semaphore.acquire(blocking=False)
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+class AdmissionController:
+    """Decide in memory whether a request may proceed, before any disk I/O."""
+
+    def __init__(
+        self,
+        *,
+        rate_per_second: float,
+        burst: int,
+        max_inflight: int,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self.rate_limiter = TokenBucketLimiter(rate_per_second, burst, clock=clock)
+        self.inflight = InFlightLimiter(max_inflight)
+
+    def try_admit(self, client: str) -> Rejection | None:
+        """Admit the request or describe the rejection; admitted calls must `release()`."""
+
+        wait_seconds = self.rate_limiter.acquire(client)
+        if wait_seconds > 0:
+            return Rejection(
+                reason="rate_limited",
+                status=429,
+                retry_after_seconds=max(1, math.ceil(wait_seconds)),
+            )
+        if not self.inflight.try_acquire():
+            return Rejection(reason="overloaded", status=503, retry_after_seconds=1)
+        return None
+
+    def release(self) -> None:
+        self.inflight.release()
+
+
+__all__ = [
+    "AdmissionController",
+    "InFlightLimiter",
+    "Rejection",
+    "TokenBucketLimiter",
+]
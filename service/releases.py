@@ -0,0 +1,128 @@
+"""Command line for retained releases under `STATE_DIR/releases`.
+
+    python -m service.releases list
+    python -m service.releases rollback [--release RUN_ID]
+    python -m service.releases gc [--keep N]
+    python -m service.releases diff [--from RUN_ID] [--to RUN_ID]
+
+`rollback` only re-points the `current` symlink, so it takes the same time
+for any release size. A running service notices the new pointer on its next
+request; use `POST /admin/rollback` instead to also update `/status` and
+notify `/events` subscribers right away. `diff` prints the same JSON as
+`GET /diff`.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import sys
+
+from .config import Settings
+from .diff import load_release_diff
+from .promote import (
+    collect_releases,
+    compute_release_diff,
+    current_release_path,
+    list_releases,
+    resolve_release,
+    rollback_release,
+)
+from .storage import get_state_layout, state_database
+
+
+def _list(settings: Settings) -> int:
+    current = current_release_path(settings.state_dir)
+    for release_dir in list_releases(settings.state_dir):
+        marker = "*" if os.path.realpath(release_dir) == current else " "
+        print(f"{marker} {os.path.basename(release_dir)}")
+    return 0
+
+
+def _rollback(settings: Settings, release: str | None) -> int:
+    try:
+        release_dir = rollback_release(settings.state_dir, release)
+    except ValueError as error:
+        print(f"rollback failed: {error}", file=sys.stderr)
+        return 1
+    database = state_database(get_state_layout(settings.state_dir).status_file, settings)
+    if database is not None:
+        database.record_release(release_dir, datetime.now(timezone.utc).isoformat())
+    print(os.path.basename(release_dir))
+    return 0
+
+
+def _gc(settings: Settings, keep: int | None) -> int:
+    deleted = collect_releases(
+        settings.state_dir,
+        settings.release_retention if keep is None else keep,
+    )
+    for release_dir in deleted:
+        print(os.path.basename(release_dir))
+    return 0
+
+
+def _diff(settings: Settings, from_release: str | None, to_release: str | None) -> int:
+    try:
+        if to_release is None:
+            to_release_dir = current_release_path(settings.state_dir)
+            if to_release_dir is None:
+                print("diff failed: no release is current", file=sys.stderr)
+                return 1
+        else:
+            to_release_dir = resolve_release(settings.state_dir, to_release)
+        if from_release is None:
+            diff = load_release_diff(to_release_dir)
+            if diff is None:
+                print("diff failed: no diff is stored; pass --from", file=sys.stderr)
+                return 1
+        else:
+            diff = compute_release_diff(
+                resolve_release(settings.state_dir, from_release),
+                to_release_dir,
+            )
+    except ValueError as error:
+        print(f"diff failed: {error}", file=sys.stderr)
+        return 1
+    print(json.dumps(diff, ensure_ascii=False, indent=2))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list retained releases, newest first")
+    rollback = commands.add_parser("rollback", help="switch current to a release")
+    rollback.add_argument(
+        "--release",
+        help="run id to restore (default: the previous release)",
+    )
+    gc = commands.add_parser("gc", help="delete releases beyond the retention")
+    gc.add_argument(
+        "--keep",
+        type=int,
+        help="releases to keep (default: RELEASE_RETENTION)",
+    )
+    diff = commands.add_parser("diff", help="show what changed between releases")
+    diff.add_argument(
+        "--from",
+        dest="from_release",
+        help="run id to compare against (default: the one the diff was stored for)",
+    )
+    diff.add_argument("--to", dest="to_release", help="run id (default: current)")
+    args = parser.parse_args(argv)
+
+    settings = Settings()
+    if args.command == "list":
+        return _list(settings)
+    if args.command == "rollback":
+        return _rollback(settings, args.release)
+    if args.command == "diff":
+        return _diff(settings, args.from_release, args.to_release)
+    return _gc(settings, args.keep)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,13 @@ from __future__ import annotations
 from collections.abc import Callable
 from datetime import datetime, timezone
 import threading
-from typing import Any
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.schedulers.base import SchedulerNotRunningError
-from apscheduler.triggers.cron import CronTrigger
-
+from typing import TYPE_CHECKING, Any
 
 from .config import Settings
-from .storage import safe_load_status, save_status
+from .storage import StatusStore
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.background import BackgroundScheduler
 
 JOB_ID = "citation-refresh"
 _UNSET = object()
@@ -58,6 +57,13 @@ def _serialize_datetime(value: datetime | None) -> str | None:
     return value.isoformat()
 
 
+def import_scheduler_backend() -> None:
+    """Import APScheduler now, for example before forking serving processes."""
+
+    import apscheduler.schedulers.background  # noqa: F401
+    import apscheduler.triggers.cron  # noqa: F401
+
+
 def build_scheduler(
     cron_schedule: str,
     timezone_name: str,
@@ -65,6 +71,11 @@ def build_scheduler(
 ) -> BackgroundScheduler:
     """Create a scheduler with one cron job configured from the runtime settings."""
 
+    # APScheduler is imported here rather than at module import so processes
+    # that never schedule (read-only replicas, tooling) skip its import cost.
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
     scheduler = BackgroundScheduler(timezone=timezone_name, daemon=True)
     scheduler.add_job(
         job or (lambda: None),
@@ -84,13 +95,13 @@ class ServiceScheduler:
         self,
         *,
         settings: Settings,
-        status_path: str,
+        status_store: StatusStore,
         refresh: RefreshCallback | None = None,
         shutdown_callback: ShutdownCallback | None = None,
         guard: OverlapGuard | None = None,
     ) -> None:
         self.settings = settings
-        self.status_path = status_path
+        self.status_store = status_store
         self.shutdown_event = threading.Event()
         self._refresh = refresh or _noop_refresh
         self._shutdown_callback = shutdown_callback
@@ -137,6 +148,8 @@ class ServiceScheduler:
 
         self.shutdown_event.set()
 
+        from apscheduler.schedulers.base import SchedulerNotRunningError
+
         try:
             self._scheduler.shutdown(wait=False)
         except SchedulerNotRunningError:
@@ -195,29 +208,29 @@ class ServiceScheduler:
         last_started_at: str | None | object = _UNSET,
         last_finished_at: str | None | object = _UNSET,
     ) -> dict[str, Any]:
-        payload = safe_load_status(self.status_path, settings=self.settings)
-        schedule = payload["schedule"]
-        schedule["cron"] = self.settings.cron_schedule
-        schedule["timezone"] = self.settings.timezone
-        schedule["refresh_on_startup"] = self.settings.refresh_on_startup
-        schedule["overlap_policy"] = "skip"
+        def _apply(payload: dict[str, Any]) -> None:
+            schedule = payload["schedule"]
+            schedule["cron"] = self.settings.cron_schedule
+            schedule["timezone"] = self.settings.timezone
+            schedule["refresh_on_startup"] = self.settings.refresh_on_startup
+            schedule["overlap_policy"] = "skip"
 
-        if running is not _UNSET:
-            schedule["running"] = running
-        if next_run_at is not _UNSET:
-            schedule["next_run_at"] = next_run_at
-        if last_started_at is not _UNSET:
-            schedule["last_started_at"] = last_started_at
-        if last_finished_at is not _UNSET:
-            schedule["last_finished_at"] = last_finished_at
+            if running is not _UNSET:
+                schedule["running"] = running
+            if next_run_at is not _UNSET:
+                schedule["next_run_at"] = next_run_at
+            if last_started_at is not _UNSET:
+                schedule["last_started_at"] = last_started_at
+            if last_finished_at is not _UNSET:
+                schedule["last_finished_at"] = last_finished_at
 
-        return save_status(self.status_path, payload, settings=self.settings)
+        return self.status_store.update(_apply)
 
 
 def create_service_scheduler(
     *,
     settings: Settings,
-    status_path: str,
+    status_store: StatusStore,
     refresh: RefreshCallback | None = None,
     shutdown_callback: ShutdownCallback | None = None,
     guard: OverlapGuard | None = None,
@@ -226,7 +239,7 @@ def create_service_scheduler(
 
     return ServiceScheduler(
         settings=settings,
-        status_path=status_path,
+        status_store=status_store,
         refresh=refresh,
         shutdown_callback=shutdown_callback,
         guard=guard,
@@ -239,5 +252,6 @@ __all__ = [
     "ServiceScheduler",
     "build_scheduler",
     "create_service_scheduler",
+    "import_scheduler_backend",
     "overlap_guard",
 ]
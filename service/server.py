@@ -2,44 +2,108 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from importlib import import_module
+import hashlib
+import hmac
+import io
 import json
 import logging
 import os
-import re
 import signal
 import shutil
+import socket
+import ssl
 import subprocess
 import sys
 import tempfile
 import threading
+import time
 from types import FrameType, ModuleType
-from typing import Any, cast
-from urllib.parse import urlsplit
-
-from service.config import Settings
+from typing import TYPE_CHECKING, Any, BinaryIO, cast
+from urllib.parse import SplitResult, parse_qs, urlsplit
+
+from service.accesslog import AccessLogger, AccessRecord
+from service.config import WORKER_MODE_IN_PROCESS, Settings
+from service.diff import load_release_diff
+from service.events import (
+    REFRESH_FINISHED,
+    REFRESH_STARTED,
+    RELEASE_CHANGED,
+    EventBroker,
+    ServiceEvent,
+)
+from service.index import (
+    DEFAULT_SORT_DESCENDING,
+    PUBLICATION_SORT_KEYS,
+    SUPPORTED_METRICS,
+    CurrentRelease,
+    ReleaseDiffCache,
+    ReleaseIndex,
+    ReleaseIndexCache,
+    artifact_route,
+)
+from service.metrics import EXPOSITION_CONTENT_TYPE, ServiceMetrics
+from service.progress import STAGE_PROMOTING, RefreshProgress
+from service.usage import (
+    BUDGET_CPU_SECONDS,
+    BUDGET_MAX_RSS_MB,
+    BUDGET_WALL_SECONDS,
+    check_budgets,
+)
+from service.ratelimit import AdmissionController, InFlightLimiter, Rejection
+from service.startup import StartupProfile
+from service.storage import (
+    StatusStore,
+    ensure_state_layout,
+    load_json_file,
+    state_database,
+)
 from service.promote import (
+    MissingManifestError,
+    collect_releases,
     current_release_path,
+    finalize_release,
     promote_release,
+    resolve_release,
+    rollback_release,
     validate_staged_release,
 )
-from service.scheduler import create_service_scheduler
 from service.worker import (
     WorkerShutdownError,
     build_worker_argv,
     google_scholar_failure_result,
+    run_worker_in_process,
     run_worker_subprocess,
     web_of_science_failure_result,
 )
 
-
-JSON_COMPATIBILITY_PATH = "/citation.json"
-SVG_CONTENT_TYPE = "image/svg+xml"
-_PUBLICATION_SVG_PATH = re.compile(r"^/[A-Za-z0-9][A-Za-z0-9_.-]*\.svg$")
+if TYPE_CHECKING:
+    from service.scheduler import ServiceScheduler
+
+
+METRICS_PATH = "/metrics"
+COUNTS_PATH = "/counts"
+MAX_COUNTS_KEYS = 500
+PUBLICATIONS_PATH = "/publications"
+EVENTS_PATH = "/events"
+DIFF_PATH = "/diff"
+ADMIN_ROLLBACK_PATH = "/admin/rollback"
+# Admin requests carry no meaningful body; anything larger is not drained.
+MAX_ADMIN_BODY_BYTES = 64 * 1024
+DEFAULT_STATUS_WAIT_SECONDS = 30
+MAX_STATUS_WAIT_SECONDS = 300
+EVENT_STREAM_HEARTBEAT_SECONDS = 15.0
+DEFAULT_PUBLICATIONS_LIMIT = 20
+MAX_PUBLICATIONS_LIMIT = 100
+FILE_COPY_CHUNK_BYTES = 256 * 1024
+# Below this size one read plus one write is cheaper than the sendfile setup.
+SENDFILE_MIN_BYTES = 64 * 1024
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
 _WORKER_SCRIPT_PATH = "/app/main.py"
 _LOGGER = logging.getLogger("citation_badge.service")
 
@@ -60,8 +124,8 @@ def _configure_runtime_logging() -> None:
     _LOGGER.propagate = False
 
 
-def _storage_module() -> ModuleType:
-    return import_module("service.storage")
+def _scheduler_module() -> ModuleType:
+    return import_module("service.scheduler")
 
 
 def _timestamp_now() -> str:
@@ -182,6 +246,131 @@ def _worker_failure_message(
     return message or error.__class__.__name__
 
 
+@contextmanager
+def _timed_phase(phases: dict[str, float], name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = round(time.perf_counter() - started, 3)
+
+
+def _progress_phases(progress: Mapping[str, Any]) -> dict[str, float]:
+    """Sum the per-profile fetch and badge times the worker reported."""
+
+    phases: dict[str, float] = {}
+    for timings in progress.get("timings", {}).values():
+        for phase, key in (("fetch", "fetch_seconds"), ("badges", "badges_seconds")):
+            seconds = timings.get(key)
+            if isinstance(seconds, (int, float)):
+                phases[phase] = round(phases.get(phase, 0.0) + seconds, 3)
+    return phases
+
+
+def _split_query_list(values: list[str]) -> list[str]:
+    items: list[str] = []
+    seen: set[str] = set()
+    for value in values:
+        for item in value.split(","):
+            item = item.strip()
+            if not item or item in seen:
+                continue
+            items.append(item)
+            seen.add(item)
+    return items
+
+
+def _query_value(parameters: Mapping[str, list[str]], name: str) -> str | None:
+    values = parameters.get(name)
+    if not values:
+        return None
+    value = values[-1].strip()
+    return value or None
+
+
+def _query_int(
+    parameters: Mapping[str, list[str]],
+    name: str,
+    default: int | None,
+    *,
+    minimum: int = 0,
+    maximum: int | None = None,
+) -> int | None:
+    value = _query_value(parameters, name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer") from None
+    if number < minimum or (maximum is not None and number > maximum):
+        upper = "" if maximum is None else f" and at most {maximum}"
+        raise ValueError(f"'{name}' must be at least {minimum}{upper}")
+    return number
+
+
+def send_file_body(
+    connection: Any,
+    wfile: Any,
+    handle: BinaryIO,
+    size: int,
+    *,
+    min_sendfile_bytes: int = SENDFILE_MIN_BYTES,
+) -> int:
+    """Write an open file to the client, preferring kernel `sendfile` over copies.
+
+    Small files are written with a single userspace copy, and the chunked copy
+    is also the fallback when the connection is not a plain socket (for example
+    TLS-wrapped or test doubles) or the platform lacks `sendfile`.
+    """
+
+    if size <= 0:
+        return 0
+
+    if (
+        size >= min_sendfile_bytes
+        and isinstance(connection, socket.socket)
+        and not isinstance(connection, ssl.SSLSocket)
+    ):
+        try:
+            wfile.flush()
+            return connection.sendfile(handle, 0, size)
+        except (AttributeError, io.UnsupportedOperation):
+            handle.seek(0)
+
+    sent = 0
+    while sent < size:
+        chunk = handle.read(min(FILE_COPY_CHUNK_BYTES, size - sent))
+        if not chunk:
+            break
+        wfile.write(chunk)
+        sent += len(chunk)
+    return sent
+
+
+def _if_none_match(header: str, etag: str) -> bool:
+    """Return True when an `If-None-Match` header lists `etag` or is `*`."""
+
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(
+        _etag_matches(candidate, etag) for candidate in candidates if candidate
+    )
+
+
+def _etag_matches(candidate: str, etag: str) -> bool:
+    normalized = candidate.strip()
+    if normalized.startswith("W/"):
+        normalized = normalized[2:]
+    return normalized.strip('"') == etag.strip('"')
+
+
+def _format_sse_event(event: ServiceEvent) -> bytes:
+    data = json.dumps(event.data, ensure_ascii=False, separators=(",", ":"))
+    return (
+        f"id: {event.sequence}\nevent: {event.event_type}\ndata: {data}\n\n"
+    ).encode("utf-8")
+
+
 def _default_worker_script_path() -> str:
     if os.path.isfile(_WORKER_SCRIPT_PATH):
         return _WORKER_SCRIPT_PATH
@@ -198,57 +387,72 @@ class ServiceRuntime:
         state_layout: Any,
         worker_python_executable: str = "python",
         worker_script_path: str | None = None,
+        metrics: ServiceMetrics | None = None,
+        release_promoted_callback: Callable[[str], Any] | None = None,
+        events: EventBroker | None = None,
+        status_store: StatusStore | None = None,
     ) -> None:
         self.settings = settings
         self.state_layout = state_layout
+        self.status_store = status_store or StatusStore(
+            state_layout.status_file,
+            settings=settings,
+        )
+        # Run and release history is kept only by the SQLite state backend.
+        self.state_db = state_database(state_layout.status_file, settings)
         self.worker_python_executable = worker_python_executable
         self.worker_script_path = worker_script_path or _default_worker_script_path()
+        self.metrics = metrics or ServiceMetrics()
+        self._release_promoted_callback = release_promoted_callback
+        self.events = events or EventBroker()
         self._shutdown_requested = threading.Event()
         self._active_worker_lock = threading.Lock()
         self._active_worker_process: subprocess.Popen[str] | None = None
         self._active_worker_stop_event: threading.Event | None = None
+        # Progress of the running refresh; late worker events for a refresh
+        # whose terminal status is written are dropped.
+        self._progress_lock = threading.Lock()
+        self._active_progress: RefreshProgress | None = None
+        # Serializes rollback and garbage collection so a release cannot be
+        # deleted while it is being restored.
+        self._releases_lock = threading.Lock()
 
     def synchronize_status(self) -> dict[str, Any]:
-        payload = self._load_status()
-        payload["storage"]["current_release"] = current_release_path(
-            self.settings.state_dir
-        )
-        payload["storage"]["has_data"] = (
-            payload["storage"]["current_release"] is not None
-        )
-
-        google_scholar = payload["sources"]["google_scholar"]
-        google_scholar["enabled"] = True
-        if google_scholar.get("status") == "disabled":
-            google_scholar["status"] = "never_succeeded"
-
-        if self.settings.wos_enabled:
-            web_of_science = payload["sources"]["web_of_science"]
-            web_of_science["enabled"] = True
-            if web_of_science.get("status") == "disabled":
-                web_of_science["status"] = (
-                    "stale" if _last_success_at(web_of_science) else "never_succeeded"
+        has_data = current_release_path(self.settings.state_dir) is not None
+
+        def _synchronize(payload: dict[str, Any]) -> None:
+            google_scholar = payload["sources"]["google_scholar"]
+            google_scholar["enabled"] = True
+            if google_scholar.get("status") == "disabled":
+                google_scholar["status"] = "never_succeeded"
+
+            if self.settings.wos_enabled:
+                web_of_science = payload["sources"]["web_of_science"]
+                web_of_science["enabled"] = True
+                if web_of_science.get("status") == "disabled":
+                    web_of_science["status"] = (
+                        "stale"
+                        if _last_success_at(web_of_science)
+                        else "never_succeeded"
+                    )
+            else:
+                payload["sources"]["web_of_science"] = _disabled_source_state(
+                    payload["sources"]["web_of_science"]
                 )
-        else:
-            payload["sources"]["web_of_science"] = _disabled_source_state(
-                payload["sources"]["web_of_science"]
-            )
 
-        if payload["service"].get("status") in {"running", "stopping"}:
-            payload["service"]["status"] = (
-                "ready" if payload["storage"]["has_data"] else "idle"
-            )
-        elif (
-            payload["storage"]["has_data"]
-            and payload["service"].get("status") == "idle"
-        ):
-            payload["service"]["status"] = "ready"
-        elif not payload["storage"]["has_data"] and payload["service"].get(
-            "status"
-        ) in {"ready", "stale"}:
-            payload["service"]["status"] = "idle"
-
-        payload = self._save_status(payload)
+            if payload["service"].get("status") in {"running", "stopping"}:
+                payload["service"]["status"] = "ready" if has_data else "idle"
+            elif has_data and payload["service"].get("status") == "idle":
+                payload["service"]["status"] = "ready"
+            elif not has_data and payload["service"].get("status") in {
+                "ready",
+                "stale",
+            }:
+                payload["service"]["status"] = "idle"
+            # Left behind by a process that stopped mid-refresh.
+            payload["service"]["progress"] = None
+
+        payload = self._update_status(_synchronize)
         _LOGGER.info(
             "service status synchronized: service_status=%s has_data=%s current_release=%s",
             payload["service"].get("status"),
@@ -258,16 +462,55 @@ class ServiceRuntime:
         return payload
 
     def refresh(self, trigger_reason: str) -> None:
+        started = time.perf_counter()
+        outcome = "error"
+        run: dict[str, Any] = {
+            "exit_code": None,
+            "error": None,
+            "release": None,
+            "phases": {},
+            "usage": None,
+        }
+        run_id = self._record_run_started(trigger_reason)
+        try:
+            outcome = self._run_refresh(trigger_reason, run)
+        finally:
+            duration_seconds = time.perf_counter() - started
+            self.metrics.refresh_duration.observe(
+                duration_seconds,
+                trigger_reason,
+                outcome,
+            )
+            if outcome != "skipped":
+                run["resources"] = self._record_resources(
+                    trigger_reason, outcome, duration_seconds, run
+                )
+            self._record_run_finished(run_id, outcome, duration_seconds, run)
+            self.events.publish(
+                REFRESH_FINISHED,
+                {
+                    "trigger": trigger_reason,
+                    "outcome": outcome,
+                    "finished_at": _timestamp_now(),
+                },
+            )
+
+    def _run_refresh(self, trigger_reason: str, run: dict[str, Any]) -> str:
         if self._shutdown_requested.is_set():
             _LOGGER.info(
                 "refresh skipped: trigger=%s reason=shutdown_requested",
                 trigger_reason,
             )
-            return
+            return "skipped"
 
         previous_status = self._load_status()
         attempted_at = _timestamp_now()
-        self._write_running_status(previous_status, attempted_at)
+        progress = RefreshProgress(started_at=attempted_at)
+        self._write_running_status(previous_status, attempted_at, progress)
+        self.events.publish(
+            REFRESH_STARTED,
+            {"trigger": trigger_reason, "attempted_at": attempted_at},
+        )
         _LOGGER.info(
             "refresh started: trigger=%s attempted_at=%s state_dir=%s",
             trigger_reason,
@@ -282,6 +525,7 @@ class ServiceRuntime:
                 "refresh aborted: trigger=%s reason=missing_SCHOLAR",
                 trigger_reason,
             )
+            run["error"] = "SCHOLAR must be configured"
             self._write_terminal_status(
                 service_status=service_status,
                 previous_status=previous_status,
@@ -290,13 +534,14 @@ class ServiceRuntime:
                 citation_payload=None,
                 fallback_error="SCHOLAR must be configured",
             )
-            return
+            return "failed"
 
         staged_run_dir = tempfile.mkdtemp(
             dir=self.state_layout.state_dir,
             prefix=".staged-refresh-",
         )
         completed: subprocess.CompletedProcess[str] | None = None
+        outcome = "failed"
 
         try:
             worker_stop_event = threading.Event()
@@ -306,28 +551,49 @@ class ServiceRuntime:
                 script_path=self.worker_script_path,
             )
             _LOGGER.info(
-                "worker starting: trigger=%s staged_run_dir=%s scholar_configured=%s wos_enabled=%s",
+                "worker starting: trigger=%s staged_run_dir=%s scholar_configured=%s wos_enabled=%s mode=%s",
                 trigger_reason,
                 staged_run_dir,
                 bool(self.settings.scholar),
                 self.settings.wos_enabled,
+                self.settings.worker_mode,
             )
-            completed = run_worker_subprocess(
-                argv,
-                working_directory=staged_run_dir,
-                timeout_seconds=self.settings.worker_timeout_seconds,
-                started_callback=lambda process: self._set_active_worker(
-                    process,
-                    worker_stop_event,
-                ),
-                stop_event=worker_stop_event,
-            )
+            with _timed_phase(run["phases"], "worker"):
+                if self.settings.worker_mode == WORKER_MODE_IN_PROCESS:
+                    self._set_active_worker(None, worker_stop_event)
+                    completed = run_worker_in_process(
+                        scholar=self.settings.scholar,
+                        script_path=self.worker_script_path,
+                        working_directory=staged_run_dir,
+                        timeout_seconds=self.settings.worker_timeout_seconds,
+                        stop_event=worker_stop_event,
+                        progress_callback=lambda event: self._record_progress(
+                            progress, event
+                        ),
+                        usage_callback=lambda usage: run.update(usage=usage),
+                    )
+                else:
+                    completed = run_worker_subprocess(
+                        argv,
+                        working_directory=staged_run_dir,
+                        timeout_seconds=self.settings.worker_timeout_seconds,
+                        started_callback=lambda process: self._set_active_worker(
+                            process,
+                            worker_stop_event,
+                        ),
+                        stop_event=worker_stop_event,
+                        progress_callback=lambda event: self._record_progress(
+                            progress, event
+                        ),
+                        usage_callback=lambda usage: run.update(usage=usage),
+                    )
+            self.metrics.worker_exits.inc(completed.returncode)
+            run["exit_code"] = completed.returncode
+            # Output lines were logged as they arrived; only tails are kept.
             _LOGGER.info(
-                "worker finished: trigger=%s returncode=%s stdout_bytes=%s stderr_bytes=%s",
+                "worker finished: trigger=%s returncode=%s",
                 trigger_reason,
                 completed.returncode,
-                len(completed.stdout.encode("utf-8")),
-                len(completed.stderr.encode("utf-8")),
             )
 
             if self._shutdown_requested.is_set():
@@ -338,19 +604,31 @@ class ServiceRuntime:
                 )
             if completed.returncode != 0:
                 raise RuntimeError(_worker_failure_message(RuntimeError(), completed))
-            if not validate_staged_release(staged_run_dir):
-                raise ValueError(
-                    "Staged release is incomplete; expected dist/citation.json and dist/all.svg"
+            self._publish_progress(progress, progress.set_stage(STAGE_PROMOTING))
+            with _timed_phase(run["phases"], "promote"):
+                if not validate_staged_release(staged_run_dir):
+                    raise ValueError(
+                        "Staged release is incomplete; "
+                        "expected dist/citation.json and dist/all.svg"
+                    )
+
+                citation_payload = self._load_staged_citation_payload(staged_run_dir)
+                previous_release_dir = current_release_path(self.settings.state_dir)
+                release_dir = promote_release(
+                    self.settings.state_dir,
+                    staged_run_dir,
+                    finalize=False,
                 )
-
-            citation_payload = self._load_staged_citation_payload(staged_run_dir)
-            promote_release(self.settings.state_dir, staged_run_dir)
             _LOGGER.info(
                 "promotion completed: trigger=%s staged_run_dir=%s current_release=%s",
                 trigger_reason,
                 staged_run_dir,
                 current_release_path(self.settings.state_dir),
             )
+            run["release"] = os.path.basename(release_dir)
+            self._record_release(release_dir)
+            self._notify_release_promoted(release_dir)
+            self.finish_promotion_in_background(release_dir, previous_release_dir)
             self._write_terminal_status(
                 service_status="ready",
                 previous_status=previous_status,
@@ -363,7 +641,11 @@ class ServiceRuntime:
                 "refresh succeeded: trigger=%s service_status=ready",
                 trigger_reason,
             )
+            outcome = "succeeded"
         except Exception as error:
+            if completed is None:
+                run["exit_code"] = self._record_worker_exit(error)
+            run["error"] = _worker_failure_message(error, completed)
             citation_payload = self._load_staged_citation_payload(staged_run_dir)
             service_status = (
                 "stopping"
@@ -386,18 +668,20 @@ class ServiceRuntime:
             )
         finally:
             self._clear_active_worker()
+            run["phases"].update(_progress_phases(progress.snapshot()))
             shutil.rmtree(staged_run_dir, ignore_errors=True)
             _LOGGER.info(
                 "refresh finished: trigger=%s cleaned_staged_run_dir=%s",
                 trigger_reason,
                 staged_run_dir,
             )
+        return outcome
 
     def shutdown_worker(self) -> None:
         self._shutdown_requested.set()
-        payload = self._load_status()
-        payload["service"]["status"] = "stopping"
-        self._save_status(payload)
+        self._update_status(
+            lambda payload: payload["service"].update(status="stopping")
+        )
 
         with self._active_worker_lock:
             stop_event = self._active_worker_stop_event
@@ -416,49 +700,228 @@ class ServiceRuntime:
             except ProcessLookupError:
                 pass
 
-    def _failure_service_status(self) -> str:
-        return "stale" if current_release_path(self.settings.state_dir) else "failed"
+    def rollback(self, release: str | None = None) -> tuple[str, str | None]:
+        """Re-point `current` at a retained release; return (new, previous).
 
-    def _load_status(self) -> dict[str, Any]:
-        return _storage_module().safe_load_status(
-            self.state_layout.status_file,
-            settings=self.settings,
-        )
+        Raises `ValueError` when no suitable release is retained.
+        """
+
+        with self._releases_lock:
+            previous = current_release_path(self.settings.state_dir)
+            release_dir = rollback_release(self.settings.state_dir, release)
+        self._update_status(lambda payload: None)
+        self._record_release(release_dir)
+        self._notify_release_promoted(release_dir)
+        return release_dir, previous
+
+    def finish_promotion_in_background(
+        self,
+        release_dir: str,
+        previous_release_dir: str | None = None,
+    ) -> None:
+        """Finalize a renamed release and trim old ones off the refresh path.
+
+        The diff against `previous_release_dir` is stored with the release.
+        """
 
-    def _save_status(self, payload: dict[str, Any]) -> dict[str, Any]:
-        payload["storage"]["current_release"] = current_release_path(
+        threading.Thread(
+            target=self._finish_promotion,
+            args=(release_dir, previous_release_dir),
+            name="citation-release-finalize",
+            daemon=True,
+        ).start()
+
+    def _finish_promotion(
+        self,
+        release_dir: str,
+        previous_release_dir: str | None,
+    ) -> None:
+        try:
+            finalized = finalize_release(
+                self.settings.state_dir,
+                release_dir,
+                previous_release_dir,
+            )
+        except Exception as error:
+            _LOGGER.warning(
+                "release finalize failed: release=%s error=%s",
+                release_dir,
+                error,
+            )
+            finalized = False
+        if finalized and current_release_path(
             self.settings.state_dir
+        ) == os.path.realpath(release_dir):
+            # Rebuild the served index so it uses the new manifest.
+            self._notify_release_promoted(release_dir)
+        self._collect_releases()
+
+    def _collect_releases(self) -> None:
+        try:
+            with self._releases_lock:
+                collect_releases(
+                    self.settings.state_dir,
+                    self.settings.release_retention,
+                )
+        except Exception as error:
+            _LOGGER.warning("release garbage collection failed: error=%s", error)
+
+    def _notify_release_promoted(self, release_dir: str) -> None:
+        if self._release_promoted_callback is None:
+            return
+        try:
+            self._release_promoted_callback(release_dir)
+        except Exception as error:
+            _LOGGER.warning(
+                "release promoted callback failed: release=%s error=%s",
+                release_dir,
+                error,
+            )
+
+    def _record_worker_exit(self, error: BaseException) -> int | str:
+        code: int | str
+        if isinstance(error, WorkerShutdownError):
+            code = "shutdown" if error.returncode is None else error.returncode
+        elif isinstance(error, subprocess.TimeoutExpired):
+            code = "timeout"
+        else:
+            code = "error"
+        self.metrics.worker_exits.inc(code)
+        return code
+
+    def _record_run_started(self, trigger_reason: str) -> int | None:
+        if self.state_db is None:
+            return None
+        try:
+            return self.state_db.start_run(trigger_reason, _timestamp_now())
+        except self.state_db.Error as error:
+            _LOGGER.warning("refresh run history write failed: error=%s", error)
+            return None
+
+    def _record_run_finished(
+        self,
+        run_id: int | None,
+        outcome: str,
+        duration_seconds: float,
+        run: Mapping[str, Any],
+    ) -> None:
+        if self.state_db is None or run_id is None:
+            return
+        try:
+            self.state_db.finish_run(
+                run_id,
+                finished_at=_timestamp_now(),
+                duration_seconds=duration_seconds,
+                outcome=outcome,
+                exit_code=run.get("exit_code"),
+                error=run.get("error"),
+                release=run.get("release"),
+                resources=run.get("resources"),
+            )
+        except self.state_db.Error as error:
+            _LOGGER.warning("refresh run history write failed: error=%s", error)
+
+    def _record_resources(
+        self,
+        trigger_reason: str,
+        outcome: str,
+        duration_seconds: float,
+        run: Mapping[str, Any],
+    ) -> dict[str, Any]:
+        """Publish phase timings, worker usage and exceeded budgets of a run."""
+
+        usage = run.get("usage")
+        exceeded = check_budgets(
+            {
+                BUDGET_WALL_SECONDS: self.settings.refresh_wall_budget_seconds,
+                BUDGET_CPU_SECONDS: self.settings.refresh_cpu_budget_seconds,
+                BUDGET_MAX_RSS_MB: self.settings.refresh_max_rss_budget_mb,
+            },
+            usage=usage,
+            wall_seconds=duration_seconds,
         )
-        payload["storage"]["has_data"] = (
-            payload["storage"]["current_release"] is not None
+        resources = {
+            "trigger": trigger_reason,
+            "outcome": outcome,
+            "finished_at": _timestamp_now(),
+            "phases": {**run.get("phases", {}), "total": round(duration_seconds, 3)},
+            "usage": None if usage is None else usage.to_dict(),
+            "budgets_exceeded": exceeded,
+        }
+        _LOGGER.info(
+            "refresh resources: trigger=%s phases=%s usage=%s",
+            trigger_reason,
+            json.dumps(resources["phases"], sort_keys=True),
+            json.dumps(resources["usage"], sort_keys=True),
         )
-        return _storage_module().save_status(
-            self.state_layout.status_file,
-            payload,
-            settings=self.settings,
+        for item in exceeded:
+            self.metrics.refresh_budget_exceeded.inc(item["budget"])
+            _LOGGER.warning(
+                "refresh budget exceeded: trigger=%s budget=%s limit=%s actual=%s",
+                trigger_reason,
+                item["budget"],
+                item["limit"],
+                item["actual"],
+            )
+        self._update_status(
+            lambda payload: payload["service"].update(last_refresh=resources)
         )
+        return resources
+
+    def _record_release(self, release_dir: str) -> None:
+        if self.state_db is None:
+            return
+        try:
+            self.state_db.record_release(release_dir, _timestamp_now())
+        except self.state_db.Error as error:
+            _LOGGER.warning("release history write failed: error=%s", error)
+
+    def _failure_service_status(self) -> str:
+        return "stale" if current_release_path(self.settings.state_dir) else "failed"
+
+    def _load_status(self) -> dict[str, Any]:
+        return self.status_store.snapshot()
+
+    def _update_status(
+        self, mutate: Callable[[dict[str, Any]], Any]
+    ) -> dict[str, Any]:
+        current_release = current_release_path(self.settings.state_dir)
+
+        def _apply(payload: dict[str, Any]) -> None:
+            mutate(payload)
+            payload["storage"]["current_release"] = current_release
+            payload["storage"]["has_data"] = current_release is not None
+
+        return self.status_store.update(_apply)
 
     def _write_running_status(
         self,
         previous_status: Mapping[str, Any],
         attempted_at: str,
+        progress: RefreshProgress,
     ) -> dict[str, Any]:
-        payload = self._load_status()
-        payload["service"]["status"] = "running"
-        payload["sources"]["google_scholar"] = _running_source_state(
-            previous_status.get("sources", {}).get("google_scholar"),
-            attempted_at,
-        )
-        if self.settings.wos_enabled:
-            payload["sources"]["web_of_science"] = _running_source_state(
-                previous_status.get("sources", {}).get("web_of_science"),
+        previous_sources = previous_status.get("sources", {})
+        with self._progress_lock:
+            self._active_progress = progress
+
+        def _apply(payload: dict[str, Any]) -> None:
+            payload["service"]["status"] = "running"
+            payload["service"]["progress"] = progress.snapshot()
+            payload["sources"]["google_scholar"] = _running_source_state(
+                previous_sources.get("google_scholar"),
                 attempted_at,
             )
-        else:
-            payload["sources"]["web_of_science"] = _disabled_source_state(
-                previous_status.get("sources", {}).get("web_of_science")
-            )
-        return self._save_status(payload)
+            if self.settings.wos_enabled:
+                payload["sources"]["web_of_science"] = _running_source_state(
+                    previous_sources.get("web_of_science"),
+                    attempted_at,
+                )
+            else:
+                payload["sources"]["web_of_science"] = _disabled_source_state(
+                    previous_sources.get("web_of_science")
+                )
+
+        return self._update_status(_apply)
 
     def _write_terminal_status(
         self,
@@ -470,23 +933,49 @@ class ServiceRuntime:
         citation_payload: Mapping[str, Any] | None,
         fallback_error: str,
     ) -> dict[str, Any]:
-        payload = self._load_status()
-        payload["service"]["status"] = service_status
-        payload["sources"]["google_scholar"] = self._google_scholar_status(
+        google_scholar = self._google_scholar_status(
             previous_status=previous_status.get("sources", {}).get("google_scholar"),
             attempted_at=attempted_at,
             finished_at=finished_at,
             citation_payload=citation_payload,
             fallback_error=fallback_error,
         )
-        payload["sources"]["web_of_science"] = self._web_of_science_status(
+        web_of_science = self._web_of_science_status(
             previous_status=previous_status.get("sources", {}).get("web_of_science"),
             attempted_at=attempted_at,
             finished_at=finished_at,
             citation_payload=citation_payload,
             fallback_error=fallback_error,
         )
-        return self._save_status(payload)
+
+        def _apply(payload: dict[str, Any]) -> None:
+            payload["service"]["status"] = service_status
+            payload["service"]["progress"] = None
+            payload["sources"]["google_scholar"] = google_scholar
+            payload["sources"]["web_of_science"] = web_of_science
+
+        with self._progress_lock:
+            self._active_progress = None
+            return self._update_status(_apply)
+
+    def _record_progress(
+        self,
+        progress: RefreshProgress,
+        event: Mapping[str, Any],
+    ) -> None:
+        self._publish_progress(progress, progress.apply(event))
+
+    def _publish_progress(
+        self,
+        progress: RefreshProgress,
+        snapshot: dict[str, Any],
+    ) -> None:
+        with self._progress_lock:
+            if self._active_progress is not progress:
+                return
+            self._update_status(
+                lambda payload: payload["service"].update(progress=snapshot)
+            )
 
     def _google_scholar_status(
         self,
@@ -530,15 +1019,17 @@ class ServiceRuntime:
 
     def _set_active_worker(
         self,
-        process: subprocess.Popen[str],
+        process: subprocess.Popen[str] | None,
         stop_event: threading.Event,
     ) -> None:
+        """Track the running worker; in-process workers have no `process`."""
+
         with self._active_worker_lock:
             self._active_worker_process = process
             self._active_worker_stop_event = stop_event
             if self._shutdown_requested.is_set():
                 stop_event.set()
-                if process.poll() is None:
+                if process is not None and process.poll() is None:
                     try:
                         process.terminate()
                     except ProcessLookupError:
@@ -555,7 +1046,7 @@ class ServiceRuntime:
     ) -> Mapping[str, Any] | None:
         citation_json_path = os.path.join(staged_run_dir, "dist", "citation.json")
         try:
-            payload = _storage_module().load_json_file(citation_json_path)
+            payload = load_json_file(citation_json_path)
         except (
             FileNotFoundError,
             OSError,
@@ -582,31 +1073,87 @@ class CitationServiceHTTPServer(ThreadingHTTPServer):
         *,
         worker_python_executable: str = "python",
         worker_script_path: str | None = None,
+        read_only: bool = False,
+        reuse_port: bool = False,
     ) -> None:
         self.settings = settings
-        self._background_services_stopped = False
-        self.state_layout = _storage_module().ensure_state_layout(
+        self.startup_profile = StartupProfile() if settings.startup_profile else None
+        if self.startup_profile is not None:
+            self.startup_profile.mark("imports")
+        self.read_only = read_only
+        self.reuse_port = reuse_port
+        self.metrics = ServiceMetrics()
+        self.events = EventBroker()
+        self.event_streams = InFlightLimiter(settings.max_event_streams)
+        self.release_indexes = ReleaseIndexCache(metrics=self.metrics)
+        self.release_diffs = ReleaseDiffCache(metrics=self.metrics)
+        self.current_release = CurrentRelease(
             settings.state_dir,
-            settings=settings,
+            self.release_indexes,
+            metrics=self.metrics,
+        )
+        self._published_release: str | None = None
+        self.release_promoted_listeners: list[Callable[[str], Any]] = [
+            self.current_release.set,
+            self._publish_release_changed,
+        ]
+        self.admission = AdmissionController(
+            rate_per_second=settings.rate_limit_per_second,
+            burst=settings.rate_limit_burst,
+            max_inflight=settings.max_inflight_requests,
         )
-        self.runtime = ServiceRuntime(
+        self._background_services_stopped = False
+        self.state_layout = ensure_state_layout(
+            settings.state_dir,
             settings=settings,
-            state_layout=self.state_layout,
-            worker_python_executable=worker_python_executable,
-            worker_script_path=worker_script_path,
         )
-        self.scheduler = create_service_scheduler(
+        self.status_store = StatusStore(
+            self.state_layout.status_file,
             settings=settings,
-            status_path=self.state_layout.status_file,
-            refresh=self.runtime.refresh,
-            shutdown_callback=self.runtime.shutdown_worker,
+            flush_delay=settings.status_flush_delay_seconds,
         )
+        self.runtime: ServiceRuntime | None = None
+        self.scheduler: ServiceScheduler | None = None
+        if not read_only:
+            self.runtime = ServiceRuntime(
+                settings=settings,
+                state_layout=self.state_layout,
+                worker_python_executable=worker_python_executable,
+                worker_script_path=worker_script_path,
+                metrics=self.metrics,
+                release_promoted_callback=self._release_promoted,
+                events=self.events,
+                status_store=self.status_store,
+            )
+            self.scheduler = _scheduler_module().create_service_scheduler(
+                settings=settings,
+                status_store=self.status_store,
+                refresh=self.runtime.refresh,
+                shutdown_callback=self.runtime.shutdown_worker,
+            )
         super().__init__(
             (settings.app_host, settings.app_port),
             CitationServiceRequestHandler,
         )
+        self.access_log = AccessLogger.from_settings(settings, metrics=self.metrics)
+        if self.access_log is not None:
+            self.access_log.start()
+        if self.startup_profile is not None:
+            self.startup_profile.mark("server_init")
+
+    def server_bind(self) -> None:
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
 
     def start_background_services(self) -> None:
+        if self.runtime is None or self.scheduler is None:
+            _LOGGER.info(
+                "service serving read-only: pid=%s state_dir=%s",
+                os.getpid(),
+                self.settings.state_dir,
+            )
+            return
         _LOGGER.info(
             "service starting background services: host=%s port=%s state_dir=%s cron=%s timezone=%s refresh_on_startup=%s wos_enabled=%s",
             self.settings.app_host,
@@ -618,6 +1165,10 @@ class CitationServiceHTTPServer(ThreadingHTTPServer):
             self.settings.wos_enabled,
         )
         self.runtime.synchronize_status()
+        current_release = current_release_path(self.settings.state_dir)
+        if current_release is not None:
+            # Finishes a promotion interrupted before its manifest was written.
+            self.runtime.finish_promotion_in_background(current_release)
         self.scheduler.start()
         _LOGGER.info("service background services started")
 
@@ -625,13 +1176,51 @@ class CitationServiceHTTPServer(ThreadingHTTPServer):
         if self._background_services_stopped:
             return
         self._background_services_stopped = True
+        if self.scheduler is None:
+            return
         _LOGGER.info("service stopping background services")
         self.scheduler.shutdown()
         _LOGGER.info("service background services stopped")
 
+    def reload_current_release(self) -> None:
+        """Rebuild in-memory release state after another process promoted."""
+
+        index = self.current_release.reload()
+        if index is not None:
+            self._publish_release_changed(index.release_dir)
+
+    def _release_promoted(self, release_dir: str) -> None:
+        # Each listener is isolated so one failure cannot stop, for example,
+        # the prefork supervisor from being told to reload the replicas.
+        for listener in self.release_promoted_listeners:
+            try:
+                listener(release_dir)
+            except Exception as error:
+                _LOGGER.warning(
+                    "release promoted listener failed: listener=%s release=%s error=%s",
+                    getattr(listener, "__name__", repr(listener)),
+                    release_dir,
+                    error,
+                )
+
+    def _publish_release_changed(self, release_dir: str) -> None:
+        # A finalized release is announced again to reload indexes; clients
+        # only need to hear about actual changes.
+        if release_dir == self._published_release:
+            return
+        self._published_release = release_dir
+        self.events.publish(
+            RELEASE_CHANGED,
+            {"release": os.path.basename(release_dir)},
+        )
+
     def server_close(self) -> None:
         self.stop_background_services()
+        self.status_store.close()
+        self.events.close()
         super().server_close()
+        if self.access_log is not None:
+            self.access_log.close()
         _LOGGER.info("service server closed")
 
 
@@ -644,35 +1233,253 @@ class CitationServiceRequestHandler(BaseHTTPRequestHandler):
     def do_HEAD(self) -> None:  # noqa: N802 - stdlib handler naming
         self._dispatch_request(include_body=False)
 
+    def do_POST(self) -> None:  # noqa: N802 - stdlib handler naming
+        self._dispatch_request(include_body=True)
+
     def _dispatch_request(self, *, include_body: bool) -> None:
-        path = urlsplit(self.path).path
+        started = time.perf_counter()
+        self._response_status = 0
+        self._response_bytes = 0
+        self._admitted = False
+        route = "not_found"
+        server = self._service_server()
+        url = urlsplit(self.path)
+        try:
+            if url.path == METRICS_PATH:
+                route = self._route_request(url, include_body=include_body)
+                return
+
+            rejection = server.admission.try_admit(self.client_address[0])
+            if rejection is not None:
+                route = "rejected"
+                server.metrics.http_rejections.inc(rejection.reason)
+                self._respond_rejection(rejection, include_body=include_body)
+                return
+
+            self._admitted = True
+            try:
+                route = self._route_request(url, include_body=include_body)
+            finally:
+                self._release_admission()
+        finally:
+            duration_seconds = time.perf_counter() - started
+            if server.access_log is not None:
+                server.access_log.log(
+                    AccessRecord(
+                        time.time(),
+                        self.client_address[0],
+                        self.command,
+                        self.path,
+                        self._response_status,
+                        self._response_bytes,
+                        duration_seconds,
+                        route,
+                    )
+                )
+            server.metrics.observe_request(
+                route,
+                self.command,
+                self._response_status,
+                self._response_bytes,
+                duration_seconds,
+            )
+            if server.startup_profile is not None:
+                server.startup_profile.record_first_response()
+
+    def _route_request(self, url: SplitResult, *, include_body: bool) -> str:
+        path = url.path
+        if path == ADMIN_ROLLBACK_PATH:
+            if not self._service_server().settings.admin_token:
+                # Admin endpoints do not exist unless ADMIN_TOKEN is set.
+                self._discard_request_body()
+                self._respond_text(
+                    HTTPStatus.NOT_FOUND, "Not Found\n", include_body=include_body
+                )
+                return "not_found"
+            if self.command != "POST":
+                self._respond_method_not_allowed("POST", include_body=include_body)
+            else:
+                self._handle_rollback(url.query)
+            return "admin_rollback"
+        if self.command == "POST":
+            self._discard_request_body()
+            self._respond_method_not_allowed("GET, HEAD", include_body=True)
+            return "method_not_allowed"
         if path == "/status":
-            self._handle_status(include_body=include_body)
-            return
-        if path == JSON_COMPATIBILITY_PATH:
-            self._handle_citation_json(include_body=include_body)
-            return
-        if self._is_supported_svg_path(path):
-            self._handle_svg(path, include_body=include_body)
-            return
+            self._handle_status(url.query, include_body=include_body)
+            return "status"
+        if path == EVENTS_PATH:
+            self._handle_events(include_body=include_body)
+            return "events"
+        if path == METRICS_PATH:
+            self._handle_metrics(include_body=include_body)
+            return "metrics"
+        if path == COUNTS_PATH:
+            self._handle_counts(url.query, include_body=include_body)
+            return "counts"
+        if path == PUBLICATIONS_PATH:
+            self._handle_publications(url.query, include_body=include_body)
+            return "publications"
+        if path == DIFF_PATH:
+            self._handle_diff(url.query, include_body=include_body)
+            return "diff"
+        artifact = artifact_route(path)
+        if artifact is not None:
+            self._handle_artifact(path, artifact[0], include_body=include_body)
+            return artifact[0]
         self._respond_text(
             HTTPStatus.NOT_FOUND, "Not Found\n", include_body=include_body
         )
+        return "not_found"
 
     def _service_server(self) -> CitationServiceHTTPServer:
         return cast(CitationServiceHTTPServer, self.server)
 
-    def _handle_status(self, *, include_body: bool) -> None:
+    def _release_admission(self) -> None:
+        """Free the in-flight slot early, before a handler blocks on events."""
+
+        if self._admitted:
+            self._admitted = False
+            self._service_server().admission.release()
+
+    def _status_body(self) -> tuple[bytes, str]:
+        payload = self._service_server().status_store.snapshot()
+        body = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        return body, f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+    def _handle_status(self, query: str, *, include_body: bool) -> None:
+        parameters = parse_qs(query)
+        wait_etag = _query_value(parameters, "wait")
+        try:
+            wait_seconds = _query_int(
+                parameters,
+                "timeout",
+                DEFAULT_STATUS_WAIT_SECONDS,
+                maximum=MAX_STATUS_WAIT_SECONDS,
+            )
+        except ValueError as error:
+            self._respond_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "invalid_query", "message": str(error)},
+                include_body=include_body,
+            )
+            return
+
         server = self._service_server()
-        payload = _storage_module().safe_load_status(
-            server.state_layout.status_file,
-            settings=server.settings,
-        )
-        self._respond_json(HTTPStatus.OK, payload, include_body=include_body)
+        # Capture the event sequence before reading status so an event that
+        # lands in between still wakes the wait below.
+        sequence = server.events.sequence
+        body, etag = self._status_body()
+        if wait_etag is not None and _etag_matches(wait_etag, etag):
+            if not server.event_streams.try_acquire():
+                server.metrics.http_rejections.inc("too_many_streams")
+                self._respond_rejection(
+                    Rejection("too_many_streams", HTTPStatus.SERVICE_UNAVAILABLE, 5),
+                    include_body=include_body,
+                )
+                return
+            self._release_admission()
+            try:
+                deadline = time.monotonic() + (wait_seconds or 0)
+                while _etag_matches(wait_etag, etag):
+                    events = server.events.wait_for(
+                        sequence, deadline - time.monotonic()
+                    )
+                    if not events:
+                        # Status can change without an event (e.g. a read-only
+                        # process reloading a release); re-read before a 304.
+                        body, etag = self._status_body()
+                        break
+                    sequence = events[-1].sequence
+                    body, etag = self._status_body()
+            finally:
+                server.event_streams.release()
+
+            if _etag_matches(wait_etag, etag):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", JSON_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if include_body:
+            self._write_body(body)
+
+    def _handle_events(self, *, include_body: bool) -> None:
+        server = self._service_server()
+        if not server.event_streams.try_acquire():
+            server.metrics.http_rejections.inc("too_many_streams")
+            self._respond_rejection(
+                Rejection("too_many_streams", HTTPStatus.SERVICE_UNAVAILABLE, 5),
+                include_body=include_body,
+            )
+            return
+        self._release_admission()
+
+        try:
+            sequence = server.events.sequence
+            pending: list[ServiceEvent] = []
+            last_event_id = self.headers.get("Last-Event-ID", "").strip()
+            if last_event_id.isdigit() and int(last_event_id) <= sequence:
+                pending = server.events.events_after(int(last_event_id))
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if not include_body:
+                return
+
+            self._write_body(b"retry: 5000\n: connected\n\n")
+            while True:
+                for event in pending:
+                    self._write_body(_format_sse_event(event))
+                    sequence = event.sequence
+                if server.events.closed:
+                    return
+                pending = server.events.wait_for(
+                    sequence, EVENT_STREAM_HEARTBEAT_SECONDS
+                )
+                if not pending:
+                    self._write_body(b": keepalive\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        finally:
+            server.event_streams.release()
+
+    def _handle_metrics(self, *, include_body: bool) -> None:
+        body = self._service_server().metrics.render().encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", EXPOSITION_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self._write_body(body)
+
+    def _handle_counts(self, query: str, *, include_body: bool) -> None:
+        parameters = parse_qs(query)
+        publication_ids = _split_query_list(parameters.get("ids", []))
+        metric_names = _split_query_list(parameters.get("metrics", []))
+        if not publication_ids and not metric_names:
+            metric_names = list(SUPPORTED_METRICS)
+        if len(publication_ids) + len(metric_names) > MAX_COUNTS_KEYS:
+            self._respond_json(
+                HTTPStatus.BAD_REQUEST,
+                {
+                    "error": "too_many_keys",
+                    "message": f"At most {MAX_COUNTS_KEYS} ids and metrics per request",
+                },
+                include_body=include_body,
+            )
+            return
 
-    def _handle_citation_json(self, *, include_body: bool) -> None:
-        artifact_path = self._current_release_artifact_path("citation.json")
-        if artifact_path is None:
+        index = self._current_release_index()
+        if index is None:
             self._respond_json(
                 HTTPStatus.SERVICE_UNAVAILABLE,
                 {"error": "no_data", "message": "No successful refresh yet"},
@@ -680,42 +1487,263 @@ class CitationServiceRequestHandler(BaseHTTPRequestHandler):
             )
             return
 
-        self._respond_file(
+        self._respond_json(
             HTTPStatus.OK,
-            artifact_path,
-            content_type="application/json; charset=utf-8",
+            index.counts(publication_ids, metric_names),
             include_body=include_body,
+            compact=True,
         )
 
-    def _handle_svg(self, path: str, *, include_body: bool) -> None:
-        artifact_path = self._current_release_artifact_path(path.lstrip("/"))
-        if artifact_path is None:
-            self._respond_text(
-                HTTPStatus.NOT_FOUND, "Not Found\n", include_body=include_body
+    def _handle_publications(self, query: str, *, include_body: bool) -> None:
+        parameters = parse_qs(query)
+        try:
+            sort = _query_value(parameters, "sort") or "citations"
+            if sort not in PUBLICATION_SORT_KEYS:
+                raise ValueError(
+                    f"'sort' must be one of {', '.join(PUBLICATION_SORT_KEYS)}"
+                )
+            order = _query_value(parameters, "order") or (
+                "desc" if DEFAULT_SORT_DESCENDING[sort] else "asc"
+            )
+            if order not in {"asc", "desc"}:
+                raise ValueError("'order' must be 'asc' or 'desc'")
+            limit = _query_int(
+                parameters,
+                "limit",
+                DEFAULT_PUBLICATIONS_LIMIT,
+                maximum=MAX_PUBLICATIONS_LIMIT,
+            )
+            offset = _query_int(parameters, "offset", 0)
+            year_from = _query_int(parameters, "year_from", None)
+            year_to = _query_int(parameters, "year_to", None)
+        except ValueError as error:
+            self._respond_json(
+                HTTPStatus.BAD_REQUEST,
+                {"error": "invalid_query", "message": str(error)},
+                include_body=include_body,
             )
             return
 
-        self._respond_file(
+        index = self._current_release_index()
+        if index is None:
+            self._respond_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "no_data", "message": "No successful refresh yet"},
+                include_body=include_body,
+            )
+            return
+
+        total, publications = index.publications.query(
+            sort=sort,
+            descending=order == "desc",
+            offset=offset or 0,
+            limit=DEFAULT_PUBLICATIONS_LIMIT if limit is None else limit,
+            year_from=year_from,
+            year_to=year_to,
+            title_prefix=_query_value(parameters, "title_prefix"),
+        )
+        self._respond_json(
             HTTPStatus.OK,
-            artifact_path,
-            content_type=SVG_CONTENT_TYPE,
+            {
+                "release": index.run_id,
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+                "sort": sort,
+                "order": order,
+                "publications": publications,
+            },
             include_body=include_body,
+            compact=True,
         )
 
-    def _current_release_artifact_path(self, filename: str) -> str | None:
-        release_dir = current_release_path(self._service_server().settings.state_dir)
-        if release_dir is None:
-            return None
+    def _handle_diff(self, query: str, *, include_body: bool) -> None:
+        parameters = parse_qs(query)
+        state_dir = self._service_server().settings.state_dir
+        from_release = _query_value(parameters, "from")
+        to_release = _query_value(parameters, "to")
+        try:
+            if to_release is None:
+                to_release_dir = current_release_path(state_dir)
+                if to_release_dir is None:
+                    self._respond_json(
+                        HTTPStatus.SERVICE_UNAVAILABLE,
+                        {"error": "no_data", "message": "No successful refresh yet"},
+                        include_body=include_body,
+                    )
+                    return
+            else:
+                to_release_dir = resolve_release(state_dir, to_release)
+            diff = load_release_diff(to_release_dir)
+            if from_release is None and diff is None:
+                self._respond_json(
+                    HTTPStatus.NOT_FOUND,
+                    {
+                        "error": "no_diff",
+                        "message": (
+                            f"No diff is stored for release "
+                            f"'{os.path.basename(to_release_dir)}'; pass 'from'"
+                        ),
+                    },
+                    include_body=include_body,
+                )
+                return
+            if diff is None or (
+                from_release is not None and diff.get("from") != from_release
+            ):
+                diff = self._service_server().release_diffs.get(
+                    resolve_release(state_dir, from_release), to_release_dir
+                )
+        except MissingManifestError as error:
+            self._respond_json(
+                HTTPStatus.CONFLICT,
+                {"error": "no_manifest", "message": str(error)},
+                include_body=include_body,
+            )
+            return
+        except (OSError, ValueError) as error:
+            self._respond_json(
+                HTTPStatus.NOT_FOUND,
+                {"error": "unknown_release", "message": str(error)},
+                include_body=include_body,
+            )
+            return
+        self._respond_json(HTTPStatus.OK, diff, include_body=include_body, compact=True)
 
-        artifact_path = os.path.join(release_dir, "dist", filename)
-        if not os.path.isfile(artifact_path):
-            return None
-        return artifact_path
+    def _handle_rollback(self, query: str) -> None:
+        self._discard_request_body()
+        server = self._service_server()
+        if not self._admin_authorized():
+            self.send_response(HTTPStatus.UNAUTHORIZED)
+            self.send_header("WWW-Authenticate", "Bearer")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if server.runtime is None:
+            # Only the process that owns STATE_DIR may switch releases.
+            self._respond_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {
+                    "error": "read_only",
+                    "message": "This process does not own STATE_DIR; retry",
+                },
+                include_body=True,
+            )
+            return
+
+        release = _query_value(parse_qs(query), "release")
+        try:
+            release_dir, previous = server.runtime.rollback(release)
+        except ValueError as error:
+            self._respond_json(
+                HTTPStatus.CONFLICT,
+                {"error": "rollback_failed", "message": str(error)},
+                include_body=True,
+            )
+            return
+        self._respond_json(
+            HTTPStatus.OK,
+            {
+                "release": os.path.basename(release_dir),
+                "previous": os.path.basename(previous) if previous else None,
+            },
+            include_body=True,
+        )
 
-    def _is_supported_svg_path(self, path: str) -> bool:
-        if path in {"/all.svg", "/review.svg"}:
-            return True
-        return _PUBLICATION_SVG_PATH.fullmatch(path) is not None
+    def _admin_authorized(self) -> bool:
+        token = self._service_server().settings.admin_token
+        scheme, _, credentials = self.headers.get("Authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(
+            credentials.strip().encode("utf-8"),
+            token.encode("utf-8"),
+        )
+
+    def _discard_request_body(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = 0
+        if length > MAX_ADMIN_BODY_BYTES:
+            self.close_connection = True
+        elif length > 0:
+            self.rfile.read(length)
+
+    def _handle_artifact(self, path: str, route: str, *, include_body: bool) -> None:
+        server = self._service_server()
+        index = server.current_release.get()
+        if self._respond_artifact(index, path, include_body=include_body):
+            return
+        if index is not None and path in index.routes:
+            # The release was replaced and collected after the lookup; resolve
+            # the pointer again and retry once before answering a miss.
+            index = server.current_release.reload()
+            if self._respond_artifact(index, path, include_body=include_body):
+                return
+
+        # Missing JSON means "no data yet" until a release proves otherwise;
+        # every other miss is a plain 404, decided without touching the disk.
+        if route == "citation_json" or (
+            index is None and route == "profile_citation_json"
+        ):
+            self._respond_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "no_data", "message": "No successful refresh yet"},
+                include_body=include_body,
+            )
+            return
+        self._respond_text(
+            HTTPStatus.NOT_FOUND, "Not Found\n", include_body=include_body
+        )
+
+    def _respond_artifact(
+        self,
+        index: ReleaseIndex | None,
+        path: str,
+        *,
+        include_body: bool,
+    ) -> bool:
+        artifact = index.routes.get(path) if index is not None else None
+        if artifact is None:
+            return False
+        headers = {}
+        if artifact.etag is not None:
+            headers["ETag"] = artifact.etag
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match is not None and _if_none_match(
+                if_none_match, artifact.etag
+            ):
+                # Answered from the manifest alone, without opening the file.
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", artifact.etag)
+                self.end_headers()
+                return True
+        if artifact.last_modified is not None:
+            headers["Last-Modified"] = artifact.last_modified
+        return self._respond_file(
+            HTTPStatus.OK,
+            artifact.file_path,
+            content_type=artifact.content_type,
+            include_body=include_body,
+            expected_size=artifact.size,
+            headers=headers,
+        )
+
+    def _current_release_index(self) -> ReleaseIndex | None:
+        return self._service_server().current_release.get()
+
+    def _respond_rejection(self, rejection: Rejection, *, include_body: bool) -> None:
+        body = (
+            b"Too Many Requests\n"
+            if rejection.reason == "rate_limited"
+            else b"Service Unavailable\n"
+        )
+        self.send_response(rejection.status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Retry-After", str(rejection.retry_after_seconds))
+        self.end_headers()
+        if include_body:
+            self._write_body(body)
 
     def _respond_json(
         self,
@@ -723,14 +1751,30 @@ class CitationServiceRequestHandler(BaseHTTPRequestHandler):
         payload: Any,
         *,
         include_body: bool,
+        compact: bool = False,
     ) -> None:
-        body = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        if compact:
+            body = json.dumps(
+                payload, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+        else:
+            body = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
         self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Type", JSON_CONTENT_TYPE)
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         if include_body:
-            self.wfile.write(body)
+            self._write_body(body)
+
+    def _respond_method_not_allowed(self, allowed: str, *, include_body: bool) -> None:
+        body = b"Method Not Allowed\n"
+        self.send_response(HTTPStatus.METHOD_NOT_ALLOWED)
+        self.send_header("Allow", allowed)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self._write_body(body)
 
     def _respond_text(
         self,
@@ -745,7 +1789,7 @@ class CitationServiceRequestHandler(BaseHTTPRequestHandler):
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         if include_body:
-            self.wfile.write(body)
+            self._write_body(body)
 
     def _respond_file(
         self,
@@ -754,18 +1798,73 @@ class CitationServiceRequestHandler(BaseHTTPRequestHandler):
         *,
         content_type: str,
         include_body: bool,
-    ) -> None:
-        with open(file_path, "rb") as handle:
-            body = handle.read()
+        expected_size: int | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> bool:
+        """Send a file; return False, with nothing sent, if it cannot be opened.
 
-        self.send_response(status)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        if include_body:
-            self.wfile.write(body)
+        With `expected_size` from the release manifest, a file of any other
+        size is refused with a 500 instead of being served.
+
+        Release garbage collection deletes old releases, so a path resolved a
+        moment ago may already be gone; callers answer that like any other miss.
+        """
+
+        try:
+            handle = open(file_path, "rb")
+        except OSError:
+            return False
+        with handle:
+            try:
+                size = os.fstat(handle.fileno()).st_size
+            except OSError:
+                return False
+            if expected_size is not None and size != expected_size:
+                self._service_server().metrics.artifact_integrity_failures.inc()
+                _LOGGER.error(
+                    "artifact does not match the release manifest: path=%s size=%s expected=%s",
+                    file_path,
+                    size,
+                    expected_size,
+                )
+                self._respond_text(
+                    HTTPStatus.INTERNAL_SERVER_ERROR,
+                    "Internal Server Error\n",
+                    include_body=include_body,
+                )
+                return True
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(size))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if not include_body:
+                return True
+            sent = send_file_body(self.connection, self.wfile, handle, size)
+            self._response_bytes += sent
+            if sent < size:
+                # The file shrank after fstat; the client cannot trust the rest
+                # of this connection, so close it instead of reusing it.
+                self.close_connection = True
+                _LOGGER.warning(
+                    "short file response: path=%s sent=%s expected=%s",
+                    file_path,
+                    sent,
+                    size,
+                )
+        return True
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        self._response_status = int(code)
+        super().send_response(code, message)
+
+    def _write_body(self, body: bytes) -> None:
+        self.wfile.write(body)
+        self._response_bytes += len(body)
 
     def log_message(self, format: str, *args: object) -> None:
+        # Access logging is handled by `AccessLogger` off the request thread.
         return
 
 
@@ -774,6 +1873,8 @@ def create_server(
     *,
     worker_python_executable: str = "python",
     worker_script_path: str | None = None,
+    read_only: bool = False,
+    reuse_port: bool = False,
 ) -> CitationServiceHTTPServer:
     """Build the service server with resolved runtime settings."""
 
@@ -781,6 +1882,8 @@ def create_server(
         settings or Settings(),
         worker_python_executable=worker_python_executable,
         worker_script_path=worker_script_path,
+        read_only=read_only,
+        reuse_port=reuse_port,
     )
 
 
@@ -820,12 +1923,9 @@ def _restore_signal_handlers(previous_handlers: dict[signal.Signals, Any]) -> No
         signal.signal(signum, handler)
 
 
-def main() -> None:
-    """Start the self-hosted HTTP service."""
+def serve(server: CitationServiceHTTPServer) -> None:
+    """Run one server until SIGINT/SIGTERM, owning its background services."""
 
-    _configure_runtime_logging()
-    server = create_server()
-    _LOGGER.info("service process initialized")
     previous_handlers = _install_signal_handlers(server)
     server.start_background_services()
     try:
@@ -834,6 +1934,8 @@ def main() -> None:
             server.settings.app_host,
             server.settings.app_port,
         )
+        if server.startup_profile is not None:
+            server.startup_profile.mark("listening")
         server.serve_forever()
     except KeyboardInterrupt:
         _LOGGER.info("keyboard interrupt received")
@@ -844,5 +1946,19 @@ def main() -> None:
         _LOGGER.info("service stopped")
 
 
+def main() -> None:
+    """Start the self-hosted HTTP service."""
+
+    _configure_runtime_logging()
+    settings = Settings()
+    if settings.server_processes > 1:
+        import_module("service.prefork").serve_prefork(settings)
+        return
+
+    server = create_server(settings)
+    _LOGGER.info("service process initialized")
+    serve(server)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,52 @@
+"""Startup timing report enabled with `STARTUP_PROFILE=1`."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from . import IMPORT_STARTED_AT
+
+_LOGGER = logging.getLogger("citation_badge.service")
+
+
+class StartupProfile:
+    """Record startup milestones and log them once the first response is sent.
+
+    Times are milliseconds since the `service` package started importing:
+    `imports` when the server is constructed, `server_init` once the socket is
+    bound and background objects exist, `listening` right before the accept
+    loop, and `first_byte` after the first response has been written.
+    """
+
+    def __init__(self, origin: float = IMPORT_STARTED_AT) -> None:
+        self.origin = origin
+        self._lock = threading.Lock()
+        self._marks: dict[str, float] = {}
+        self._reported = False
+
+    def mark(self, name: str) -> float:
+        elapsed_ms = (time.perf_counter() - self.origin) * 1000
+        with self._lock:
+            return self._marks.setdefault(name, elapsed_ms)
+
+    def marks(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._marks)
+
+    def record_first_response(self) -> None:
+        if self._reported:
+            return
+        with self._lock:
+            if self._reported:
+                return
+            self._reported = True
+        self.mark("first_byte")
+        _LOGGER.info(
+            "startup profile: %s",
+            " ".join(f"{name}_ms={value:.1f}" for name, value in self.marks().items()),
+        )
+
+
+__all__ = ["StartupProfile"]
@@ -2,21 +2,227 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from copy import deepcopy
+from dataclasses import dataclass, field, fields
+from functools import cache
 from typing import Any
 
 from . import __version__
 from .config import Settings
 
+# Bump when the persisted layout changes and add a step to `_MIGRATIONS`.
+STATUS_SCHEMA_VERSION = 1
+_SCALAR_TYPES = (str, int, float, bool, type(None))
 
-def _empty_source_state(*, enabled: bool) -> dict[str, Any]:
-    return {
-        "enabled": enabled,
-        "status": "never_succeeded" if enabled else "disabled",
-        "last_attempt_at": None,
-        "last_success_at": None,
-        "last_error": None,
-    }
+
+def _copy_value(value: Any) -> Any:
+    # Status leaves are almost always JSON scalars, which need no copy.
+    return value if isinstance(value, _SCALAR_TYPES) else deepcopy(value)
+
+
+def copy_status(value: Any) -> Any:
+    """Deep-copy a JSON-shaped payload much faster than `copy.deepcopy`."""
+
+    if isinstance(value, dict):
+        return {key: copy_status(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_status(item) for item in value]
+    return _copy_value(value)
+
+
+@cache
+def _field_names(cls: type) -> tuple[str, ...]:
+    return tuple(item.name for item in fields(cls) if item.name != "extra")
+
+
+class _Section:
+    """Parse and serialize a flat status section, keeping unknown keys."""
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value: Any, default: Any) -> Any:
+        if not isinstance(value, dict):
+            return default
+        names = _field_names(cls)
+        known = {
+            name: _copy_value(value[name]) if name in value else getattr(default, name)
+            for name in names
+        }
+        extra = {
+            key: _copy_value(item) for key, item in value.items() if key not in names
+        }
+        return cls(**known, extra=extra)
+
+    def to_dict(self) -> dict[str, Any]:
+        payload = {name: getattr(self, name) for name in _field_names(type(self))}
+        payload.update(getattr(self, "extra"))
+        return payload
+
+
+@dataclass(slots=True)
+class ServiceSection(_Section):
+    mode: Any = "self_hosted"
+    status: Any = "idle"
+    version: Any = __version__
+    # The running refresh's worker progress (`service.progress`), else None.
+    progress: Any = None
+    # Phase timings, worker resource usage and exceeded budgets of the last
+    # finished refresh.
+    last_refresh: Any = None
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ScheduleSection(_Section):
+    cron: Any = None
+    timezone: Any = None
+    refresh_on_startup: Any = None
+    overlap_policy: Any = "skip"
+    running: Any = False
+    next_run_at: Any = None
+    last_started_at: Any = None
+    last_finished_at: Any = None
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class StorageSection(_Section):
+    state_dir: Any = None
+    current_release: Any = None
+    has_data: Any = False
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class SourceState(_Section):
+    enabled: Any = True
+    status: Any = "never_succeeded"
+    last_attempt_at: Any = None
+    last_success_at: Any = None
+    last_error: Any = None
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def empty(cls, *, enabled: bool) -> SourceState:
+        return cls(enabled=enabled, status="never_succeeded" if enabled else "disabled")
+
+
+@dataclass(slots=True)
+class StatusModel:
+    """Typed view of `status.json`; `to_dict()` is the persisted layout."""
+
+    service: ServiceSection
+    schedule: ScheduleSection
+    storage: StorageSection
+    sources: dict[str, Any]
+    schema_version: int = STATUS_SCHEMA_VERSION
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def empty(
+        cls,
+        settings: Settings | None = None,
+        *,
+        state_dir: str | None = None,
+    ) -> StatusModel:
+        runtime_settings = settings or Settings()
+        return cls(
+            service=ServiceSection(),
+            schedule=ScheduleSection(
+                cron=runtime_settings.cron_schedule,
+                timezone=runtime_settings.timezone,
+                refresh_on_startup=runtime_settings.refresh_on_startup,
+            ),
+            storage=StorageSection(state_dir=state_dir or runtime_settings.state_dir),
+            sources={
+                "google_scholar": SourceState.empty(enabled=True),
+                "web_of_science": SourceState.empty(
+                    enabled=runtime_settings.wos_enabled
+                ),
+            },
+        )
+
+    @classmethod
+    def parse(
+        cls,
+        status: Any,
+        settings: Settings | None = None,
+        *,
+        state_dir: str | None = None,
+    ) -> StatusModel:
+        """Fill missing fields from defaults; unknown keys are carried through."""
+
+        model = cls.empty(settings, state_dir=state_dir)
+        if not isinstance(status, dict):
+            return model
+        status = _migrate(status)
+
+        model.service = ServiceSection.parse(status.get("service"), model.service)
+        model.schedule = ScheduleSection.parse(status.get("schedule"), model.schedule)
+        storage = StorageSection.parse(status.get("storage"), model.storage)
+        storage.state_dir = model.storage.state_dir
+        model.storage = storage
+
+        sources = status.get("sources")
+        if isinstance(sources, dict):
+            for name, value in sources.items():
+                default = model.sources.get(name)
+                model.sources[name] = (
+                    SourceState.parse(value, default)
+                    if isinstance(default, SourceState)
+                    else _copy_value(value)
+                )
+
+        model.schema_version = max(status["schema_version"], STATUS_SCHEMA_VERSION)
+        model.extra = {
+            key: _copy_value(value)
+            for key, value in status.items()
+            if key not in _TOP_LEVEL_KEYS
+        }
+        return model
+
+    def to_dict(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "schema_version": self.schema_version,
+            "service": self.service.to_dict(),
+            "schedule": self.schedule.to_dict(),
+            "storage": self.storage.to_dict(),
+            "sources": {
+                name: value.to_dict() if isinstance(value, SourceState) else value
+                for name, value in self.sources.items()
+            },
+        }
+        payload.update(self.extra)
+        return payload
+
+
+_TOP_LEVEL_KEYS = frozenset(
+    {"schema_version", "service", "schedule", "storage", "sources"}
+)
+
+
+def _stamp_schema_version(status: dict[str, Any]) -> dict[str, Any]:
+    # Version 1 only introduced `schema_version`; the layout is unchanged.
+    return {**status, "schema_version": 1}
+
+
+# Step `n` upgrades a payload from schema version `n` to `n + 1`.
+_MIGRATIONS: dict[int, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    0: _stamp_schema_version,
+}
+
+
+def _migrate(status: dict[str, Any]) -> dict[str, Any]:
+    version = status.get("schema_version")
+    if not isinstance(version, int) or isinstance(version, bool) or version < 0:
+        version = 0
+        status = {**status, "schema_version": 0}
+    while version < STATUS_SCHEMA_VERSION:
+        status = _MIGRATIONS[version](status)
+        version += 1
+    return status
 
 
 def empty_status(
@@ -24,51 +230,7 @@ def empty_status(
     *,
     state_dir: str | None = None,
 ) -> dict[str, Any]:
-    runtime_settings = settings or Settings()
-
-    return {
-        "service": {
-            "mode": "self_hosted",
-            "status": "idle",
-            "version": __version__,
-        },
-        "schedule": {
-            "cron": runtime_settings.cron_schedule,
-            "timezone": runtime_settings.timezone,
-            "refresh_on_startup": runtime_settings.refresh_on_startup,
-            "overlap_policy": "skip",
-            "running": False,
-            "next_run_at": None,
-            "last_started_at": None,
-            "last_finished_at": None,
-        },
-        "storage": {
-            "state_dir": state_dir or runtime_settings.state_dir,
-            "current_release": None,
-            "has_data": False,
-        },
-        "sources": {
-            "google_scholar": _empty_source_state(enabled=True),
-            "web_of_science": _empty_source_state(enabled=runtime_settings.wos_enabled),
-        },
-    }
-
-
-def _merge_status(default_value: Any, loaded_value: Any) -> Any:
-    if isinstance(default_value, dict) and not isinstance(loaded_value, dict):
-        return deepcopy(default_value)
-
-    if not isinstance(default_value, dict) or not isinstance(loaded_value, dict):
-        return deepcopy(loaded_value)
-
-    merged = {key: deepcopy(value) for key, value in default_value.items()}
-    for key, value in loaded_value.items():
-        if key in merged:
-            merged[key] = _merge_status(merged[key], value)
-            continue
-        merged[key] = deepcopy(value)
-
-    return merged
+    return StatusModel.empty(settings, state_dir=state_dir).to_dict()
 
 
 def normalize_status(
@@ -77,9 +239,4 @@ def normalize_status(
     *,
     state_dir: str | None = None,
 ) -> dict[str, Any]:
-    baseline = empty_status(settings, state_dir=state_dir)
-    if not isinstance(status, dict):
-        return baseline
-    normalized = _merge_status(baseline, status)
-    normalized["storage"]["state_dir"] = baseline["storage"]["state_dir"]
-    return normalized
+    return StatusModel.parse(status, settings, state_dir=state_dir).to_dict()
@@ -0,0 +1,282 @@
+"""SQLite (WAL) store for service status, refresh history and releases.
+
+Selected with `STATE_BACKEND=sqlite`. The database lives at
+`STATE_DIR/state.sqlite3` and is shared by every thread and serving process:
+each thread gets its own connection, and WAL journaling lets readers such as
+`/status` proceed while the refresh runtime holds the write lock.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timezone
+import json
+import os
+import sqlite3
+import threading
+from typing import Any
+
+STATE_DB_FILENAME = "state.sqlite3"
+SCHEMA_VERSION = 2
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS status (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        revision INTEGER NOT NULL,
+        updated_at TEXT NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS refresh_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        trigger TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        duration_seconds REAL,
+        outcome TEXT,
+        exit_code TEXT,
+        error TEXT,
+        release TEXT,
+        resources TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS releases (
+        run_id TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        promoted_at TEXT NOT NULL,
+        retired_at TEXT
+    )
+    """,
+)
+# Steps that bring a database created at an older `SCHEMA_VERSION` up to
+# date; fresh databases get the current layout from `_SCHEMA` directly.
+_MIGRATIONS = {
+    2: ("ALTER TABLE refresh_runs ADD COLUMN resources TEXT",),
+}
+
+
+def _timestamp_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def state_db_path(state_dir: str) -> str:
+    return os.path.join(os.path.abspath(os.fspath(state_dir)), STATE_DB_FILENAME)
+
+
+class StateDatabase:
+    """Thread-safe access to one state database file."""
+
+    # Callers catch `database.Error`, so only this module imports sqlite3.
+    Error = sqlite3.Error
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(os.fspath(path))
+        self._local = threading.local()
+        self._connections_lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._pid = os.getpid()
+        self._initialize()
+
+    def connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # Connections must not cross fork(); start over in the child.
+            self._local = threading.local()
+            self._connections = []
+            self._pid = os.getpid()
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=BUSY_TIMEOUT_MS / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            # WAL makes each commit durable at the next checkpoint; NORMAL
+            # keeps the database consistent after a crash without an fsync
+            # per transaction.
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def _initialize(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = self.connection()
+        connection.execute("PRAGMA journal_mode = WAL")
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version == 0:
+                for statement in _SCHEMA:
+                    connection.execute(statement)
+            else:
+                for step in range(version + 1, SCHEMA_VERSION + 1):
+                    for statement in _MIGRATIONS.get(step, ()):
+                        connection.execute(statement)
+            # Another process may have migrated it meanwhile; never downgrade.
+            connection.execute(
+                f"PRAGMA user_version = {max(version, SCHEMA_VERSION)}"
+            )
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def load_status(self) -> Any | None:
+        row = self.connection().execute(
+            "SELECT payload FROM status WHERE id = 1"
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row["payload"])
+
+    def status_revision(self) -> int | None:
+        row = self.connection().execute(
+            "SELECT revision FROM status WHERE id = 1"
+        ).fetchone()
+        return None if row is None else row["revision"]
+
+    def save_status(self, payload: Any) -> int:
+        """Replace the stored status and return its new revision."""
+
+        encoded = json.dumps(payload, ensure_ascii=False)
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                """
+                INSERT INTO status (id, revision, updated_at, payload)
+                VALUES (1, 1, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    revision = revision + 1,
+                    updated_at = excluded.updated_at,
+                    payload = excluded.payload
+                """,
+                (_timestamp_now(), encoded),
+            )
+        return self.status_revision() or 0
+
+    def start_run(self, trigger: str, started_at: str) -> int:
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            cursor = connection.execute(
+                "INSERT INTO refresh_runs (trigger, started_at) VALUES (?, ?)",
+                (trigger, started_at),
+            )
+        return int(cursor.lastrowid or 0)
+
+    def finish_run(
+        self,
+        run_id: int,
+        *,
+        finished_at: str,
+        duration_seconds: float,
+        outcome: str,
+        exit_code: int | str | None = None,
+        error: str | None = None,
+        release: str | None = None,
+        resources: Mapping[str, Any] | None = None,
+    ) -> None:
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                """
+                UPDATE refresh_runs
+                SET finished_at = ?, duration_seconds = ?, outcome = ?,
+                    exit_code = ?, error = ?, release = ?, resources = ?
+                WHERE id = ?
+                """,
+                (
+                    finished_at,
+                    duration_seconds,
+                    outcome,
+                    None if exit_code is None else str(exit_code),
+                    error,
+                    release,
+                    None if resources is None else json.dumps(resources),
+                    run_id,
+                ),
+            )
+
+    def record_release(self, release_dir: str, promoted_at: str) -> None:
+        """Record a promoted release and retire the ones it replaced."""
+
+        run_id = os.path.basename(release_dir)
+        connection = self.connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "UPDATE releases SET retired_at = ? WHERE retired_at IS NULL",
+                (promoted_at,),
+            )
+            connection.execute(
+                """
+                INSERT INTO releases (run_id, path, promoted_at) VALUES (?, ?, ?)
+                ON CONFLICT (run_id) DO UPDATE SET
+                    path = excluded.path,
+                    promoted_at = excluded.promoted_at,
+                    retired_at = NULL
+                """,
+                (run_id, release_dir, promoted_at),
+            )
+
+    def recent_runs(self, limit: int = 20) -> list[dict[str, Any]]:
+        rows = self.connection().execute(
+            "SELECT * FROM refresh_runs ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        runs = [dict(row) for row in rows]
+        for run in runs:
+            if run["resources"] is not None:
+                run["resources"] = json.loads(run["resources"])
+        return runs
+
+    def releases(self) -> list[dict[str, Any]]:
+        rows = self.connection().execute(
+            "SELECT * FROM releases ORDER BY promoted_at DESC, run_id DESC"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_DATABASES: dict[str, StateDatabase] = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+def open_state_database(state_dir: str) -> StateDatabase:
+    """Return the shared database handle for `state_dir`, creating it once."""
+
+    path = state_db_path(state_dir)
+    with _DATABASES_LOCK:
+        database = _DATABASES.get(path)
+        if database is None:
+            database = StateDatabase(path)
+            _DATABASES[path] = database
+        return database
+
+
+__all__ = [
+    "SCHEMA_VERSION",
+    "STATE_DB_FILENAME",
+    "StateDatabase",
+    "open_state_database",
+    "state_db_path",
+]
@@ -2,18 +2,28 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
 import json
+import logging
 import os
 import tempfile
-from typing import Any
+import threading
+from typing import TYPE_CHECKING, Any
 
-from .config import Settings
-from .state import empty_status, normalize_status
+from .config import STATE_BACKEND_SQLITE, Settings
+from .state import copy_status, empty_status, normalize_status
+
+if TYPE_CHECKING:
+    from .statedb import StateDatabase
 
 CURRENT_RELEASE_POINTER = "current"
+OBJECTS_DIRNAME = "objects"
 RELEASES_DIRNAME = "releases"
 STATUS_FILENAME = "status.json"
+_LOGGER = logging.getLogger("citation_badge.service")
+
+StatusMutator = Callable[[dict[str, Any]], Any]
 
 
 @dataclass(frozen=True)
@@ -22,6 +32,7 @@ class StateLayout:
 
     state_dir: str
     releases_dir: str
+    objects_dir: str
     status_file: str
     current_pointer: str
 
@@ -31,6 +42,7 @@ def get_state_layout(state_dir: str) -> StateLayout:
     return StateLayout(
         state_dir=resolved_state_dir,
         releases_dir=os.path.join(resolved_state_dir, RELEASES_DIRNAME),
+        objects_dir=os.path.join(resolved_state_dir, OBJECTS_DIRNAME),
         status_file=os.path.join(resolved_state_dir, STATUS_FILENAME),
         current_pointer=os.path.join(resolved_state_dir, CURRENT_RELEASE_POINTER),
     )
@@ -43,8 +55,14 @@ def ensure_state_layout(
     layout = get_state_layout(state_dir)
     os.makedirs(layout.state_dir, exist_ok=True)
     os.makedirs(layout.releases_dir, exist_ok=True)
+    os.makedirs(layout.objects_dir, exist_ok=True)
 
-    if not os.path.exists(layout.status_file):
+    database = state_database(layout.status_file, settings)
+    if database is not None:
+        if database.status_revision() is None:
+            # Carry over the JSON status when switching backends.
+            database.save_status(safe_load_status(layout.status_file))
+    elif not os.path.exists(layout.status_file):
         save_status(
             layout.status_file, empty_status(settings, state_dir=layout.state_dir)
         )
@@ -52,7 +70,20 @@ def ensure_state_layout(
     return layout
 
 
-def atomic_write_json(path: str, payload: Any) -> None:
+def state_database(
+    status_path: str,
+    settings: Settings | None = None,
+) -> StateDatabase | None:
+    """Return the SQLite state database when `settings` select that backend."""
+
+    if settings is None or settings.state_backend != STATE_BACKEND_SQLITE:
+        return None
+    from .statedb import open_state_database
+
+    return open_state_database(os.path.dirname(os.path.abspath(status_path)))
+
+
+def atomic_write_json(path: str, payload: Any, *, compact: bool = False) -> None:
     destination = os.path.abspath(os.fspath(path))
     parent_dir = os.path.dirname(destination)
     os.makedirs(parent_dir, exist_ok=True)
@@ -65,7 +96,10 @@ def atomic_write_json(path: str, payload: Any) -> None:
 
     try:
         with os.fdopen(file_descriptor, "w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2, ensure_ascii=False)
+            if compact:
+                json.dump(payload, handle, ensure_ascii=False, separators=(",", ":"))
+            else:
+                json.dump(payload, handle, indent=2, ensure_ascii=False)
             handle.write("\n")
             handle.flush()
             os.fsync(handle.fileno())
@@ -81,6 +115,10 @@ def load_json_file(path: str) -> Any:
         return json.load(handle)
 
 
+def _database_errors(database: StateDatabase | None) -> tuple[type[Exception], ...]:
+    return () if database is None else (database.Error,)
+
+
 def safe_load_status(
     status_path: str,
     settings: Settings | None = None,
@@ -88,9 +126,22 @@ def safe_load_status(
     resolved_status_path = os.path.abspath(os.fspath(status_path))
     state_dir = os.path.dirname(resolved_status_path)
 
+    database = state_database(resolved_status_path, settings)
     try:
-        payload = load_json_file(resolved_status_path)
-    except (FileNotFoundError, json.JSONDecodeError, OSError, TypeError, ValueError):
+        if database is not None:
+            payload = database.load_status()
+        else:
+            payload = load_json_file(resolved_status_path)
+    except (
+        FileNotFoundError,
+        json.JSONDecodeError,
+        OSError,
+        TypeError,
+        ValueError,
+        *_database_errors(database),
+    ):
+        return empty_status(settings, state_dir=state_dir)
+    if payload is None:
         return empty_status(settings, state_dir=state_dir)
 
     return normalize_status(payload, settings, state_dir=state_dir)
@@ -106,5 +157,140 @@ def save_status(
         settings,
         state_dir=os.path.dirname(os.path.abspath(os.fspath(status_path))),
     )
-    atomic_write_json(status_path, normalized_payload)
+    database = state_database(status_path, settings)
+    if database is not None:
+        database.save_status(normalized_payload)
+    else:
+        atomic_write_json(status_path, normalized_payload)
     return normalized_payload
+
+
+def _file_key(path: str) -> tuple[int, int, int] | None:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
+
+
+class StatusStore:
+    """Own the service status in memory and persist it in coalesced writes.
+
+    Updates are applied under one lock, so the scheduler and the refresh
+    runtime can no longer overwrite each other's fields. Persistence is
+    debounced: the first update of a burst schedules a write `flush_delay`
+    seconds later and every update until then rides along, so a burst costs one
+    fsync. With `flush_delay <= 0` every update is written immediately.
+
+    Readers get the in-memory copy. While nothing is pending, status changed by
+    another process (such as the prefork owner) is reloaded first; the change
+    is detected from the file's stat or the SQLite status revision.
+    """
+
+    def __init__(
+        self,
+        status_path: str,
+        *,
+        settings: Settings | None = None,
+        flush_delay: float = 0.0,
+    ) -> None:
+        self.status_path = os.path.abspath(os.fspath(status_path))
+        self.settings = settings
+        self.flush_delay = flush_delay
+        self.writes = 0
+        self._database = state_database(self.status_path, settings)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._payload = safe_load_status(self.status_path, settings=settings)
+        self._file_key = self._change_key()
+        self._dirty = False
+        self._flushing = False
+        self._timer: threading.Timer | None = None
+        self._closed = False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            if not self._dirty and not self._flushing:
+                key = self._change_key()
+                if key != self._file_key:
+                    self._payload = safe_load_status(
+                        self.status_path, settings=self.settings
+                    )
+                    self._file_key = key
+            return copy_status(self._payload)
+
+    def update(self, mutate: StatusMutator) -> dict[str, Any]:
+        """Apply `mutate` to the current payload in place and schedule a write."""
+
+        with self._lock:
+            payload = copy_status(self._payload)
+            mutate(payload)
+            self._payload = normalize_status(
+                payload,
+                self.settings,
+                state_dir=os.path.dirname(self.status_path),
+            )
+            self._dirty = True
+            result = copy_status(self._payload)
+            write_now = self.flush_delay <= 0 or self._closed
+            if not write_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self._flush_scheduled)
+                self._timer.daemon = True
+                self._timer.start()
+        if write_now:
+            self.flush()
+        return result
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                payload = copy_status(self._payload)
+                self._dirty = False
+                self._flushing = True
+            written = False
+            try:
+                if self._database is not None:
+                    self._database.save_status(payload)
+                else:
+                    atomic_write_json(self.status_path, payload)
+                written = True
+            except (OSError, *_database_errors(self._database)) as error:
+                _LOGGER.warning(
+                    "status write failed: path=%s error=%s", self.status_path, error
+                )
+            with self._lock:
+                self._flushing = False
+                if not written:
+                    # Keep the change pending; the next update or close retries.
+                    self._dirty = True
+                else:
+                    self._file_key = self._change_key()
+                    self.writes += 1
+
+    def close(self) -> None:
+        """Cancel the pending timer and write anything still unsaved."""
+
+        with self._lock:
+            self._closed = True
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+    def _change_key(self) -> object:
+        if self._database is not None:
+            try:
+                return self._database.status_revision()
+            except self._database.Error:
+                return None
+        return _file_key(self.status_path)
+
+    def _flush_scheduled(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush()
+
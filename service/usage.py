@@ -0,0 +1,136 @@
+"""Resource accounting for refresh workers.
+
+A subprocess worker is reaped with `os.wait4`, whose rusage covers the worker
+and every profile child it waited for. An in-process worker is measured as
+the refresh thread's own usage plus the profile children reaped meanwhile.
+`check_budgets` compares a finished run against the configured limits.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass
+import resource
+import sys
+from typing import Any
+
+# `ru_maxrss` is KiB on Linux and bytes on macOS.
+_MAXRSS_BYTES = 1 if sys.platform == "darwin" else 1024
+# Per-thread usage exists on Linux only; elsewhere fall back to the process.
+_RUSAGE_THREAD = getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF)
+
+BUDGET_CPU_SECONDS = "cpu_seconds"
+BUDGET_MAX_RSS_MB = "max_rss_mb"
+BUDGET_WALL_SECONDS = "wall_seconds"
+
+
+@dataclass(slots=True)
+class ResourceUsage:
+    """CPU, memory, block I/O and context switches of one worker run."""
+
+    user_cpu_seconds: float
+    system_cpu_seconds: float
+    max_rss_bytes: int
+    block_input_ops: int
+    block_output_ops: int
+    voluntary_context_switches: int
+    involuntary_context_switches: int
+
+    @classmethod
+    def from_rusage(cls, usage: Any) -> ResourceUsage:
+        return cls(
+            user_cpu_seconds=usage.ru_utime,
+            system_cpu_seconds=usage.ru_stime,
+            max_rss_bytes=usage.ru_maxrss * _MAXRSS_BYTES,
+            block_input_ops=usage.ru_inblock,
+            block_output_ops=usage.ru_oublock,
+            voluntary_context_switches=usage.ru_nvcsw,
+            involuntary_context_switches=usage.ru_nivcsw,
+        )
+
+    @property
+    def cpu_seconds(self) -> float:
+        return self.user_cpu_seconds + self.system_cpu_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        payload = asdict(self)
+        payload["user_cpu_seconds"] = round(self.user_cpu_seconds, 3)
+        payload["system_cpu_seconds"] = round(self.system_cpu_seconds, 3)
+        return payload
+
+
+UsageCallback = Callable[[ResourceUsage], None]
+
+
+class InProcessUsage:
+    """Measure a refresh running on the calling thread, from creation to `finish`.
+
+    `ru_maxrss` is a high-water mark, so the memory figure is the larger of
+    the whole service's peak and the largest profile child's peak, not an
+    amount attributable to this refresh alone.
+    """
+
+    def __init__(self) -> None:
+        self._thread = resource.getrusage(_RUSAGE_THREAD)
+        self._children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    def finish(self) -> ResourceUsage:
+        thread = resource.getrusage(_RUSAGE_THREAD)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        before_thread, before_children = self._thread, self._children
+        return ResourceUsage(
+            user_cpu_seconds=(thread.ru_utime - before_thread.ru_utime)
+            + (children.ru_utime - before_children.ru_utime),
+            system_cpu_seconds=(thread.ru_stime - before_thread.ru_stime)
+            + (children.ru_stime - before_children.ru_stime),
+            max_rss_bytes=max(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, children.ru_maxrss
+            )
+            * _MAXRSS_BYTES,
+            block_input_ops=(thread.ru_inblock - before_thread.ru_inblock)
+            + (children.ru_inblock - before_children.ru_inblock),
+            block_output_ops=(thread.ru_oublock - before_thread.ru_oublock)
+            + (children.ru_oublock - before_children.ru_oublock),
+            voluntary_context_switches=(thread.ru_nvcsw - before_thread.ru_nvcsw)
+            + (children.ru_nvcsw - before_children.ru_nvcsw),
+            involuntary_context_switches=(thread.ru_nivcsw - before_thread.ru_nivcsw)
+            + (children.ru_nivcsw - before_children.ru_nivcsw),
+        )
+
+
+def check_budgets(
+    budgets: Mapping[str, float],
+    *,
+    usage: ResourceUsage | None,
+    wall_seconds: float,
+) -> list[dict[str, Any]]:
+    """Return one `{budget, limit, actual}` entry per exceeded budget.
+
+    A budget of zero or less is disabled; CPU and memory budgets are skipped
+    when no usage was captured.
+    """
+
+    actuals: dict[str, float | None] = {
+        BUDGET_WALL_SECONDS: wall_seconds,
+        BUDGET_CPU_SECONDS: None if usage is None else usage.cpu_seconds,
+        BUDGET_MAX_RSS_MB: (
+            None if usage is None else usage.max_rss_bytes / (1024 * 1024)
+        ),
+    }
+    exceeded = []
+    for budget, actual in actuals.items():
+        limit = budgets.get(budget, 0)
+        if limit > 0 and actual is not None and actual > limit:
+            exceeded.append({"budget": budget, "limit": limit, "actual": round(actual, 3)})
+    return exceeded
+
+
+__all__ = [
+    "BUDGET_CPU_SECONDS",
+    "BUDGET_MAX_RSS_MB",
+    "BUDGET_WALL_SECONDS",
+    "InProcessUsage",
+    "ResourceUsage",
+    "UsageCallback",
+    "check_budgets",
+]
@@ -0,0 +1,218 @@
+"""Deep validation of a staged `dist/` tree before it is promoted.
+
+`validate_staged_release` only proves that the required files exist and that
+`citation.json` parses. `validate_dist` also checks the `citation.json` schema
+of the root and every profile directory, that each publication listed by a
+successful Google Scholar refresh has its badge, and that every SVG is a
+non-empty, well-formed `<svg>` document. File checks run in a thread pool.
+The report is written to `validation.json` next to the release's `dist/`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import json
+import os
+import time
+from typing import Any
+from xml.etree import ElementTree
+
+from .citations import CITATION_JSON_FILENAME, GOOGLE_SCHOLAR_METRICS
+
+VALIDATION_FILENAME = "validation.json"
+VALIDATION_VERSION = 1
+MAX_SVG_BYTES = 1024 * 1024
+# Reports keep this many issues of each kind; the totals are always exact.
+MAX_REPORTED_ISSUES = 100
+
+
+@dataclass(slots=True)
+class ValidationReport:
+    checked_files: int = 0
+    error_count: int = 0
+    warning_count: int = 0
+    errors: list[dict[str, str]] = field(default_factory=list)
+    warnings: list[dict[str, str]] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def valid(self) -> bool:
+        return self.error_count == 0
+
+    def error(self, path: str, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ISSUES:
+            self.errors.append({"path": path, "error": message})
+
+    def warning(self, path: str, message: str) -> None:
+        self.warning_count += 1
+        if len(self.warnings) < MAX_REPORTED_ISSUES:
+            self.warnings.append({"path": path, "warning": message})
+
+    def summary(self) -> str:
+        if self.valid:
+            return f"{self.checked_files} files valid"
+        first = self.errors[0]
+        return (
+            f"{self.error_count} validation errors in {self.checked_files} files; "
+            f"first: {first['path']}: {first['error']}"
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": VALIDATION_VERSION,
+            "valid": self.valid,
+            "checked_files": self.checked_files,
+            "duration_seconds": round(self.duration_seconds, 6),
+            "error_count": self.error_count,
+            "warning_count": self.warning_count,
+            "errors": self.errors,
+            "warnings": self.warnings,
+        }
+
+
+def _is_count(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _check_citation_payload(
+    payload: Any, path: str, report: ValidationReport
+) -> list[str]:
+    """Check the schema and return the badge filenames it promises."""
+
+    if not isinstance(payload, Mapping):
+        report.error(path, "top level must be an object")
+        return []
+    google_scholar = payload.get("google_scholar")
+    if not isinstance(google_scholar, Mapping):
+        report.error(path, "google_scholar must be an object")
+        return []
+    status = google_scholar.get("status")
+    if not isinstance(status, str):
+        report.error(path, "google_scholar.status must be a string")
+        return []
+    web_of_science = payload.get("web_of_science")
+    if web_of_science is not None and not (
+        isinstance(web_of_science, Mapping)
+        and isinstance(web_of_science.get("status"), str)
+    ):
+        report.error(path, "web_of_science must be an object with a string status")
+    if status != "success":
+        report.warning(path, f"google_scholar.status is {status!r}; badges not checked")
+        return []
+
+    for name in GOOGLE_SCHOLAR_METRICS:
+        if name in google_scholar and not _is_count(google_scholar[name]):
+            report.error(path, f"google_scholar.{name} must be a non-negative integer")
+    publications = google_scholar.get("publications")
+    if not isinstance(publications, list):
+        report.error(path, "google_scholar.publications must be a list")
+        return []
+
+    badges = []
+    seen = set()
+    for position, item in enumerate(publications):
+        where = f"google_scholar.publications[{position}]"
+        if not isinstance(item, Mapping):
+            report.error(path, f"{where} must be an object")
+            continue
+        author_pub_id = item.get("author_pub_id")
+        if not isinstance(author_pub_id, str) or not author_pub_id:
+            report.error(path, f"{where}.author_pub_id must be a non-empty string")
+            continue
+        if not _is_count(item.get("citations")):
+            report.error(path, f"{where}.citations must be a non-negative integer")
+        if author_pub_id in seen:
+            report.warning(path, f"{where}.author_pub_id {author_pub_id!r} is repeated")
+            continue
+        seen.add(author_pub_id)
+        badges.append(author_pub_id.replace(":", "_") + ".svg")
+    return badges
+
+
+def _check_svg(path: str) -> str | None:
+    """Return why `path` is not a plausible SVG badge, or None."""
+
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return "file is empty"
+        if size > MAX_SVG_BYTES:
+            return f"file is larger than {MAX_SVG_BYTES} bytes"
+        with open(path, "rb") as handle:
+            root = ElementTree.fromstring(handle.read())
+    except OSError as error:
+        return f"unreadable: {error.strerror or error}"
+    except ElementTree.ParseError as error:
+        return f"not well-formed XML: {error}"
+    if root.tag.rsplit("}", 1)[-1] != "svg":
+        return f"root element is <{root.tag}>, not <svg>"
+    return None
+
+
+def _profile_dirs(dist_dir: str) -> list[str]:
+    """Return `dist/` itself and every profile directory with a citation.json."""
+
+    directories = [dist_dir]
+    try:
+        entries = list(os.scandir(dist_dir))
+    except OSError:
+        return directories
+    for entry in sorted(entries, key=lambda entry: entry.name):
+        if entry.is_dir(follow_symlinks=False) and os.path.isfile(
+            os.path.join(entry.path, CITATION_JSON_FILENAME)
+        ):
+            directories.append(entry.path)
+    return directories
+
+
+def validate_dist(dist_dir: str, *, max_workers: int | None = None) -> ValidationReport:
+    """Deep-check a `dist/` tree; see the module docstring for the rules."""
+
+    started = time.perf_counter()
+    report = ValidationReport()
+    svg_paths: list[str] = []
+    for directory in _profile_dirs(dist_dir):
+        relative_dir = os.path.relpath(directory, dist_dir)
+        prefix = "" if relative_dir == "." else relative_dir.replace(os.sep, "/") + "/"
+        citation_path = prefix + CITATION_JSON_FILENAME
+        try:
+            with open(
+                os.path.join(directory, CITATION_JSON_FILENAME), "r", encoding="utf-8"
+            ) as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError) as error:
+            report.error(citation_path, f"unreadable JSON: {error}")
+            continue
+        report.checked_files += 1
+        for badge in _check_citation_payload(payload, citation_path, report):
+            if not os.path.isfile(os.path.join(directory, badge)):
+                report.error(prefix + badge, "badge listed in citation.json is missing")
+        with os.scandir(directory) as entries:
+            svg_paths.extend(
+                entry.path
+                for entry in entries
+                if entry.name.endswith(".svg") and entry.is_file(follow_symlinks=False)
+            )
+
+    svg_paths.sort()
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="citation-validate",
+    ) as executor:
+        for path, problem in zip(svg_paths, executor.map(_check_svg, svg_paths)):
+            report.checked_files += 1
+            if problem is not None:
+                report.error(os.path.relpath(path, dist_dir).replace(os.sep, "/"), problem)
+    report.duration_seconds = time.perf_counter() - started
+    return report
+
+
+__all__ = [
+    "MAX_SVG_BYTES",
+    "VALIDATION_FILENAME",
+    "ValidationReport",
+    "validate_dist",
+]
@@ -1,14 +1,32 @@
-"""Subprocess worker helpers for wrapping the existing main.py entrypoint."""
+"""Worker helpers for running the existing main.py entrypoint.
+
+`run_worker_subprocess` starts `python main.py` for every refresh.
+`run_worker_in_process` loads `main.py` once and calls its `run` function, so
+refreshes skip interpreter startup and keep `scholarly` and `requests`
+imported; each profile is still fetched in a forked child with its own
+timeout. Both can hand the worker's structured progress events to a
+callback (see `service.progress`), and the CPU, memory, block I/O and
+context switches a run used to a usage callback (see `service.usage`).
+"""
 
 from __future__ import annotations
 
+from collections import deque
 from collections.abc import Callable, Mapping, Sequence
 from datetime import datetime, timezone
+import importlib.util
+import logging
 import os
 import subprocess
+import sys
 import time
 import threading
-from typing import Any
+import traceback
+from types import ModuleType
+from typing import IO, Any
+
+from service.progress import PROGRESS_FD_ENV, ProgressCallback, parse_progress_line
+from service.usage import InProcessUsage, ResourceUsage, UsageCallback
 
 PYTHON_EXECUTABLE = "python"
 MAIN_SCRIPT_PATH = "/app/main.py"
@@ -19,9 +37,22 @@ GOOGLE_SCHOLAR_SOURCE = "google_scholar"
 WEB_OF_SCIENCE_SOURCE = "web_of_science"
 SUPPORTED_SOURCES = frozenset({GOOGLE_SCHOLAR_SOURCE, WEB_OF_SCIENCE_SOURCE})
 PROCESS_POLL_INTERVAL_SECONDS = 0.2
+# Backoff cap while polling `os.wait4`; `Popen.wait` uses the same.
+MAX_REAP_DELAY_SECONDS = 0.05
 PROFILE_TIMEOUT_SECONDS = 180
 
+# Each stream keeps this many of its last lines for error messages.
+DEFAULT_OUTPUT_TAIL_LINES = 100
+MAX_OUTPUT_LINE_CHARS = 2000
+OUTPUT_DRAIN_TIMEOUT_SECONDS = 5.0
+TRUNCATED_LINE_MARKER = " [truncated]"
+
 ProcessStartedCallback = Callable[[subprocess.Popen[str]], None]
+LineCallback = Callable[[str, str], None]
+IN_PROCESS_MODULE_NAME = "citation_badge_worker_main"
+_LOGGER = logging.getLogger("citation_badge.service")
+_worker_modules: dict[str, ModuleType] = {}
+_worker_modules_lock = threading.Lock()
 
 
 class WorkerShutdownError(RuntimeError):
@@ -41,6 +72,71 @@ class WorkerShutdownError(RuntimeError):
         self.returncode = returncode
 
 
+def log_worker_line(stream: str, line: str) -> None:
+    _LOGGER.info("worker %s: %s", stream, line)
+
+
+class OutputTail:
+    """Split a worker stream into lines, forward each, keep only the last ones.
+
+    Memory stays bounded by `max_lines` times `MAX_OUTPUT_LINE_CHARS` however
+    much the worker prints; longer lines are cut and their rest dropped. Also
+    usable as the text stream `main.run` prints to.
+    """
+
+    def __init__(
+        self,
+        stream: str,
+        *,
+        max_lines: int = DEFAULT_OUTPUT_TAIL_LINES,
+        line_callback: LineCallback | None = None,
+    ) -> None:
+        self.stream = stream
+        self.lines_seen = 0
+        self._lines: deque[str] = deque(maxlen=max(1, max_lines))
+        self._line_callback = line_callback
+        self._partial = ""
+        self._dropping = False
+
+    def _emit(self, line: str) -> None:
+        line = line.rstrip("\r")
+        if len(line) > MAX_OUTPUT_LINE_CHARS:
+            line = line[:MAX_OUTPUT_LINE_CHARS] + TRUNCATED_LINE_MARKER
+        self.lines_seen += 1
+        self._lines.append(line)
+        if self._line_callback is not None:
+            self._line_callback(self.stream, line)
+
+    def write(self, text: str) -> int:
+        *complete, rest = text.split("\n")
+        for piece in complete:
+            if self._dropping:
+                # The remainder of an over-long line ends here.
+                self._dropping = False
+            else:
+                self._emit(self._partial + piece)
+            self._partial = ""
+        if not self._dropping:
+            self._partial += rest
+            if len(self._partial) > MAX_OUTPUT_LINE_CHARS:
+                self._emit(self._partial)
+                self._partial = ""
+                self._dropping = True
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._partial:
+            self._emit(self._partial)
+            self._partial = ""
+        self._dropping = False
+
+    def text(self) -> str:
+        return "".join(f"{line}\n" for line in self._lines)
+
+
 def _normalize_cli_value(value: str | None) -> str:
     if value is None:
         return ""
@@ -177,6 +273,113 @@ def web_of_science_failure_result(
     )
 
 
+def _guard_progress_callback(progress_callback: ProgressCallback) -> ProgressCallback:
+    def _forward(event: dict[str, Any]) -> None:
+        try:
+            progress_callback(event)
+        except Exception:
+            # Progress is advisory; never let it stop the pump or the refresh.
+            _LOGGER.exception("worker progress callback failed")
+
+    return _forward
+
+
+def _progress_line_callback(progress_callback: ProgressCallback) -> LineCallback:
+    forward = _guard_progress_callback(progress_callback)
+
+    def _forward_line(stream: str, line: str) -> None:
+        event = parse_progress_line(line)
+        if event is None:
+            _LOGGER.debug("worker progress line ignored: line=%r", line[:200])
+            return
+        forward(event)
+
+    return _forward_line
+
+
+def _pump_pipe(pipe: IO[str], tail: OutputTail) -> None:
+    try:
+        # Bounded reads: an endless line never has to fit in memory.
+        for chunk in iter(lambda: pipe.readline(MAX_OUTPUT_LINE_CHARS), ""):
+            tail.write(chunk)
+    except (OSError, ValueError):
+        pass
+    finally:
+        tail.close()
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def _start_pump(pipe: IO[str] | None, tail: OutputTail) -> threading.Thread | None:
+    if pipe is None:
+        return None
+    thread = threading.Thread(
+        target=_pump_pipe,
+        args=(pipe, tail),
+        name=f"citation-worker-{tail.stream}",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def _wait_for_worker(
+    process: subprocess.Popen[str],
+    timeout: float | None,
+    usage_callback: UsageCallback | None,
+) -> None:
+    """Like `process.wait(timeout)`, but reap with `os.wait4` to get its rusage."""
+
+    if usage_callback is None or process.returncode is not None:
+        process.wait(timeout=timeout)
+        return
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = 0.0005
+    while True:
+        try:
+            pid, wait_status, rusage = os.wait4(process.pid, os.WNOHANG)
+        except ChildProcessError:
+            # A concurrent `poll()` (only on shutdown) reaped it first; the
+            # usage is lost but the return code is not.
+            process.wait()
+            return
+        if pid == process.pid:
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+            usage_callback(ResourceUsage.from_rusage(rusage))
+            return
+        delay = min(delay * 2, MAX_REAP_DELAY_SECONDS)
+        if deadline is not None:
+            remaining_seconds = deadline - time.monotonic()
+            if remaining_seconds <= 0:
+                raise subprocess.TimeoutExpired(process.args, timeout or 0)
+            delay = min(delay, remaining_seconds)
+        time.sleep(delay)
+
+
+def _stop_worker_process(
+    process: subprocess.Popen[str],
+    *,
+    grace_seconds: float,
+    usage_callback: UsageCallback | None = None,
+) -> None:
+    if process.poll() is None:
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            pass
+    try:
+        _wait_for_worker(process, grace_seconds, usage_callback)
+    except subprocess.TimeoutExpired:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        _wait_for_worker(process, None, usage_callback)
+
+
 def run_worker_subprocess(
     argv: Sequence[str],
     *,
@@ -185,8 +388,22 @@ def run_worker_subprocess(
     env: Mapping[str, str] | None = None,
     started_callback: ProcessStartedCallback | None = None,
     stop_event: threading.Event | None = None,
+    line_callback: LineCallback | None = log_worker_line,
+    tail_lines: int = DEFAULT_OUTPUT_TAIL_LINES,
+    progress_callback: ProgressCallback | None = None,
+    usage_callback: UsageCallback | None = None,
 ) -> subprocess.CompletedProcess[str]:
-    """Execute the worker subprocess with explicit cwd and timeout controls."""
+    """Execute the worker subprocess with explicit cwd and timeout controls.
+
+    Output is read line by line while the worker runs and handed to
+    `line_callback` (the service log by default). Only the last `tail_lines`
+    lines of each stream are kept, and the result's `stdout`/`stderr` hold
+    just those tails. With `progress_callback`, the worker gets a pipe named
+    by `PROGRESS_FD_ENV` and every progress event it writes there is decoded
+    and passed to the callback as it arrives. With `usage_callback`, the
+    worker is reaped with `os.wait4` and the callback receives its
+    `ResourceUsage`, also when it is stopped on timeout or shutdown.
+    """
 
     if not argv:
         raise ValueError("Worker argv must not be empty")
@@ -203,6 +420,21 @@ def run_worker_subprocess(
     if env is not None:
         run_env.update({str(key): str(value) for key, value in env.items()})
 
+    stdout_tail = OutputTail("stdout", max_lines=tail_lines, line_callback=line_callback)
+    stderr_tail = OutputTail("stderr", max_lines=tail_lines, line_callback=line_callback)
+    pumps: list[threading.Thread] = []
+    progress_read_fd: int | None = None
+    progress_write_fd: int | None = None
+    if progress_callback is not None:
+        progress_read_fd, progress_write_fd = os.pipe()
+        run_env[PROGRESS_FD_ENV] = str(progress_write_fd)
+
+    def _finish_output() -> tuple[str, str]:
+        for pump in pumps:
+            # A surviving grandchild may hold the pipe open; do not wait on it.
+            pump.join(OUTPUT_DRAIN_TIMEOUT_SECONDS)
+        return stdout_tail.text(), stderr_tail.text()
+
     try:
         process = subprocess.Popen(
             list(argv),
@@ -211,8 +443,37 @@ def run_worker_subprocess(
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
+            errors="replace",
             shell=False,
+            pass_fds=() if progress_write_fd is None else (progress_write_fd,),
         )
+        pumps = [
+            pump
+            for pump in (
+                _start_pump(process.stdout, stdout_tail),
+                _start_pump(process.stderr, stderr_tail),
+            )
+            if pump is not None
+        ]
+        if progress_write_fd is not None:
+            # Only the worker may hold the write end, so its exit ends the pump.
+            os.close(progress_write_fd)
+            progress_write_fd = None
+        if progress_read_fd is not None and progress_callback is not None:
+            progress_pipe = os.fdopen(
+                progress_read_fd, "r", encoding="utf-8", errors="replace"
+            )
+            progress_read_fd = None
+            progress_pump = _start_pump(
+                progress_pipe,
+                OutputTail(
+                    "progress",
+                    max_lines=1,
+                    line_callback=_progress_line_callback(progress_callback),
+                ),
+            )
+            if progress_pump is not None:
+                pumps.append(progress_pump)
 
         if started_callback is not None:
             started_callback(process)
@@ -220,20 +481,10 @@ def run_worker_subprocess(
         deadline = time.monotonic() + timeout_seconds
         while True:
             if stop_event is not None and stop_event.is_set():
-                if process.poll() is None:
-                    try:
-                        process.terminate()
-                    except ProcessLookupError:
-                        pass
-                try:
-                    stdout, stderr = process.communicate(timeout=5)
-                except subprocess.TimeoutExpired:
-                    if process.poll() is None:
-                        try:
-                            process.kill()
-                        except ProcessLookupError:
-                            pass
-                    stdout, stderr = process.communicate()
+                _stop_worker_process(
+                    process, grace_seconds=5, usage_callback=usage_callback
+                )
+                stdout, stderr = _finish_output()
                 raise WorkerShutdownError(
                     stdout=stdout,
                     stderr=stderr,
@@ -242,12 +493,10 @@ def run_worker_subprocess(
 
             remaining_seconds = deadline - time.monotonic()
             if remaining_seconds <= 0:
-                if process.poll() is None:
-                    try:
-                        process.kill()
-                    except ProcessLookupError:
-                        pass
-                stdout, stderr = process.communicate()
+                _stop_worker_process(
+                    process, grace_seconds=0, usage_callback=usage_callback
+                )
+                stdout, stderr = _finish_output()
                 raise subprocess.TimeoutExpired(
                     list(argv),
                     timeout_seconds,
@@ -256,20 +505,164 @@ def run_worker_subprocess(
                 )
 
             try:
-                stdout, stderr = process.communicate(
-                    timeout=min(PROCESS_POLL_INTERVAL_SECONDS, remaining_seconds)
+                _wait_for_worker(
+                    process,
+                    min(PROCESS_POLL_INTERVAL_SECONDS, remaining_seconds),
+                    usage_callback,
                 )
             except subprocess.TimeoutExpired:
                 continue
 
+            stdout, stderr = _finish_output()
             return subprocess.CompletedProcess(
                 list(argv),
                 process.returncode,
                 stdout,
                 stderr,
             )
+    finally:
+        for fd in (progress_read_fd, progress_write_fd):
+            if fd is not None:
+                os.close(fd)
+        cleanup_ci_batch_side_files(resolved_working_directory)
+
+
+class _RefreshDeadline:
+    """Looks like an Event to `main.run`; set on shutdown or past the deadline."""
+
+    __slots__ = ("stop_event", "deadline")
+
+    def __init__(self, stop_event: threading.Event | None, deadline: float) -> None:
+        self.stop_event = stop_event
+        self.deadline = deadline
+
+    def is_set(self) -> bool:
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        return time.monotonic() >= self.deadline
+
+    def remaining_seconds(self) -> float:
+        """Bounds `main`'s badge request timeouts to the refresh deadline."""
+
+        return self.deadline - time.monotonic()
+
+
+def load_worker_module(script_path: str) -> ModuleType:
+    """Import `main.py` from `script_path` once and preload its dependencies."""
+
+    resolved_script_path = os.path.realpath(script_path)
+    with _worker_modules_lock:
+        module = _worker_modules.get(resolved_script_path)
+        if module is not None:
+            return module
+        spec = importlib.util.spec_from_file_location(
+            IN_PROCESS_MODULE_NAME, resolved_script_path
+        )
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Cannot load worker script: {resolved_script_path}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[IN_PROCESS_MODULE_NAME] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(IN_PROCESS_MODULE_NAME, None)
+            raise
+        started = time.perf_counter()
+        try:
+            module.preload_dependencies()
+        except ImportError as error:
+            # Same outcome as the subprocess: each profile fetch fails.
+            _LOGGER.warning("worker dependencies unavailable: error=%s", error)
+        else:
+            _LOGGER.info(
+                "worker dependencies preloaded: seconds=%.3f",
+                time.perf_counter() - started,
+            )
+        _worker_modules[resolved_script_path] = module
+        return module
+
+
+def run_worker_in_process(
+    *,
+    scholar: str | None,
+    script_path: str,
+    working_directory: str,
+    timeout_seconds: int,
+    stop_event: threading.Event | None = None,
+    line_callback: LineCallback | None = log_worker_line,
+    tail_lines: int = DEFAULT_OUTPUT_TAIL_LINES,
+    progress_callback: ProgressCallback | None = None,
+    usage_callback: UsageCallback | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """Run one refresh through `main.run` in this process.
+
+    The result mirrors `run_worker_subprocess`: progress messages are
+    forwarded line by line and their tail is the stdout, an unexpected
+    exception becomes return code 1 with its traceback as stderr, shutdown
+    raises `WorkerShutdownError` and running past `timeout_seconds` raises
+    `subprocess.TimeoutExpired`. Cancellation is checked between profiles and
+    badges; a running profile child is killed, and badge requests time out
+    by the deadline. Progress events go to
+    `progress_callback` directly, on the calling thread. `usage_callback`
+    receives the `InProcessUsage` of the refresh however it ends.
+    """
+
+    if timeout_seconds <= 0:
+        raise ValueError("Worker timeout_seconds must be positive")
+    resolved_working_directory = os.path.abspath(os.fspath(working_directory))
+    if not os.path.isdir(resolved_working_directory):
+        raise ValueError(
+            f"Worker working_directory must be an existing directory: {resolved_working_directory}"
+        )
+
+    args = [
+        script_path,
+        "--scholar",
+        _normalize_cli_value(scholar),
+        "--timeout",
+        str(PROFILE_TIMEOUT_SECONDS),
+    ]
+    module = load_worker_module(script_path)
+    scholar_ids = module.parse_scholar_ids(_normalize_cli_value(scholar))
+    deadline = _RefreshDeadline(stop_event, time.monotonic() + timeout_seconds)
+    output = OutputTail("stdout", max_lines=tail_lines, line_callback=line_callback)
+    errors = OutputTail("stderr", max_lines=tail_lines, line_callback=line_callback)
+    returncode = 0
+    usage = InProcessUsage()
+    try:
+        if not scholar_ids:
+            raise ValueError("SCHOLAR must include at least one non-empty Google Scholar ID")
+        module.run(
+            scholar_ids,
+            PROFILE_TIMEOUT_SECONDS,
+            work_dir=resolved_working_directory,
+            stop_event=deadline,
+            output=output,
+            progress=(
+                None
+                if progress_callback is None
+                else _guard_progress_callback(progress_callback)
+            ),
+        )
+    except module.RefreshCancelled:
+        output.close()
+        if stop_event is not None and stop_event.is_set():
+            raise WorkerShutdownError(stdout=output.text()) from None
+        raise subprocess.TimeoutExpired(
+            args,
+            timeout_seconds,
+            output=output.text(),
+        ) from None
+    except Exception:
+        returncode = 1
+        errors.write(traceback.format_exc())
     finally:
         cleanup_ci_batch_side_files(resolved_working_directory)
+        if usage_callback is not None:
+            usage_callback(usage.finish())
+    output.close()
+    errors.close()
+    return subprocess.CompletedProcess(args, returncode, output.text(), errors.text())
 
 
 __all__ = [
@@ -278,13 +671,18 @@ __all__ = [
     "PYTHON_EXECUTABLE",
     "CI_BATCH_ONLY_FILENAMES",
     "DIST_DIRNAME",
+    "IN_PROCESS_MODULE_NAME",
+    "OutputTail",
     "SUPPORTED_SOURCES",
     "WEB_OF_SCIENCE_SOURCE",
     "build_worker_argv",
     "cleanup_ci_batch_side_files",
     "get_worker_dist_dir",
     "google_scholar_failure_result",
+    "load_worker_module",
+    "log_worker_line",
     "record_failure_result",
+    "run_worker_in_process",
     "run_worker_subprocess",
     "WorkerShutdownError",
     "web_of_science_failure_result",
@@ -0,0 +1,121 @@
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from service.config import Settings
+from service.promote import promote_release
+from service.server import create_server
+
+
+def build_settings(state_dir, **overrides):
+    settings = Settings()
+    settings.app_host = "127.0.0.1"
+    settings.app_port = 0
+    settings.state_dir = state_dir
+    settings.refresh_on_startup = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    return settings
+
+
+def citation_payload(publications=(), total_citations=10, peer_reviews=0):
+    return {
+        "generated_at": "2026-01-01T00:00:00",
+        "google_scholar": {
+            "status": "success",
+            "total_citations": total_citations,
+            "5y_citations": total_citations - 1,
+            "total_hindex": 3,
+            "5y_hindex": 2,
+            "total_i10index": 1,
+            "5y_i10index": 1,
+            "cites_per_year": {},
+            "publications": list(publications),
+            "error": None,
+        },
+        "web_of_science": {
+            "status": "success" if peer_reviews else "skipped",
+            "peer_reviews": peer_reviews,
+            "error": None,
+        },
+    }
+
+
+def publication(author_pub_id, citations, *, title=None, year="2024"):
+    return {
+        "author_pub_id": author_pub_id,
+        "title": title or f"Paper {author_pub_id}",
+        "year": year,
+        "citations": citations,
+    }
+
+
+def write_staged_run(parent_dir, payload, *, profiles=None, run_id=None):
+    """Create a staged worker run shaped like `main.py` output."""
+
+    staged_run_dir = tempfile.mkdtemp(dir=parent_dir, prefix=run_id or ".staged-")
+    dist_dir = os.path.join(staged_run_dir, "dist")
+    os.makedirs(dist_dir)
+    with open(os.path.join(dist_dir, "citation.json"), "w", encoding="utf-8") as handle:
+        json.dump(payload, handle)
+    with open(os.path.join(dist_dir, "all.svg"), "w", encoding="utf-8") as handle:
+        handle.write("<svg>all</svg>")
+    for item in payload["google_scholar"]["publications"]:
+        name = item["author_pub_id"].replace(":", "_") + ".svg"
+        with open(os.path.join(dist_dir, name), "w", encoding="utf-8") as handle:
+            handle.write(f"<svg>{item['citations']}</svg>")
+    for scholar_id, profile_payload in (profiles or {}).items():
+        profile_dir = os.path.join(dist_dir, scholar_id)
+        os.makedirs(profile_dir)
+        with open(
+            os.path.join(profile_dir, "citation.json"), "w", encoding="utf-8"
+        ) as handle:
+            json.dump(profile_payload, handle)
+        with open(os.path.join(profile_dir, "all.svg"), "w", encoding="utf-8") as handle:
+            handle.write(f"<svg>{scholar_id}</svg>")
+        for item in profile_payload["google_scholar"]["publications"]:
+            name = item["author_pub_id"].replace(":", "_") + ".svg"
+            with open(os.path.join(profile_dir, name), "w", encoding="utf-8") as handle:
+                handle.write(f"<svg>{item['citations']}</svg>")
+    return staged_run_dir
+
+
+def promote_payload(state_dir, payload, **kwargs):
+    staged_run_dir = write_staged_run(state_dir, payload, **kwargs)
+    try:
+        return promote_release(state_dir, staged_run_dir)
+    finally:
+        shutil.rmtree(staged_run_dir, ignore_errors=True)
+
+
+class RunningServer:
+    """Serve `create_server` on an ephemeral port for the duration of a test."""
+
+    def __init__(self, settings, **server_kwargs):
+        self.server = create_server(settings, **server_kwargs)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def request(self, path, method="GET", headers=None, body=None):
+        connection = http.client.HTTPConnection(*self.address, timeout=10)
+        try:
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            connection.close()
+
+    def request_json(self, path, **kwargs):
+        status, headers, body = self.request(path, **kwargs)
+        return status, json.loads(body.decode("utf-8"))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from service.accesslog import AccessLogger, AccessRecord
+from service.metrics import ServiceMetrics
+
+from service_helpers import RunningServer, build_settings
+
+
+def access_record(path="/all.svg", status=200):
+    return AccessRecord(1767225600.0, "127.0.0.1", "GET", path, status, 42, 0.0015, "svg")
+
+
+class AccessLoggerTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="citation-badge-accesslog-")
+        self.log_path = os.path.join(self.temp_dir, "access.log")
+        self.metrics = ServiceMetrics()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def read_lines(self):
+        with open(self.log_path, "r", encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_close_flushes_json_lines_in_batches(self):
+        logger = AccessLogger(self.log_path, batch_size=2, metrics=self.metrics)
+        logger.start()
+        for index in range(5):
+            logger.log(access_record(path=f"/{index}/citation.json"))
+        logger.close()
+
+        lines = self.read_lines()
+        self.assertEqual([line["path"] for line in lines], [f"/{i}/citation.json" for i in range(5)])
+        self.assertEqual(
+            {key: lines[0][key] for key in ("status", "bytes", "latency_ms", "route")},
+            {"status": 200, "bytes": 42, "latency_ms": 1.5, "route": "svg"},
+        )
+        self.assertEqual(lines[0]["ts"], "2026-01-01T00:00:00+00:00")
+        self.assertEqual(self.metrics.access_log_records.value("written"), 5)
+
+    def test_full_queue_drops_and_counts(self):
+        logger = AccessLogger(self.log_path, queue_size=2, metrics=self.metrics)
+        for _ in range(5):
+            logger.log(access_record())
+
+        self.assertEqual(self.metrics.access_log_records.value("dropped"), 3)
+
+    def test_writer_survives_unexpected_write_errors(self):
+        logger = AccessLogger(self.log_path, batch_size=1, metrics=self.metrics)
+        logger.start()
+        real_stream = logger._stream
+        failures = iter([RuntimeError("boom")])
+
+        class _FlakyStream:
+            def write(self, text):
+                error = next(failures, None)
+                if error is not None:
+                    raise error
+                return real_stream.write(text)
+
+            def flush(self):
+                real_stream.flush()
+
+            def close(self):
+                real_stream.close()
+
+        logger._stream = _FlakyStream()
+        with self.assertLogs("citation_badge.service", level="WARNING"):
+            logger.log(access_record(path="/lost"))
+            logger.log(access_record(path="/kept"))
+            logger.close()
+
+        self.assertEqual([line["path"] for line in self.read_lines()], ["/kept"])
+        self.assertEqual(self.metrics.access_log_records.value("dropped"), 1)
+
+    def test_close_is_bounded_when_the_writer_is_stuck(self):
+        logger = AccessLogger(self.log_path, queue_size=1, metrics=self.metrics)
+        release = threading.Event()
+        logger._run = release.wait
+        logger._thread = threading.Thread(target=logger._run, daemon=True)
+        logger.start()
+        self.addCleanup(release.set)
+        logger.log(access_record())
+
+        started = time.monotonic()
+        with self.assertLogs("citation_badge.service", level="WARNING"):
+            logger.close(timeout=0.2)
+
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_sampling_skips_records_above_the_rate(self):
+        logger = AccessLogger(self.log_path, sample_rate=0.25, metrics=self.metrics)
+        draws = iter([0.1, 0.5, 0.2, 0.9])
+        logger._random = lambda: next(draws)
+        logger.start()
+        for index in range(4):
+            logger.log(access_record(path=f"/{index}"))
+        logger.close()
+
+        self.assertEqual([line["path"] for line in self.read_lines()], ["/0", "/2"])
+
+
+class AccessLogServerTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-accesslog-server-")
+        self.log_path = os.path.join(self.state_dir, "access.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_requests_are_logged_after_shutdown_flush(self):
+        running = RunningServer(build_settings(self.state_dir, access_log=self.log_path))
+        try:
+            running.request("/status")
+            running.request("/missing.svg", method="HEAD")
+            # Records are enqueued after the response is flushed to the client.
+            deadline = time.monotonic() + 5
+            requests = running.server.metrics.http_requests
+            while sum(requests.snapshot().values()) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            running.close()
+
+        with open(self.log_path, "r", encoding="utf-8") as handle:
+            lines = [json.loads(line) for line in handle]
+        records = {line["path"]: line for line in lines}
+        self.assertEqual(
+            sorted((line["method"], line["path"], line["status"]) for line in lines),
+            [("GET", "/status", 200), ("HEAD", "/missing.svg", 404)],
+        )
+        self.assertGreater(records["/status"]["bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from service import index as index_module
+from service.index import ReleaseIndexCache
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+)
+
+
+class CountsEndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-counts-")
+        self.running = RunningServer(build_settings(self.state_dir))
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_counts_without_release_reports_no_data(self):
+        status, payload = self.running.request_json("/counts?ids=a")
+
+        self.assertEqual(status, 503)
+        self.assertEqual(payload["error"], "no_data")
+
+    def test_counts_returns_requested_publications_and_metrics(self):
+        promote_payload(
+            self.state_dir,
+            citation_payload(
+                [publication("id1:abc", 4), publication("id1:def", 9)],
+                total_citations=13,
+                peer_reviews=2,
+            ),
+        )
+
+        status, payload = self.running.request_json(
+            "/counts?ids=id1_abc,id1:def,missing&metrics=total_citations,peer_reviews"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            payload["publications"], {"id1_abc": 4, "id1:def": 9, "missing": None}
+        )
+        self.assertEqual(
+            payload["metrics"], {"total_citations": 13, "peer_reviews": 2}
+        )
+
+    def test_counts_defaults_to_all_metrics(self):
+        promote_payload(self.state_dir, citation_payload())
+
+        status, payload = self.running.request_json("/counts")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["metrics"]["total_citations"], 10)
+        self.assertEqual(payload["publications"], {})
+
+    def test_counts_rejects_oversized_requests(self):
+        promote_payload(self.state_dir, citation_payload())
+        ids = ",".join(f"p{number}" for number in range(501))
+
+        status, payload = self.running.request_json(f"/counts?ids={ids}")
+
+        self.assertEqual(status, 400)
+        self.assertEqual(payload["error"], "too_many_keys")
+
+
+class ReleaseIndexCacheTest(unittest.TestCase):
+    def test_index_is_built_once_per_release(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-index-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        release_dir = promote_payload(
+            state_dir, citation_payload([publication("id1:abc", 4)])
+        )
+        cache = ReleaseIndexCache()
+
+        with mock.patch.object(
+            index_module,
+            "build_release_index",
+            wraps=index_module.build_release_index,
+        ) as build:
+            first = cache.get(release_dir)
+            second = cache.get(release_dir)
+
+        self.assertIs(first, second)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(first.citations_by_id["id1_abc"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
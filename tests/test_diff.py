@@ -0,0 +1,141 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from service.diff import DIFF_FILENAME, diff_citation_payloads, load_release_diff
+from service.promote import MANIFEST_FILENAME, finalize_release, promote_release
+from service.releases import main as releases_main
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+    write_staged_run,
+)
+
+
+class ReleaseDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-diff-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.first = promote_payload(
+            self.state_dir,
+            citation_payload(
+                [publication("id1:abc", 4), publication("id1:old", 2)],
+                total_citations=6,
+            ),
+        )
+        self.second_payload = citation_payload(
+            [publication("id1:abc", 7), publication("id1:new", 1)],
+            total_citations=8,
+        )
+
+    def serve(self):
+        running = RunningServer(build_settings(self.state_dir))
+        self.addCleanup(running.close)
+        return running
+
+    def test_promotion_stores_the_diff_against_the_previous_release(self):
+        second = promote_payload(self.state_dir, self.second_payload)
+
+        diff = load_release_diff(second)
+
+        self.assertEqual(diff["from"], os.path.basename(self.first))
+        self.assertEqual(diff["to"], os.path.basename(second))
+        self.assertEqual(
+            diff["artifacts"],
+            {
+                "added": ["id1_new.svg"],
+                "removed": ["id1_old.svg"],
+                "modified": ["citation.json", "id1_abc.svg"],
+            },
+        )
+        self.assertEqual(diff["unchanged"], 1)
+        [citations] = diff["citations"]
+        self.assertEqual(citations["path"], "citation.json")
+        self.assertEqual(
+            citations["metrics"]["total_citations"], {"from": 6, "to": 8, "delta": 2}
+        )
+        self.assertEqual(
+            citations["publications"],
+            [
+                {"author_pub_id": "id1:abc", "from": 4, "to": 7, "delta": 3},
+                {"author_pub_id": "id1:new", "from": None, "to": 1, "delta": 1},
+                {"author_pub_id": "id1:old", "from": 2, "to": None, "delta": -2},
+            ],
+        )
+
+    def test_first_release_has_no_diff(self):
+        self.assertIsNone(load_release_diff(self.first))
+        self.assertFalse(os.path.exists(os.path.join(self.first, DIFF_FILENAME)))
+
+    def test_deferred_finalize_stores_the_diff(self):
+        staged_run_dir = write_staged_run(self.state_dir, self.second_payload)
+        self.addCleanup(shutil.rmtree, staged_run_dir, True)
+        second = promote_release(self.state_dir, staged_run_dir, finalize=False)
+
+        self.assertTrue(finalize_release(self.state_dir, second, self.first))
+
+        self.assertEqual(load_release_diff(second)["from"], os.path.basename(self.first))
+
+    def test_unchanged_counts_are_not_listed(self):
+        payload = citation_payload([publication("id1:abc", 4)])
+
+        self.assertEqual(
+            diff_citation_payloads(payload, payload),
+            {"metrics": {}, "publications": []},
+        )
+
+    def test_diff_endpoint_serves_stored_and_computed_diffs(self):
+        second = promote_payload(self.state_dir, self.second_payload)
+        third = promote_payload(self.state_dir, self.second_payload)
+        running = self.serve()
+        names = [os.path.basename(path) for path in (self.first, second, third)]
+
+        status, stored = running.request_json("/diff")
+        self.assertEqual(status, 200)
+        self.assertEqual((stored["from"], stored["to"]), (names[1], names[2]))
+        self.assertEqual(
+            stored["artifacts"], {"added": [], "removed": [], "modified": []}
+        )
+
+        status, computed = running.request_json(f"/diff?from={names[0]}&to={names[2]}")
+        self.assertEqual(status, 200)
+        self.assertEqual(computed["artifacts"]["added"], ["id1_new.svg"])
+        self.assertEqual(computed, {**load_release_diff(second), "to": names[2]})
+
+        # Computed diffs are cached; releases without a manifest are never hashed.
+        os.unlink(os.path.join(self.first, MANIFEST_FILENAME))
+        status, cached = running.request_json(f"/diff?from={names[0]}&to={names[2]}")
+        self.assertEqual((status, cached), (200, computed))
+        self.assertEqual(
+            running.server.metrics.cache_lookups.value("release_diff", "hit"), 1
+        )
+        status, error = running.request_json(f"/diff?from={names[1]}&to={names[0]}")
+        self.assertEqual((status, error["error"]), (409, "no_manifest"))
+
+        status, error = running.request_json("/diff?from=../etc")
+        self.assertEqual((status, error["error"]), (404, "unknown_release"))
+        status, error = running.request_json(f"/diff?to={names[0]}")
+        self.assertEqual((status, error["error"]), (404, "no_diff"))
+
+    def test_diff_command_prints_the_stored_diff(self):
+        second = promote_payload(self.state_dir, self.second_payload)
+        output = io.StringIO()
+
+        with mock.patch.dict(os.environ, {"STATE_DIR": self.state_dir}):
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(releases_main(["diff"]), 0)
+
+        self.assertEqual(json.loads(output.getvalue()), load_release_diff(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
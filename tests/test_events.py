@@ -0,0 +1,130 @@
+import http.client
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from service.events import EventBroker, RELEASE_CHANGED
+from service.storage import safe_load_status, save_status
+
+from service_helpers import RunningServer, build_settings, citation_payload, promote_payload
+
+
+class EventBrokerTest(unittest.TestCase):
+    def test_wait_for_wakes_on_publish(self):
+        broker = EventBroker()
+        timer = threading.Timer(0.05, broker.publish, args=("ping", {"n": 1}))
+        timer.start()
+
+        events = broker.wait_for(broker.sequence, timeout=5)
+
+        self.assertEqual([event.event_type for event in events], ["ping"])
+        self.assertEqual(events[0].data, {"n": 1})
+
+    def test_wait_for_times_out_and_close_releases_waiters(self):
+        broker = EventBroker()
+        self.assertEqual(broker.wait_for(0, timeout=0.01), [])
+
+        threading.Timer(0.05, broker.close).start()
+        started = time.monotonic()
+        self.assertEqual(broker.wait_for(0, timeout=5), [])
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_listeners_run_after_publish_and_failures_are_isolated(self):
+        broker = EventBroker()
+        seen = []
+
+        def _broken(_):
+            raise RuntimeError("boom")
+
+        broker.add_listener(_broken)
+        broker.add_listener(seen.append)
+        with self.assertLogs("citation_badge.service", level="WARNING"):
+            event = broker.publish("ping", {"n": 1})
+
+        self.assertEqual(seen, [event])
+
+
+class StatusLongPollTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-events-")
+        self.running = RunningServer(build_settings(self.state_dir))
+        self.server = self.running.server
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def update_status(self, service_status):
+        status_file = self.server.state_layout.status_file
+        payload = safe_load_status(status_file, settings=self.server.settings)
+        payload["service"]["status"] = service_status
+        save_status(status_file, payload, settings=self.server.settings)
+        self.server.events.publish("refresh_finished", {"outcome": "succeeded"})
+
+    def test_unchanged_status_times_out_with_not_modified(self):
+        _, headers, _ = self.running.request("/status")
+        etag = headers["ETag"]
+
+        status, headers, body = self.running.request(f"/status?wait={etag}&timeout=0")
+
+        self.assertEqual(status, 304)
+        self.assertEqual(headers["ETag"], etag)
+        self.assertEqual(body, b"")
+
+    def test_timeout_rereads_status_changed_without_an_event(self):
+        _, headers, _ = self.running.request("/status")
+        etag = headers["ETag"]
+        status_file = self.server.state_layout.status_file
+        payload = safe_load_status(status_file, settings=self.server.settings)
+        payload["service"]["status"] = "ready"
+        threading.Timer(
+            0.05, save_status, args=(status_file, payload),
+            kwargs={"settings": self.server.settings},
+        ).start()
+
+        status, headers, _ = self.running.request(f"/status?wait={etag}&timeout=1")
+
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], etag)
+
+    def test_stale_etag_returns_immediately(self):
+        status, headers, _ = self.running.request('/status?wait="stale"&timeout=30')
+
+        self.assertEqual(status, 200)
+        self.assertIn("ETag", headers)
+
+    def test_wait_returns_when_status_changes(self):
+        _, headers, _ = self.running.request("/status")
+        etag = headers["ETag"].strip('"')
+        threading.Timer(0.1, self.update_status, args=("ready",)).start()
+
+        started = time.monotonic()
+        status, payload = self.running.request_json(f"/status?wait={etag}&timeout=10")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["service"]["status"], "ready")
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_event_stream_delivers_release_changes(self):
+        connection = http.client.HTTPConnection(*self.running.address, timeout=10)
+        self.addCleanup(connection.close)
+        connection.request("GET", "/events")
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertTrue(response.getheader("Content-Type").startswith("text/event-stream"))
+        self.assertEqual(response.fp.readline(), b"retry: 5000\n")
+        self.assertEqual(response.fp.readline(), b": connected\n")
+        self.assertEqual(response.fp.readline(), b"\n")
+
+        release_dir = promote_payload(self.state_dir, citation_payload())
+        self.server._release_promoted(release_dir)
+
+        self.assertEqual(response.fp.readline(), b"id: 1\n")
+        self.assertEqual(response.fp.readline(), f"event: {RELEASE_CHANGED}\n".encode())
+        self.assertIn(b'"release"', response.fp.readline())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from service.server import SENDFILE_MIN_BYTES, send_file_body
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+)
+
+
+class SendFileBodyTest(unittest.TestCase):
+    def test_non_socket_connection_falls_back_to_copy(self):
+        payload = b"x" * (SENDFILE_MIN_BYTES * 3 + 17)
+        wfile = io.BytesIO()
+
+        sent = send_file_body(object(), wfile, io.BytesIO(payload), len(payload))
+
+        self.assertEqual(sent, len(payload))
+        self.assertEqual(wfile.getvalue(), payload)
+
+
+class LargeFileResponseTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-sendfile-")
+        self.running = RunningServer(build_settings(self.state_dir))
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_large_citation_json_is_served_intact(self):
+        publications = [
+            publication(f"id1:{number:06d}", number, title="t" * 200)
+            for number in range(2000)
+        ]
+        promote_payload(self.state_dir, citation_payload(publications))
+
+        status, headers, body = self.running.request("/citation.json")
+
+        self.assertEqual(status, 200)
+        self.assertGreater(len(body), SENDFILE_MIN_BYTES)
+        self.assertEqual(int(headers["Content-Length"]), len(body))
+        self.assertEqual(len(json.loads(body)["google_scholar"]["publications"]), 2000)
+
+    def test_head_reports_length_without_body(self):
+        promote_payload(self.state_dir, citation_payload())
+
+        status, headers, body = self.running.request("/all.svg", method="HEAD")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Length"], str(len("<svg>all</svg>")))
+        self.assertEqual(body, b"")
+
+    def test_artifact_deleted_after_lookup_is_answered_not_dropped(self):
+        release_dir = promote_payload(self.state_dir, citation_payload())
+        self.assertEqual(self.running.request("/all.svg")[0], 200)
+        os.remove(os.path.join(release_dir, "dist", "all.svg"))
+        os.remove(os.path.join(release_dir, "dist", "citation.json"))
+
+        self.assertEqual(self.running.request("/all.svg")[0], 404)
+        self.assertEqual(self.running.request("/citation.json")[0], 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
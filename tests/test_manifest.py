@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from service.promote import MANIFEST_FILENAME, load_manifest
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+)
+
+
+class ReleaseManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-manifest-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.payload = citation_payload([publication("id1:abc", 4)])
+
+    def serve(self):
+        running = RunningServer(build_settings(self.state_dir))
+        self.addCleanup(running.close)
+        return running
+
+    def test_promotion_writes_a_manifest_of_every_artifact(self):
+        release_dir = promote_payload(
+            self.state_dir, self.payload, profiles={"id1": self.payload}
+        )
+
+        manifest = load_manifest(release_dir)
+
+        self.assertEqual(
+            sorted(manifest),
+            [
+                "all.svg",
+                "citation.json",
+                "id1/all.svg",
+                "id1/citation.json",
+                "id1/id1_abc.svg",
+                "id1_abc.svg",
+            ],
+        )
+        entry = manifest["id1/id1_abc.svg"]
+        with open(os.path.join(release_dir, "dist", "id1", "id1_abc.svg"), "rb") as handle:
+            content = handle.read()
+        self.assertEqual(entry["size"], len(content))
+        self.assertEqual(entry["sha256"], hashlib.sha256(content).hexdigest())
+        self.assertEqual(entry["content_type"], "image/svg+xml")
+        self.assertIsInstance(entry["mtime"], float)
+        self.assertEqual(
+            manifest["citation.json"]["content_type"], "application/json; charset=utf-8"
+        )
+
+    def test_artifacts_carry_manifest_headers_and_revalidate_from_memory(self):
+        release_dir = promote_payload(self.state_dir, self.payload)
+        running = self.serve()
+        digest = load_manifest(release_dir)["id1_abc.svg"]["sha256"]
+
+        status, headers, body = running.request("/id1_abc.svg")
+        self.assertEqual((status, body), (200, b"<svg>4</svg>"))
+        self.assertEqual(headers["ETag"], f'"{digest}"')
+        self.assertIn("GMT", headers["Last-Modified"])
+
+        # A matching ETag is answered without opening the file.
+        os.unlink(os.path.join(release_dir, "dist", "id1_abc.svg"))
+        status, headers, body = running.request(
+            "/id1_abc.svg", headers={"If-None-Match": f'"other", "{digest}"'}
+        )
+        self.assertEqual((status, body, headers["ETag"]), (304, b"", f'"{digest}"'))
+
+    def test_only_manifest_artifacts_are_routed(self):
+        release_dir = promote_payload(self.state_dir, self.payload)
+        with open(os.path.join(release_dir, "dist", "extra.svg"), "w") as handle:
+            handle.write("<svg>extra</svg>")
+        running = self.serve()
+
+        self.assertEqual(running.request("/extra.svg")[0], 404)
+
+    def test_size_mismatch_is_refused(self):
+        release_dir = promote_payload(self.state_dir, self.payload)
+        running = self.serve()
+        badge = os.path.join(release_dir, "dist", "id1_abc.svg")
+        os.chmod(badge, stat.S_IRUSR | stat.S_IWUSR)
+        with open(badge, "w") as handle:
+            handle.write("<svg>tampered</svg>")
+
+        self.assertEqual(running.request("/id1_abc.svg")[0], 500)
+        self.assertEqual(
+            running.server.metrics.artifact_integrity_failures.value(), 1
+        )
+
+    def test_releases_without_a_manifest_are_scanned(self):
+        release_dir = promote_payload(self.state_dir, self.payload)
+        os.unlink(os.path.join(release_dir, MANIFEST_FILENAME))
+        running = self.serve()
+
+        status, headers, body = running.request("/id1_abc.svg")
+
+        self.assertEqual((status, body), (200, b"<svg>4</svg>"))
+        self.assertNotIn("ETag", headers)
+
+    def test_manifest_names_its_release(self):
+        release_dir = promote_payload(self.state_dir, self.payload)
+
+        with open(os.path.join(release_dir, MANIFEST_FILENAME), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(manifest["release"], os.path.basename(release_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+from service.metrics import Histogram, MetricsRegistry, ServiceMetrics
+
+from service_helpers import RunningServer, build_settings
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+        )
+        histogram.observe(0.05, "svg")
+        histogram.observe(0.5, "svg")
+        histogram.observe(5.0, "svg")
+
+        rendered = registry.render()
+
+        self.assertIn('latency_seconds_bucket{route="svg",le="0.1"} 1', rendered)
+        self.assertIn('latency_seconds_bucket{route="svg",le="1"} 2', rendered)
+        self.assertIn('latency_seconds_bucket{route="svg",le="+Inf"} 3', rendered)
+        self.assertIn('latency_seconds_count{route="svg"} 3', rendered)
+        self.assertEqual(histogram.count("svg"), 3)
+
+    def test_histogram_rejects_wrong_label_arity(self):
+        histogram = Histogram("latency_seconds", "Latency.", ("route",))
+        with self.assertRaises(ValueError):
+            histogram.observe(0.1)
+
+    def test_cache_hit_ratio_is_derived_from_lookups(self):
+        metrics = ServiceMetrics()
+        metrics.record_cache_lookup("release_index", True)
+        metrics.record_cache_lookup("release_index", True)
+        metrics.record_cache_lookup("release_index", False)
+        metrics.record_cache_lookup("release_index", True)
+
+        self.assertIn(
+            'citation_badge_cache_hit_ratio{cache="release_index"} 0.75',
+            metrics.render(),
+        )
+
+
+class MetricsEndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-metrics-")
+        self.running = RunningServer(build_settings(self.state_dir))
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_metrics_endpoint_reports_per_route_requests(self):
+        self.running.request("/all.svg")
+        self.running.request("/status")
+
+        # Metrics are recorded after the response is flushed, so give the
+        # handler thread a moment to finish before scraping.
+        deadline = time.monotonic() + 2
+        while self.running.server.metrics.http_request_duration.count("status") < 1:
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        status, headers, body = self.running.request("/metrics")
+
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = body.decode("utf-8")
+        self.assertIn(
+            'citation_badge_http_requests_total{route="svg",method="GET",status="404"} 1',
+            text,
+        )
+        self.assertIn(
+            'citation_badge_http_requests_total{route="status",method="GET",status="200"} 1',
+            text,
+        )
+        self.assertIn(
+            'citation_badge_http_request_duration_seconds_count{route="status"} 1',
+            text,
+        )
+        self.assertIn('citation_badge_http_response_bytes_total{route="status"}', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
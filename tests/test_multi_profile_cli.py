@@ -16,6 +16,10 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 MAIN_PATH = REPO_ROOT / "main.py"
 
 
+class FakeMaxTriesExceededException(Exception):
+    pass
+
+
 class MultiProfileCliTest(unittest.TestCase):
     def run_main(
         self, scholar_arg, authors, *, wos_overwrite=None, workdir=None, timeout=180
@@ -29,9 +33,6 @@ class MultiProfileCliTest(unittest.TestCase):
             for name in ["requests", "scholarly", "scholarly._proxy_generator"]
         }
 
-        class FakeMaxTriesExceededException(Exception):
-            pass
-
         class FakeScholarly:
             def fill(self, author_seed):
                 scholar_id = author_seed["scholar_id"]
@@ -46,7 +47,7 @@ class MultiProfileCliTest(unittest.TestCase):
             def __init__(self, url):
                 self.content = f"badge:{url}".encode("utf-8")
 
-        fake_requests = types.SimpleNamespace(get=lambda url: FakeResponse(url))
+        fake_requests = types.SimpleNamespace(get=lambda url, timeout: FakeResponse(url))
         fake_scholarly_module = types.SimpleNamespace(scholarly=FakeScholarly())
         fake_proxy_module = types.SimpleNamespace(
             MaxTriesExceededException=FakeMaxTriesExceededException
@@ -257,6 +258,32 @@ class MultiProfileCliTest(unittest.TestCase):
         self.assertFalse((dist / "id2" / "citation.json").exists())
         self.assertEqual((self.temp_dir / "citation_updated.flag").read_text(), "true")
 
+    def test_max_tries_exceeded_profile_is_reported_as_failed(self):
+        self.temp_dir, output = self.run_main(
+            "id1,id2",
+            {
+                "id1": self.author("id1", 12),
+                "id2": FakeMaxTriesExceededException("proxies exhausted"),
+            },
+        )
+
+        self.assertIn("Max tries exceeded, skip google scholar badges for id2", output)
+        self.assertFalse((self.temp_dir / "dist" / "id2" / "citation.json").exists())
+        self.assertTrue((self.temp_dir / "dist" / "id1" / "citation.json").exists())
+
+    def test_profile_timeout_is_reported_as_failed(self):
+        def slow():
+            time.sleep(2)
+            return self.author("id1", 12)
+
+        self.temp_dir, output = self.run_main("id1", {"id1": slow}, timeout=1)
+
+        self.assertIn(
+            "timed out after 1 seconds, skip google scholar badges for id1", output
+        )
+        self.assertNotIn("An unexpected error occurred", output)
+        self.assertFalse((self.temp_dir / "dist" / "citation.json").exists())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,91 @@
+import errno
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from service.objects import collect_objects, link_tree
+from service.promote import collect_releases
+from service.storage import get_state_layout
+
+from service_helpers import citation_payload, promote_payload, publication
+
+
+def _blobs(objects_dir):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(objects_dir)
+        for name in names
+        if not name.startswith(".")
+    )
+
+
+class ObjectStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-objects-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.objects_dir = get_state_layout(self.state_dir).objects_dir
+
+    def promote(self, changed_citations):
+        items = [publication(f"id1:p{index}", index) for index in range(10)]
+        items.append(publication("id1:changed", changed_citations))
+        return promote_payload(self.state_dir, citation_payload(items))
+
+    def test_unchanged_files_share_one_blob_across_releases(self):
+        first = self.promote(101)
+        blobs_after_first = _blobs(self.objects_dir)
+        second = self.promote(102)
+
+        def inode(release, name):
+            return os.stat(os.path.join(release, "dist", name)).st_ino
+
+        self.assertEqual(inode(first, "id1_p3.svg"), inode(second, "id1_p3.svg"))
+        self.assertNotEqual(
+            inode(first, "id1_changed.svg"), inode(second, "id1_changed.svg")
+        )
+        # Only the changed badge and citation.json need new blobs.
+        new_blobs = set(_blobs(self.objects_dir)) - set(blobs_after_first)
+        self.assertEqual(len(new_blobs), 2)
+        with open(os.path.join(second, "dist", "id1_changed.svg"), "rb") as handle:
+            self.assertEqual(handle.read(), b"<svg>102</svg>")
+
+    def test_blobs_of_collected_releases_are_deleted(self):
+        first = self.promote(101)
+        self.promote(102)
+        with open(os.path.join(first, "dist", "id1_changed.svg"), "rb") as handle:
+            first_only = handle.read()
+
+        collect_releases(self.state_dir, 1)
+
+        self.assertFalse(os.path.exists(first))
+        contents = set()
+        for blob in _blobs(self.objects_dir):
+            with open(blob, "rb") as handle:
+                contents.add(handle.read())
+        self.assertNotIn(first_only, contents)
+        self.assertIn(b"<svg>102</svg>", contents)
+        self.assertEqual(collect_objects(self.objects_dir), (0, 0))
+
+    def test_link_tree_copies_when_hardlinks_are_unsupported(self):
+        source = os.path.join(self.state_dir, "source")
+        os.makedirs(os.path.join(source, "nested"))
+        with open(os.path.join(source, "nested", "a.svg"), "w") as handle:
+            handle.write("<svg>a</svg>")
+        target = os.path.join(self.state_dir, "target")
+
+        with mock.patch(
+            "service.objects.os.link", side_effect=OSError(errno.EPERM, "no links")
+        ):
+            [stored] = link_tree(source, target, self.objects_dir)
+
+        self.assertEqual(
+            (stored.relative_path, stored.size, stored.written),
+            ("nested/a.svg", 12, 12),
+        )
+        with open(os.path.join(target, "nested", "a.svg")) as handle:
+            self.assertEqual(handle.read(), "<svg>a</svg>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import http.client
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from service.events import EventBroker, REFRESH_FINISHED
+from service.prefork import EventRelay, event_relay_path, reuse_port_supported
+from service.server import create_server
+
+from service_helpers import build_settings, citation_payload, promote_payload
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class ReleasePromotedListenersTest(unittest.TestCase):
+    def test_failing_listener_does_not_skip_later_ones(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-listeners-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        release_dir = promote_payload(state_dir, citation_payload())
+        server = create_server(build_settings(state_dir))
+        self.addCleanup(server.server_close)
+        notified = []
+
+        def _broken(_):
+            raise RuntimeError("boom")
+
+        server.release_promoted_listeners[:0] = [_broken]
+        server.release_promoted_listeners.append(notified.append)
+        with self.assertLogs("citation_badge.service", level="WARNING"):
+            server._release_promoted(release_dir)
+
+        self.assertEqual(notified, [release_dir])
+
+
+class EventRelayTest(unittest.TestCase):
+    def setUp(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-relay-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        self.path = event_relay_path(state_dir)
+
+    def test_reader_sees_only_events_written_after_priming(self):
+        owner = EventRelay(self.path)
+        broker = EventBroker()
+        owner.append(broker.publish(REFRESH_FINISHED, {"outcome": "old"}))
+        reader = EventRelay(self.path)
+        reader.prime()
+
+        owner.append(broker.publish(REFRESH_FINISHED, {"outcome": "succeeded"}))
+
+        fresh = reader.read_new()
+        self.assertEqual([item["data"] for item in fresh], [{"outcome": "succeeded"}])
+        self.assertEqual(reader.read_new(), [])
+
+    def test_new_owner_restarting_sequences_is_not_mistaken_for_old_events(self):
+        reader = EventRelay(self.path)
+        reader.prime()
+        EventRelay(self.path).append(EventBroker().publish(REFRESH_FINISHED))
+        reader.read_new()
+
+        replacement = {
+            "owner": os.getpid() + 1,
+            "sequence": 1,
+            "event": REFRESH_FINISHED,
+            "data": {},
+        }
+        with open(self.path, "w", encoding="utf-8") as handle:
+            json.dump({"events": [replacement]}, handle)
+
+        self.assertEqual(reader.read_new(), [replacement])
+
+
+@unittest.skipUnless(reuse_port_supported(), "SO_REUSEPORT is unavailable")
+class PreforkServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-prefork-")
+        self.port = free_port()
+        env = dict(
+            os.environ,
+            APP_HOST="127.0.0.1",
+            APP_PORT=str(self.port),
+            STATE_DIR=self.state_dir,
+            REFRESH_ON_STARTUP="0",
+            SERVER_PROCESSES="3",
+            RATE_LIMIT_PER_SECOND="0",
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "service.server"],
+            cwd=REPO_ROOT,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            start_new_session=True,
+        )
+
+    def tearDown(self):
+        # Kill the whole group so serving children never outlive a failed
+        # test and keep the output pipe (and communicate()) open.
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.process.communicate()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def request(self, path):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def wait_until_serving(self):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                return self.request("/status")
+            except OSError:
+                time.sleep(0.05)
+        self.fail("prefork service did not start")
+
+    def test_processes_share_port_and_follow_promotions(self):
+        self.wait_until_serving()
+        self.assertEqual(self.request("/all.svg")[0], 404)
+
+        promote_payload(self.state_dir, citation_payload(total_citations=21))
+        responses = [self.request("/counts?metrics=total_citations") for _ in range(12)]
+
+        self.assertTrue(all(status == 200 for status, _ in responses))
+        self.assertTrue(all(b'"total_citations":21' in body for _, body in responses))
+
+        self.process.send_signal(signal.SIGTERM)
+        output, _ = self.process.communicate(timeout=15)
+        self.assertEqual(self.process.returncode, 0, output)
+        self.assertEqual(output.count("prefork child serving"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from service import index as index_module
+from service.promote import collect_releases
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+)
+
+
+class ProfileRoutesTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-profiles-")
+        self.running = RunningServer(build_settings(self.state_dir))
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def promote_two_profiles(self):
+        id1 = citation_payload([publication("id1:abc", 4)], total_citations=4)
+        id2 = citation_payload([publication("id2:xyz", 7)], total_citations=7)
+        promote_payload(self.state_dir, id1, profiles={"id1": id1, "id2": id2})
+
+    def test_profile_artifacts_are_served(self):
+        self.promote_two_profiles()
+
+        status, headers, body = self.running.request("/id2/all.svg")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "image/svg+xml")
+        self.assertEqual(body, b"<svg>id2</svg>")
+
+        status, _, body = self.running.request("/id2/id2_xyz.svg")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"<svg>7</svg>")
+
+        status, payload = self.running.request_json("/id2/citation.json")
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["google_scholar"]["total_citations"], 7)
+
+    def test_root_artifacts_keep_first_profile_mirror(self):
+        self.promote_two_profiles()
+
+        status, _, body = self.running.request("/id1_abc.svg")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b"<svg>4</svg>")
+
+    def test_unknown_profile_or_artifact_is_not_found(self):
+        self.promote_two_profiles()
+
+        for path in (
+            "/id3/all.svg",
+            "/id3/citation.json",
+            "/id1/id2_xyz.svg",
+            "/id1/summary.md",
+            "/../citation.json",
+            "/id1/../all.svg",
+            "/id1/nested/all.svg",
+        ):
+            with self.subTest(path=path):
+                status, _, _ = self.running.request(path)
+                self.assertEqual(status, 404)
+
+    def test_profile_citation_json_without_release_reports_no_data(self):
+        status, payload = self.running.request_json("/id1/citation.json")
+
+        self.assertEqual(status, 503)
+        self.assertEqual(payload["error"], "no_data")
+
+
+class CurrentReleaseRoutingTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-routing-")
+        self.running = RunningServer(build_settings(self.state_dir))
+        self.server = self.running.server
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_unknown_badges_are_answered_from_memory(self):
+        promote_payload(self.state_dir, citation_payload([publication("id1:abc", 4)]))
+        self.assertEqual(self.running.request("/id1_abc.svg")[0], 200)
+
+        with mock.patch.object(
+            index_module,
+            "current_release_path",
+            wraps=index_module.current_release_path,
+        ) as resolve, mock.patch.object(
+            index_module, "build_release_index"
+        ) as build:
+            statuses = {
+                self.running.request(f"/probe{number}.svg")[0] for number in range(20)
+            }
+            statuses.add(self.running.request("/id9/citation.json")[0])
+
+        self.assertEqual(statuses, {404})
+        self.assertEqual(resolve.call_count, 0)
+        self.assertEqual(build.call_count, 0)
+
+    def test_route_table_follows_promotions_from_any_process(self):
+        promote_payload(self.state_dir, citation_payload([publication("id1:abc", 4)]))
+        self.assertEqual(self.running.request("/id1_abc.svg")[0], 200)
+
+        # Promoted without telling this server, like another process would.
+        promote_payload(self.state_dir, citation_payload([publication("id1:new", 6)]))
+        self.assertEqual(self.running.request("/id1_abc.svg")[0], 404)
+        status, _, body = self.running.request("/id1_new.svg")
+        self.assertEqual((status, body), (200, b"<svg>6</svg>"))
+
+        release_dir = promote_payload(
+            self.state_dir, citation_payload([publication("id1:third", 8)])
+        )
+        self.server._release_promoted(release_dir)
+        self.assertEqual(self.running.request("/id1_new.svg")[0], 404)
+        self.assertEqual(self.running.request("/id1_third.svg")[0], 200)
+
+    def test_stale_index_retries_after_its_release_was_deleted(self):
+        promote_payload(self.state_dir, citation_payload([publication("id1:abc", 4)]))
+        stale = self.server.current_release.get()
+        promote_payload(self.state_dir, citation_payload([publication("id1:abc", 5)]))
+        collect_releases(self.state_dir, 1)
+
+        with mock.patch.object(self.server.current_release, "get", return_value=stale):
+            status, _, body = self.running.request("/id1_abc.svg")
+
+        self.assertEqual((status, body), (200, b"<svg>5</svg>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
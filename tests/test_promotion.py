@@ -0,0 +1,131 @@
+import errno
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from service.promote import (
+    MANIFEST_FILENAME,
+    finalize_release,
+    load_manifest,
+    promote_release,
+)
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+    write_staged_run,
+)
+
+
+FAKE_WORKER_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "fake_worker.py"
+
+
+class RenamePromotionTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-promotion-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.payload = citation_payload([publication("id1:abc", 4)])
+
+    def stage(self, payload=None):
+        staged_run_dir = write_staged_run(self.state_dir, payload or self.payload)
+        self.addCleanup(shutil.rmtree, staged_run_dir, True)
+        return staged_run_dir
+
+    def test_staged_dist_is_renamed_into_the_release(self):
+        staged_run_dir = self.stage()
+        staged_badge = os.path.join(staged_run_dir, "dist", "id1_abc.svg")
+        inode = os.stat(staged_badge).st_ino
+
+        release_dir = promote_release(self.state_dir, staged_run_dir)
+
+        self.assertFalse(os.path.exists(os.path.join(staged_run_dir, "dist")))
+        self.assertEqual(
+            os.stat(os.path.join(release_dir, "dist", "id1_abc.svg")).st_ino, inode
+        )
+        self.assertIn("id1_abc.svg", load_manifest(release_dir))
+
+    def test_deferred_finalize_deduplicates_against_earlier_releases(self):
+        previous = promote_payload(self.state_dir, self.payload)
+        changed = citation_payload(
+            [publication("id1:abc", 4), publication("id1:new", 9)]
+        )
+
+        release_dir = promote_release(self.state_dir, self.stage(changed), finalize=False)
+
+        self.assertFalse(os.path.exists(os.path.join(release_dir, MANIFEST_FILENAME)))
+        self.assertTrue(finalize_release(self.state_dir, release_dir))
+        self.assertFalse(finalize_release(self.state_dir, release_dir))
+        self.assertEqual(
+            os.stat(os.path.join(release_dir, "dist", "id1_abc.svg")).st_ino,
+            os.stat(os.path.join(previous, "dist", "id1_abc.svg")).st_ino,
+        )
+        manifest = load_manifest(release_dir)
+        self.assertEqual(
+            sorted(manifest),
+            ["all.svg", "citation.json", "id1_abc.svg", "id1_new.svg"],
+        )
+
+    def test_other_filesystems_are_copied(self):
+        for patch in (
+            mock.patch("service.promote._same_device", return_value=False),
+            mock.patch(
+                "service.promote.os.rename",
+                side_effect=OSError(errno.EXDEV, "cross-device link"),
+            ),
+        ):
+            with self.subTest(patch=patch):
+                staged_run_dir = self.stage()
+                with patch:
+                    release_dir = promote_release(self.state_dir, staged_run_dir)
+
+                self.assertTrue(os.path.isdir(os.path.join(staged_run_dir, "dist")))
+                self.assertIn("id1_abc.svg", load_manifest(release_dir))
+                self.assertEqual(
+                    [
+                        name
+                        for name in os.listdir(os.path.dirname(release_dir))
+                        if name.endswith(".tmp")
+                    ],
+                    [],
+                )
+
+
+class RefreshPromotionTest(unittest.TestCase):
+    def test_refresh_serves_manifest_headers_once_finalized(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-refresh-promotion-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        running = RunningServer(
+            build_settings(state_dir, scholar="rename"),
+            worker_python_executable=sys.executable,
+            worker_script_path=str(FAKE_WORKER_PATH),
+        )
+        self.addCleanup(running.close)
+        events = running.server.events
+
+        running.server.runtime.refresh("manual")
+
+        deadline = time.monotonic() + 5
+        headers = {}
+        while "ETag" not in headers and time.monotonic() < deadline:
+            status, headers, _ = running.request("/all.svg")
+            time.sleep(0.01)
+        self.assertEqual(status, 200)
+        self.assertIn("ETag", headers)
+        release_events = [
+            event
+            for event in events.events_after(0)
+            if event.event_type == "release_changed"
+        ]
+        self.assertEqual(len(release_events), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+import unittest
+
+from service.index import PublicationIndex
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+)
+
+
+PUBLICATIONS = [
+    publication("id1:a", 5, title="Beta networks", year="2019"),
+    publication("id1:b", 40, title="Alpha models", year="2021"),
+    publication("id1:c", 12, title="Alpha search", year="2023"),
+    publication("id1:d", 12, title="Gamma", year=""),
+]
+
+
+class PublicationIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = PublicationIndex(PUBLICATIONS)
+
+    def ids(self, records):
+        return [record["author_pub_id"] for record in records]
+
+    def test_default_orders(self):
+        _, by_citations = self.index.query(sort="citations")
+        _, by_year = self.index.query(sort="year")
+        _, by_title = self.index.query(sort="title")
+
+        self.assertEqual(self.ids(by_citations), ["id1:b", "id1:c", "id1:d", "id1:a"])
+        self.assertEqual(self.ids(by_year), ["id1:c", "id1:b", "id1:a", "id1:d"])
+        self.assertEqual(self.ids(by_title), ["id1:b", "id1:c", "id1:a", "id1:d"])
+
+    def test_reverse_order_and_pagination(self):
+        total, page = self.index.query(
+            sort="citations", descending=False, offset=1, limit=2
+        )
+
+        self.assertEqual(total, 4)
+        self.assertEqual(self.ids(page), ["id1:c", "id1:d"])
+
+    def test_reversed_orders_keep_title_ties_and_undated_last(self):
+        _, by_year = self.index.query(sort="year", descending=False)
+        _, by_title = self.index.query(sort="title", descending=True)
+
+        self.assertEqual(self.ids(by_year), ["id1:a", "id1:b", "id1:c", "id1:d"])
+        self.assertEqual(self.ids(by_title), ["id1:d", "id1:a", "id1:c", "id1:b"])
+
+    def test_year_range_slices_year_order_in_both_directions(self):
+        total, newest = self.index.query(sort="year", year_from=2020, year_to=2023)
+        _, oldest = self.index.query(
+            sort="year", descending=False, year_from=2019, year_to=2021
+        )
+
+        self.assertEqual(total, 2)
+        self.assertEqual(self.ids(newest), ["id1:c", "id1:b"])
+        self.assertEqual(self.ids(oldest), ["id1:a", "id1:b"])
+
+    def test_year_range_skips_undated_publications(self):
+        total, page = self.index.query(sort="citations", year_from=2020)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(self.ids(page), ["id1:b", "id1:c"])
+
+    def test_title_prefix_is_case_insensitive(self):
+        total, page = self.index.query(sort="citations", title_prefix="alpha")
+
+        self.assertEqual(total, 2)
+        self.assertEqual(self.ids(page), ["id1:b", "id1:c"])
+
+    def test_unknown_sort_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.index.query(sort="doi")
+
+
+class PublicationsEndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-publications-")
+        self.running = RunningServer(build_settings(self.state_dir))
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_publications_endpoint_paginates_from_index(self):
+        promote_payload(self.state_dir, citation_payload(PUBLICATIONS))
+
+        status, payload = self.running.request_json(
+            "/publications?sort=year&limit=2&year_from=2019"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["total"], 3)
+        self.assertEqual(payload["order"], "desc")
+        self.assertEqual(
+            [item["badge_id"] for item in payload["publications"]],
+            ["id1_c", "id1_b"],
+        )
+
+    def test_publications_endpoint_validates_query(self):
+        promote_payload(self.state_dir, citation_payload(PUBLICATIONS))
+
+        for query in ("sort=doi", "limit=1000", "offset=-1", "year_from=abc"):
+            with self.subTest(query=query):
+                status, payload = self.running.request_json(f"/publications?{query}")
+                self.assertEqual(status, 400)
+                self.assertEqual(payload["error"], "invalid_query")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+import unittest
+
+from service.ratelimit import AdmissionController, InFlightLimiter, TokenBucketLimiter
+
+from service_helpers import RunningServer, build_settings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketLimiterTest(unittest.TestCase):
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(2.0, 2, clock=clock)
+
+        self.assertEqual(limiter.acquire("a"), 0.0)
+        self.assertEqual(limiter.acquire("a"), 0.0)
+        self.assertAlmostEqual(limiter.acquire("a"), 0.5)
+        self.assertEqual(limiter.acquire("b"), 0.0)
+
+        clock.now += 0.5
+        self.assertEqual(limiter.acquire("a"), 0.0)
+
+    def test_tracked_clients_are_bounded(self):
+        limiter = TokenBucketLimiter(1.0, 1, max_clients=3, clock=FakeClock())
+        for client in ("a", "b", "c", "d", "e"):
+            limiter.acquire(client)
+
+        self.assertEqual(limiter.tracked_clients(), 3)
+
+    def test_zero_rate_disables_limiting(self):
+        limiter = TokenBucketLimiter(0, 1, clock=FakeClock())
+
+        self.assertTrue(all(limiter.acquire("a") == 0.0 for _ in range(100)))
+
+
+class AdmissionControllerTest(unittest.TestCase):
+    def test_inflight_cap_rejects_until_release(self):
+        controller = AdmissionController(rate_per_second=0, burst=1, max_inflight=1)
+
+        self.assertIsNone(controller.try_admit("a"))
+        rejection = controller.try_admit("b")
+        self.assertEqual((rejection.status, rejection.reason), (503, "overloaded"))
+
+        controller.release()
+        self.assertIsNone(controller.try_admit("b"))
+
+    def test_disabled_inflight_cap_always_admits(self):
+        limiter = InFlightLimiter(0)
+
+        self.assertTrue(all(limiter.try_acquire() for _ in range(10)))
+
+
+class DefaultSettingsServerTest(unittest.TestCase):
+    def test_rate_limiting_is_off_by_default(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-ratelimit-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        running = RunningServer(build_settings(state_dir, rate_limit_burst=2))
+        self.addCleanup(running.close)
+
+        statuses = {running.request("/all.svg")[0] for _ in range(10)}
+
+        self.assertEqual(statuses, {404})
+
+
+class RateLimitedServerTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-ratelimit-")
+        self.running = RunningServer(
+            build_settings(
+                self.state_dir, rate_limit_per_second=0.01, rate_limit_burst=2
+            )
+        )
+
+    def tearDown(self):
+        self.running.close()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_client_over_budget_gets_429_and_metrics_stay_reachable(self):
+        statuses = [self.running.request("/all.svg")[0] for _ in range(3)]
+        status, headers, _ = self.running.request("/all.svg")
+
+        self.assertEqual(statuses, [404, 404, 429])
+        self.assertEqual(status, 429)
+        self.assertGreaterEqual(int(headers["Retry-After"]), 1)
+
+        status, _, body = self.running.request("/metrics")
+        self.assertEqual(status, 200)
+        self.assertIn(
+            'citation_badge_http_rejections_total{reason="rate_limited"}',
+            body.decode("utf-8"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from service.promote import (
+    collect_releases,
+    current_release_path,
+    list_releases,
+    rollback_release,
+)
+from service.releases import main as releases_main
+
+from service_helpers import (
+    RunningServer,
+    build_settings,
+    citation_payload,
+    promote_payload,
+    publication,
+)
+
+
+FAKE_WORKER_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "fake_worker.py"
+
+
+def _promote(state_dir, citations):
+    return promote_payload(
+        state_dir,
+        citation_payload([publication("id1:abc", citations)], total_citations=citations),
+    )
+
+
+class ReleaseRetentionTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-releases-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def test_promotion_keeps_previous_releases_until_collected(self):
+        releases = [_promote(self.state_dir, value) for value in (1, 2, 3, 4)]
+        os.makedirs(os.path.join(self.state_dir, "releases", ".run.partial.tmp"))
+
+        self.assertEqual(list_releases(self.state_dir), releases[::-1])
+        deleted = collect_releases(self.state_dir, 2)
+
+        self.assertEqual(sorted(deleted), sorted(releases[:2]))
+        self.assertEqual(list_releases(self.state_dir), releases[:1:-1])
+        self.assertTrue(
+            os.path.isdir(os.path.join(self.state_dir, "releases", ".run.partial.tmp"))
+        )
+
+    def test_current_release_is_never_collected(self):
+        older = _promote(self.state_dir, 1)
+        _promote(self.state_dir, 2)
+        rollback_release(self.state_dir, os.path.basename(older))
+        os.utime(older, (0, 0))
+
+        collect_releases(self.state_dir, 1)
+
+        self.assertEqual(current_release_path(self.state_dir), os.path.realpath(older))
+        self.assertEqual(len(list_releases(self.state_dir)), 2)
+
+    def test_rollback_defaults_to_the_previous_release(self):
+        first = _promote(self.state_dir, 1)
+        second = _promote(self.state_dir, 2)
+
+        self.assertEqual(rollback_release(self.state_dir), first)
+        self.assertEqual(current_release_path(self.state_dir), os.path.realpath(first))
+        self.assertEqual(rollback_release(self.state_dir), second)
+
+    def test_rollback_rejects_unknown_and_incomplete_releases(self):
+        _promote(self.state_dir, 1)
+        broken = os.path.join(self.state_dir, "releases", "broken")
+        os.makedirs(os.path.join(broken, "dist"))
+
+        for release in (None, "missing", "..", "../releases", "broken"):
+            with self.subTest(release=release):
+                with self.assertRaises(ValueError):
+                    rollback_release(self.state_dir, release)
+
+    def test_cli_lists_and_rolls_back(self):
+        first = _promote(self.state_dir, 1)
+        second = _promote(self.state_dir, 2)
+
+        output = io.StringIO()
+        with mock.patch.dict(os.environ, {"STATE_DIR": self.state_dir}):
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(releases_main(["rollback"]), 0)
+                self.assertEqual(releases_main(["list"]), 0)
+
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [
+                os.path.basename(first),
+                f"* {os.path.basename(first)}",
+                f"  {os.path.basename(second)}",
+            ],
+        )
+
+
+class AdminRollbackTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-admin-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def serve(self, **overrides):
+        running = RunningServer(build_settings(self.state_dir, **overrides))
+        self.addCleanup(running.close)
+        return running
+
+    def test_admin_endpoint_is_absent_without_a_token(self):
+        running = self.serve()
+
+        self.assertEqual(running.request("/admin/rollback", method="POST")[0], 404)
+        self.assertEqual(running.request("/status", method="POST")[0], 405)
+
+    def test_rollback_requires_the_token_and_switches_release(self):
+        first = _promote(self.state_dir, 1)
+        second = _promote(self.state_dir, 2)
+        running = self.serve(admin_token="secret")
+        self.assertEqual(running.request("/id1_abc.svg")[2], b"<svg>2</svg>")
+
+        status, headers, _ = running.request(
+            "/admin/rollback",
+            method="POST",
+            headers={"Authorization": "Bearer wrong"},
+        )
+        self.assertEqual((status, headers.get("WWW-Authenticate")), (401, "Bearer"))
+        self.assertEqual(running.request("/admin/rollback")[0], 405)
+
+        status, payload = running.request_json(
+            "/admin/rollback",
+            method="POST",
+            headers={"Authorization": "Bearer secret"},
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            payload,
+            {"release": os.path.basename(first), "previous": os.path.basename(second)},
+        )
+        self.assertEqual(running.request("/id1_abc.svg")[2], b"<svg>1</svg>")
+        _, status_payload = running.request_json("/status")
+        self.assertEqual(status_payload["storage"]["current_release"], os.path.realpath(first))
+
+        status, payload = running.request_json(
+            "/admin/rollback?release=missing",
+            method="POST",
+            headers={"Authorization": "Bearer secret"},
+        )
+        self.assertEqual((status, payload["error"]), (409, "rollback_failed"))
+
+    def test_refresh_collects_releases_beyond_retention(self):
+        settings = build_settings(self.state_dir, release_retention=1, scholar="gc")
+        running = RunningServer(
+            settings,
+            worker_python_executable=sys.executable,
+            worker_script_path=str(FAKE_WORKER_PATH),
+        )
+        self.addCleanup(running.close)
+
+        running.server.runtime.refresh("manual")
+        running.server.runtime.refresh("manual")
+
+        deadline = time.monotonic() + 5
+        while len(list_releases(self.state_dir)) > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(
+            [os.path.realpath(path) for path in list_releases(self.state_dir)],
+            [current_release_path(self.state_dir)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from service.startup import StartupProfile
+
+from service_helpers import RunningServer, build_settings
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def imported_modules(code):
+    completed = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return set(completed.stdout.split())
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_server_import_does_not_load_apscheduler(self):
+        modules = imported_modules("import service.server")
+
+        self.assertIn("service.server", modules)
+        self.assertNotIn("apscheduler", modules)
+        self.assertNotIn("service.scheduler", modules)
+
+    def test_server_import_does_not_load_sqlite3(self):
+        modules = imported_modules("import service.server")
+
+        self.assertNotIn("sqlite3", modules)
+        self.assertNotIn("service.statedb", modules)
+
+    def test_cli_help_does_not_load_scholarly_or_requests(self):
+        modules = imported_modules(
+            "import runpy, sys\n"
+            "sys.argv = ['main.py', '--help']\n"
+            "try:\n"
+            "    runpy.run_path('main.py', run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass"
+        )
+
+        self.assertNotIn("scholarly", modules)
+        self.assertNotIn("requests", modules)
+
+
+class StartupProfileTest(unittest.TestCase):
+    def test_marks_are_relative_to_origin_and_first_byte_is_recorded_once(self):
+        profile = StartupProfile(origin=time.perf_counter() - 1.0)
+        profile.mark("imports")
+        with self.assertLogs("citation_badge.service", level="INFO") as logs:
+            profile.record_first_response()
+            profile.record_first_response()
+
+        marks = profile.marks()
+        self.assertGreaterEqual(marks["imports"], 1000)
+        self.assertGreaterEqual(marks["first_byte"], marks["imports"])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("first_byte_ms=", logs.output[0])
+
+    def test_server_records_startup_milestones(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-startup-")
+        running = RunningServer(build_settings(state_dir, startup_profile=True))
+        try:
+            status, _, _ = running.request("/status")
+            deadline = time.monotonic() + 5
+            profile = running.server.startup_profile
+            while "first_byte" not in profile.marks() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            running.close()
+            shutil.rmtree(state_dir, ignore_errors=True)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            list(profile.marks()), ["imports", "server_init", "first_byte"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
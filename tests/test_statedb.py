@@ -0,0 +1,117 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from service.statedb import StateDatabase, state_db_path
+from service.storage import safe_load_status, save_status
+
+from service_helpers import RunningServer, build_settings
+
+
+FAKE_WORKER_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "fake_worker.py"
+
+
+class StateDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-statedb-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.database = StateDatabase(state_db_path(self.state_dir))
+        self.addCleanup(self.database.close)
+
+    def test_status_round_trip_bumps_revision(self):
+        self.assertIsNone(self.database.load_status())
+
+        self.assertEqual(self.database.save_status({"service": {"status": "idle"}}), 1)
+        self.assertEqual(self.database.save_status({"service": {"status": "ready"}}), 2)
+
+        self.assertEqual(self.database.load_status(), {"service": {"status": "ready"}})
+        mode = self.database.connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_readers_are_not_blocked_by_an_open_write_transaction(self):
+        self.database.save_status({"service": {"status": "idle"}})
+        writer = sqlite3.connect(self.database.path, isolation_level=None)
+        self.addCleanup(writer.close)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("UPDATE status SET payload = '{}' WHERE id = 1")
+
+        results = []
+        reader = threading.Thread(target=lambda: results.append(self.database.load_status()))
+        started = time.monotonic()
+        reader.start()
+        reader.join(2)
+        writer.execute("ROLLBACK")
+
+        self.assertEqual(results, [{"service": {"status": "idle"}}])
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_runs_and_releases_are_recorded(self):
+        run_id = self.database.start_run("manual", "2026-01-01T00:00:00+00:00")
+        self.database.finish_run(
+            run_id,
+            finished_at="2026-01-01T00:00:05+00:00",
+            duration_seconds=5.0,
+            outcome="failed",
+            exit_code="timeout",
+            error="worker timed out",
+        )
+        self.database.record_release("/data/releases/a", "2026-01-01T00:00:00+00:00")
+        self.database.record_release("/data/releases/b", "2026-01-02T00:00:00+00:00")
+
+        [run] = self.database.recent_runs()
+        self.assertEqual(
+            (run["trigger"], run["outcome"], run["exit_code"], run["error"]),
+            ("manual", "failed", "timeout", "worker timed out"),
+        )
+        releases = {item["run_id"]: item["retired_at"] for item in self.database.releases()}
+        self.assertEqual(releases, {"a": "2026-01-02T00:00:00+00:00", "b": None})
+
+
+class SQLiteBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-sqlite-backend-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.settings = build_settings(self.state_dir, state_backend="sqlite")
+
+    def test_status_api_uses_the_database(self):
+        status_file = os.path.join(self.state_dir, "status.json")
+        payload = safe_load_status(status_file, settings=self.settings)
+        payload["service"]["status"] = "ready"
+        save_status(status_file, payload, settings=self.settings)
+
+        self.assertFalse(os.path.exists(status_file))
+        self.assertEqual(
+            safe_load_status(status_file, settings=self.settings)["service"]["status"],
+            "ready",
+        )
+
+    def test_refresh_records_run_history_and_release(self):
+        self.settings.scholar = "sqlite"
+        running = RunningServer(
+            self.settings,
+            worker_python_executable=sys.executable,
+            worker_script_path=str(FAKE_WORKER_PATH),
+        )
+        self.addCleanup(running.close)
+
+        running.server.runtime.refresh("manual")
+
+        database = running.server.runtime.state_db
+        [run] = database.recent_runs()
+        self.assertEqual((run["outcome"], run["exit_code"]), ("succeeded", "0"))
+        [release] = database.releases()
+        self.assertEqual(release["run_id"], run["release"])
+        self.assertIsNone(release["retired_at"])
+        status, payload = running.request_json("/status")
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["service"]["status"], "ready")
+
+
+if __name__ == "__main__":
+    unittest.main()
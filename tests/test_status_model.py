@@ -0,0 +1,79 @@
+import unittest
+
+from service.state import (
+    STATUS_SCHEMA_VERSION,
+    SourceState,
+    StatusModel,
+    copy_status,
+    empty_status,
+    normalize_status,
+)
+
+from service_helpers import build_settings
+
+
+class StatusModelTest(unittest.TestCase):
+    def setUp(self):
+        self.settings = build_settings("/data")
+
+    def test_unversioned_payload_is_migrated_and_filled_from_defaults(self):
+        payload = normalize_status(
+            {"service": {"status": "ready"}, "storage": {"state_dir": "/elsewhere"}},
+            self.settings,
+            state_dir="/data",
+        )
+
+        self.assertEqual(payload["schema_version"], STATUS_SCHEMA_VERSION)
+        self.assertEqual(payload["service"]["status"], "ready")
+        self.assertEqual(payload["service"]["mode"], "self_hosted")
+        self.assertEqual(payload["storage"]["state_dir"], "/data")
+        self.assertEqual(
+            payload["sources"]["google_scholar"],
+            empty_status(self.settings)["sources"]["google_scholar"],
+        )
+
+    def test_unknown_keys_and_malformed_sections_are_handled_like_before(self):
+        status = {
+            "service": "not a section",
+            "sources": {
+                "google_scholar": {"status": "success", "note": {"kept": [1]}},
+                "web_of_science": 5,
+                "custom": {"a": 1},
+            },
+            "extra": {"nested": True},
+        }
+
+        payload = normalize_status(status, self.settings, state_dir="/data")
+
+        self.assertEqual(payload["service"], empty_status(self.settings)["service"])
+        self.assertEqual(payload["sources"]["google_scholar"]["note"], {"kept": [1]})
+        self.assertEqual(payload["sources"]["web_of_science"]["status"], "disabled")
+        self.assertEqual(payload["sources"]["custom"], {"a": 1})
+        self.assertEqual(payload["extra"], {"nested": True})
+        self.assertIsNot(
+            payload["sources"]["google_scholar"]["note"],
+            status["sources"]["google_scholar"]["note"],
+        )
+
+    def test_newer_schema_versions_are_kept(self):
+        payload = normalize_status({"schema_version": STATUS_SCHEMA_VERSION + 1})
+
+        self.assertEqual(payload["schema_version"], STATUS_SCHEMA_VERSION + 1)
+
+    def test_model_uses_slots_and_round_trips(self):
+        model = StatusModel.parse(empty_status(self.settings), self.settings)
+
+        self.assertFalse(hasattr(model, "__dict__"))
+        self.assertFalse(hasattr(SourceState(), "__dict__"))
+        self.assertEqual(model.to_dict(), empty_status(self.settings))
+
+    def test_copy_status_is_deep(self):
+        payload = {"a": [{"b": 1}], "c": "d"}
+        copied = copy_status(payload)
+
+        copied["a"][0]["b"] = 2
+        self.assertEqual(payload, {"a": [{"b": 1}], "c": "d"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from service.storage import StatusStore, load_json_file, save_status
+
+from service_helpers import RunningServer, build_settings
+
+
+class StatusStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-status-store-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.status_path = os.path.join(self.state_dir, "status.json")
+        self.settings = build_settings(self.state_dir)
+
+    def store(self, flush_delay):
+        store = StatusStore(
+            self.status_path, settings=self.settings, flush_delay=flush_delay
+        )
+        self.addCleanup(store.close)
+        return store
+
+    def test_burst_of_updates_is_written_once(self):
+        store = self.store(0.05)
+        for status in ("running", "stopping", "ready"):
+            store.update(
+                lambda payload, status=status: payload["service"].update(status=status)
+            )
+
+        self.assertEqual(store.snapshot()["service"]["status"], "ready")
+        deadline = time.monotonic() + 5
+        while store.writes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(store.writes, 1)
+        self.assertEqual(load_json_file(self.status_path)["service"]["status"], "ready")
+
+    def test_close_flushes_pending_updates(self):
+        store = self.store(60)
+        store.update(lambda payload: payload["schedule"].update(running=True))
+        self.assertFalse(os.path.exists(self.status_path))
+
+        store.close()
+
+        self.assertEqual(store.writes, 1)
+        self.assertTrue(load_json_file(self.status_path)["schedule"]["running"])
+
+    def test_concurrent_updates_to_different_sections_are_kept(self):
+        store = self.store(0)
+
+        def _update(section, key, count):
+            for value in range(count):
+                store.update(lambda payload: payload[section].update({key: value}))
+
+        threads = [
+            threading.Thread(target=_update, args=("schedule", "next_run_at", 20)),
+            threading.Thread(target=_update, args=("service", "status", 20)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        persisted = load_json_file(self.status_path)
+        self.assertEqual(persisted["schedule"]["next_run_at"], 19)
+        self.assertEqual(persisted["service"]["status"], 19)
+
+    def test_file_written_elsewhere_is_reloaded_when_nothing_is_pending(self):
+        store = self.store(0)
+        store.update(lambda payload: payload["service"].update(status="idle"))
+        payload = store.snapshot()
+        payload["service"]["status"] = "ready"
+        save_status(self.status_path, payload, settings=self.settings)
+
+        self.assertEqual(store.snapshot()["service"]["status"], "ready")
+
+
+class StatusStoreServerTest(unittest.TestCase):
+    def test_server_close_persists_debounced_status(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-status-server-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        running = RunningServer(
+            build_settings(state_dir, status_flush_delay_seconds=60)
+        )
+        running.server.runtime.shutdown_worker()
+        _, payload = running.request_json("/status")
+        self.assertEqual(payload["service"]["status"], "stopping")
+
+        running.close()
+
+        persisted = load_json_file(running.server.state_layout.status_file)
+        self.assertEqual(persisted["service"]["status"], "stopping")
+
+
+if __name__ == "__main__":
+    unittest.main()
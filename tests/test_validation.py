@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from service.promote import promote_release
+from service.validation import MAX_REPORTED_ISSUES, VALIDATION_FILENAME, validate_dist
+
+from service_helpers import citation_payload, publication, write_staged_run
+
+
+class ValidateDistTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-validation-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def stage(self, payload=None, **kwargs):
+        payload = payload or citation_payload(
+            [publication("id1:abc", 4), publication("id1:def", 5)]
+        )
+        return write_staged_run(self.state_dir, payload, **kwargs)
+
+    def write(self, staged_run_dir, name, content):
+        with open(os.path.join(staged_run_dir, "dist", name), "w") as handle:
+            handle.write(content)
+
+    def errors(self, staged_run_dir):
+        report = validate_dist(os.path.join(staged_run_dir, "dist"))
+        return {item["path"]: item["error"] for item in report.errors}
+
+    def test_valid_release_stores_its_report(self):
+        staged_run_dir = self.stage()
+
+        release_dir = promote_release(self.state_dir, staged_run_dir)
+
+        with open(os.path.join(release_dir, VALIDATION_FILENAME)) as handle:
+            report = json.load(handle)
+        self.assertTrue(report["valid"])
+        self.assertEqual(report["checked_files"], 4)
+        self.assertEqual(report["errors"], [])
+
+    def test_broken_badges_are_reported(self):
+        staged_run_dir = self.stage()
+        self.write(staged_run_dir, "id1_abc.svg", "")
+        os.unlink(os.path.join(staged_run_dir, "dist", "id1_def.svg"))
+        self.write(staged_run_dir, "all.svg", "<html>rate limited</html>")
+        self.write(staged_run_dir, "review.svg", "<svg><text>cut off")
+
+        errors = self.errors(staged_run_dir)
+
+        self.assertEqual(errors["id1_abc.svg"], "file is empty")
+        self.assertEqual(errors["id1_def.svg"], "badge listed in citation.json is missing")
+        self.assertIn("not <svg>", errors["all.svg"])
+        self.assertIn("not well-formed", errors["review.svg"])
+
+    def test_schema_errors_are_reported(self):
+        payload = citation_payload([publication("id1:abc", 4)])
+        staged_run_dir = self.stage(payload)
+        payload["google_scholar"]["total_citations"] = "10"
+        payload["google_scholar"]["publications"].append({"citations": 1})
+        payload["google_scholar"]["publications"][0]["citations"] = None
+        self.write(staged_run_dir, "citation.json", json.dumps(payload))
+
+        report = validate_dist(os.path.join(staged_run_dir, "dist"))
+
+        self.assertEqual(
+            sorted(item["error"] for item in report.errors),
+            [
+                "google_scholar.publications[0].citations must be a non-negative integer",
+                "google_scholar.publications[1].author_pub_id must be a non-empty string",
+                "google_scholar.total_citations must be a non-negative integer",
+            ],
+        )
+
+    def test_failed_scholar_refresh_is_only_a_warning(self):
+        payload = citation_payload([publication("id1:abc", 4)])
+        payload["google_scholar"]["status"] = "failed"
+        staged_run_dir = self.stage(payload)
+        os.unlink(os.path.join(staged_run_dir, "dist", "id1_abc.svg"))
+
+        report = validate_dist(os.path.join(staged_run_dir, "dist"))
+
+        self.assertTrue(report.valid)
+        self.assertEqual(report.warning_count, 1)
+
+    def test_profile_directories_are_checked(self):
+        profile = citation_payload([publication("id2:xyz", 7)])
+        staged_run_dir = self.stage(profiles={"id2": profile})
+        os.unlink(os.path.join(staged_run_dir, "dist", "id2", "id2_xyz.svg"))
+
+        self.assertEqual(
+            self.errors(staged_run_dir),
+            {"id2/id2_xyz.svg": "badge listed in citation.json is missing"},
+        )
+
+    def test_invalid_release_is_not_promoted(self):
+        staged_run_dir = self.stage()
+        self.write(staged_run_dir, "id1_abc.svg", "")
+
+        with self.assertRaisesRegex(ValueError, "id1_abc.svg: file is empty"):
+            promote_release(self.state_dir, staged_run_dir)
+
+        self.assertTrue(os.path.isdir(os.path.join(staged_run_dir, "dist")))
+        self.assertEqual(os.listdir(os.path.join(self.state_dir, "releases")), [])
+
+    def test_reported_issues_are_capped_but_counted(self):
+        items = [publication(f"id1:p{index}", index) for index in range(150)]
+        staged_run_dir = self.stage(citation_payload(items))
+        for index in range(150):
+            self.write(staged_run_dir, f"id1_p{index}.svg", "")
+
+        report = validate_dist(os.path.join(staged_run_dir, "dist"), max_workers=4)
+
+        self.assertEqual(report.error_count, 150)
+        self.assertEqual(len(report.errors), MAX_REPORTED_ISSUES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from service.config import WORKER_MODE_IN_PROCESS
+from service.worker import (
+    WorkerShutdownError,
+    load_worker_module,
+    run_worker_in_process,
+)
+
+from service_helpers import RunningServer, build_settings
+
+
+MAIN_PATH = str(Path(__file__).resolve().parents[1] / "main.py")
+
+
+class FakeMaxTriesExceededException(Exception):
+    pass
+
+
+def _author(scholar_id, citations):
+    return {
+        "citedby": citations,
+        "citedby5y": citations,
+        "hindex": 1,
+        "hindex5y": 1,
+        "i10index": 0,
+        "i10index5y": 0,
+        "cites_per_year": {},
+        "publications": [
+            {
+                "author_pub_id": f"{scholar_id}:paper",
+                "num_citations": citations,
+                "bib": {"title": "Paper", "pub_year": "2026"},
+            }
+        ],
+    }
+
+
+class InProcessWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="citation-badge-in-process-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.authors = {"id1": _author("id1", 12)}
+        self.install_fake_dependencies()
+
+    def install_fake_dependencies(self):
+        authors = self.authors
+        self.badge_timeouts = badge_timeouts = []
+        self.stall_badges = False
+
+        class FakeScholarly:
+            def fill(self, author_seed):
+                result = authors[author_seed["scholar_id"]]
+                return result() if callable(result) else result
+
+        def fake_get(url, timeout):
+            badge_timeouts.append(timeout)
+            if self.stall_badges:
+                # What requests does when shields.io stops answering.
+                time.sleep(timeout)
+                raise TimeoutError("read timed out")
+            return types.SimpleNamespace(
+                content=b'<svg xmlns="http://www.w3.org/2000/svg"/>'
+            )
+
+        fake_requests = types.SimpleNamespace(get=fake_get)
+        patcher = mock.patch.dict(
+            sys.modules,
+            {
+                "requests": fake_requests,
+                "scholarly": types.SimpleNamespace(scholarly=FakeScholarly()),
+                "scholarly._proxy_generator": types.SimpleNamespace(
+                    MaxTriesExceededException=FakeMaxTriesExceededException
+                ),
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_worker(self, **kwargs):
+        kwargs.setdefault("timeout_seconds", 30)
+        return run_worker_in_process(
+            scholar="id1",
+            script_path=MAIN_PATH,
+            working_directory=self.work_dir,
+            **kwargs,
+        )
+
+    def test_refresh_writes_dist_and_captures_its_output(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            completed = self.run_worker()
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertIn("Google Scholar profile filled", completed.stdout)
+        self.assertEqual(stdout.getvalue(), "")
+        dist = Path(self.work_dir) / "dist"
+        self.assertTrue((dist / "citation.json").is_file())
+        self.assertTrue((dist / "id1_paper.svg").is_file())
+        self.assertFalse((Path(self.work_dir) / "citation_updated.flag").exists())
+
+    def test_usage_is_reported_for_the_refresh(self):
+        usages = []
+
+        completed = self.run_worker(usage_callback=usages.append)
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        [usage] = usages
+        self.assertGreater(usage.cpu_seconds, 0)
+        self.assertGreater(usage.max_rss_bytes, 0)
+
+    def test_worker_module_is_loaded_once(self):
+        self.assertIs(load_worker_module(MAIN_PATH), load_worker_module(MAIN_PATH))
+
+    def test_shutdown_terminates_the_running_profile(self):
+        self.authors["id1"] = lambda: time.sleep(30)
+        stop_event = threading.Event()
+        threading.Timer(0.3, stop_event.set).start()
+
+        started = time.monotonic()
+        with self.assertRaises(WorkerShutdownError):
+            self.run_worker(stop_event=stop_event)
+
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_refresh_timeout_raises_timeout_expired(self):
+        self.authors["id1"] = lambda: time.sleep(30)
+
+        started = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.run_worker(timeout_seconds=1)
+
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_stalled_badge_request_stops_at_the_refresh_timeout(self):
+        self.stall_badges = True
+
+        started = time.monotonic()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.run_worker(timeout_seconds=1)
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(self.badge_timeouts)
+        self.assertLessEqual(max(self.badge_timeouts), 1)
+
+    def test_service_refresh_promotes_in_process_output(self):
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-in-process-state-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        running = RunningServer(
+            build_settings(state_dir, scholar="id1", worker_mode=WORKER_MODE_IN_PROCESS),
+            worker_script_path=MAIN_PATH,
+        )
+        self.addCleanup(running.close)
+
+        running.server.runtime.refresh("manual")
+
+        status, _, body = running.request("/id1_paper.svg")
+        self.assertEqual((status, body), (200, b'<svg xmlns="http://www.w3.org/2000/svg"/>'))
+        status, payload = running.request_json("/status")
+        self.assertEqual(payload["service"]["status"], "ready")
+        self.assertFalse(
+            [name for name in os.listdir(state_dir) if name.startswith(".staged-")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
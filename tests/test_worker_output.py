@@ -0,0 +1,105 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from service.worker import (
+    MAX_OUTPUT_LINE_CHARS,
+    TRUNCATED_LINE_MARKER,
+    OutputTail,
+    run_worker_subprocess,
+)
+
+
+class OutputTailTest(unittest.TestCase):
+    def test_lines_are_split_across_writes_and_only_the_tail_is_kept(self):
+        forwarded = []
+        tail = OutputTail(
+            "stdout",
+            max_lines=2,
+            line_callback=lambda stream, line: forwarded.append((stream, line)),
+        )
+
+        tail.write("one\ntw")
+        tail.write("o\r\nthree\nfo")
+        tail.close()
+
+        self.assertEqual(
+            forwarded,
+            [("stdout", "one"), ("stdout", "two"), ("stdout", "three"), ("stdout", "fo")],
+        )
+        self.assertEqual(tail.text(), "three\nfo\n")
+        self.assertEqual(tail.lines_seen, 4)
+
+    def test_long_lines_are_cut_and_their_rest_dropped(self):
+        tail = OutputTail("stderr")
+
+        tail.write("x" * (MAX_OUTPUT_LINE_CHARS + 10))
+        tail.write("y" * MAX_OUTPUT_LINE_CHARS + "\nnext\n")
+
+        self.assertEqual(
+            tail.text().splitlines(),
+            ["x" * MAX_OUTPUT_LINE_CHARS + TRUNCATED_LINE_MARKER, "next"],
+        )
+
+
+class StreamingSubprocessTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="citation-badge-worker-output-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.forwarded = []
+
+    def run_script(self, script, **kwargs):
+        kwargs.setdefault("timeout_seconds", 30)
+        return run_worker_subprocess(
+            [sys.executable, "-c", script],
+            working_directory=self.work_dir,
+            line_callback=lambda stream, line: self.forwarded.append(
+                (time.monotonic(), stream, line)
+            ),
+            **kwargs,
+        )
+
+    def test_lines_are_forwarded_while_the_worker_runs(self):
+        started = time.monotonic()
+        completed = self.run_script(
+            "import sys, time\n"
+            "print('first', flush=True)\n"
+            "time.sleep(1)\n"
+            "print('oops', file=sys.stderr)\n"
+        )
+        finished = time.monotonic()
+
+        self.assertEqual(completed.returncode, 0)
+        self.assertEqual(
+            [(stream, line) for _, stream, line in self.forwarded],
+            [("stdout", "first"), ("stderr", "oops")],
+        )
+        self.assertLess(self.forwarded[0][0] - started, finished - self.forwarded[0][0])
+
+    def test_chatty_output_keeps_only_a_bounded_tail(self):
+        completed = self.run_script(
+            "for index in range(20000):\n    print('line', index)\n",
+            tail_lines=5,
+        )
+
+        self.assertEqual(len(self.forwarded), 20000)
+        self.assertEqual(
+            completed.stdout.splitlines(),
+            [f"line {index}" for index in range(19995, 20000)],
+        )
+
+    def test_timeout_carries_the_output_tail(self):
+        with self.assertRaises(subprocess.TimeoutExpired) as raised:
+            self.run_script(
+                "import time\nprint('working', flush=True)\ntime.sleep(30)\n",
+                timeout_seconds=1,
+            )
+
+        self.assertEqual(raised.exception.output, "working\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,322 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from service.config import WORKER_MODE_IN_PROCESS
+from service.progress import (
+    PROGRESS_FD_ENV,
+    STAGE_FETCHING,
+    STAGE_FINISHING,
+    STAGE_WRITING_BADGES,
+    RefreshProgress,
+    parse_progress_line,
+)
+from service.worker import build_worker_argv, run_worker_in_process, run_worker_subprocess
+
+from service_helpers import RunningServer, build_settings
+
+
+MAIN_PATH = str(Path(__file__).resolve().parents[1] / "main.py")
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg"/>'
+FAKE_SCHOLARLY = """
+class _Scholarly:
+    def fill(self, author_seed):
+        publications = [
+            {
+                "author_pub_id": author_seed["scholar_id"] + ":pub" + str(index),
+                "num_citations": index,
+                "bib": {"title": "Paper", "pub_year": "2026"},
+            }
+            for index in range(3)
+        ]
+        return {"citedby": 3, "publications": publications}
+
+
+scholarly = _Scholarly()
+"""
+FAKE_REQUESTS = f"""
+class _Response:
+    content = {SVG!r}
+
+
+def get(url, timeout):
+    return _Response()
+"""
+
+
+def _author(scholar_id, publications=1):
+    return {
+        "citedby": publications,
+        "publications": [
+            {
+                "author_pub_id": f"{scholar_id}:pub{index}",
+                "num_citations": index,
+                "bib": {"title": "Paper", "pub_year": "2026"},
+            }
+            for index in range(publications)
+        ],
+    }
+
+
+class RefreshProgressTest(unittest.TestCase):
+    def test_events_fold_into_the_status_block(self):
+        progress = RefreshProgress(started_at="2026-01-01T00:00:00+00:00")
+
+        progress.apply({"event": "refresh_started", "profiles": 2})
+        state = progress.apply(
+            {"event": "profile_started", "profile": "id1", "index": 1, "profiles": 2}
+        )
+        self.assertEqual((state["stage"], state["profile"]), (STAGE_FETCHING, "id1"))
+        state = progress.apply(
+            {"event": "profile_fetching", "profile": "id1", "fetch_seconds": 4.5}
+        )
+        self.assertEqual(state["timings"], {"id1": {"fetch_seconds": 4.5}})
+        progress.apply(
+            {
+                "event": "profile_fetched",
+                "profile": "id1",
+                "publications": 10,
+                "fetch_seconds": 6.0,
+            }
+        )
+        state = progress.apply(
+            {
+                "event": "badges",
+                "profile": "id1",
+                "publications_processed": 4,
+                "publications": 10,
+                "badges_written": 5,
+                "elapsed_seconds": 7.25,
+            }
+        )
+        self.assertEqual(state["stage"], STAGE_WRITING_BADGES)
+        self.assertEqual(
+            (state["publications_processed"], state["badges_written"]), (4, 5)
+        )
+        self.assertEqual(state["elapsed_seconds"], 7.25)
+        state = progress.apply(
+            {
+                "event": "profile_finished",
+                "profile": "id1",
+                "status": "success",
+                "fetch_seconds": 6.0,
+                "badges_seconds": 1.5,
+                "badges_written": 11,
+            }
+        )
+        self.assertEqual(state["profiles_done"], 1)
+        self.assertEqual(
+            state["timings"]["id1"],
+            {"fetch_seconds": 6.0, "status": "success", "badges_seconds": 1.5},
+        )
+        state = progress.apply({"event": "refresh_finished", "seconds": 9.0})
+
+        self.assertEqual(state["stage"], STAGE_FINISHING)
+        self.assertEqual(state["profiles_total"], 2)
+        self.assertEqual(state["started_at"], "2026-01-01T00:00:00+00:00")
+
+    def test_malformed_values_are_ignored(self):
+        progress = RefreshProgress()
+
+        state = progress.apply(
+            {"event": "profile_fetched", "profile": ["id1"], "publications": "many"}
+        )
+
+        self.assertIsNone(state["profile"])
+        self.assertIsNone(state["publications"])
+        self.assertEqual(state["timings"], {})
+        self.assertIsNone(parse_progress_line("not json"))
+        self.assertIsNone(parse_progress_line('["event"]'))
+        self.assertEqual(parse_progress_line('{"event": "badges"}'), {"event": "badges"})
+
+
+class ProgressChannelTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="citation-badge-progress-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.events = []
+
+    def test_subprocess_events_arrive_through_their_own_pipe(self):
+        completed = run_worker_subprocess(
+            [
+                sys.executable,
+                "-c",
+                "import os, sys\n"
+                f"stream = os.fdopen(int(os.environ[{PROGRESS_FD_ENV!r}]), 'w')\n"
+                "stream.write('garbage\\n')\n"
+                "stream.write('{\"event\": \"badges\", \"badges_written\": 3}\\n')\n"
+                "stream.close()\n"
+                "print('done')\n",
+            ],
+            working_directory=self.work_dir,
+            timeout_seconds=30,
+            line_callback=None,
+            progress_callback=self.events.append,
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout, "done\n")
+        self.assertEqual(self.events, [{"event": "badges", "badges_written": 3}])
+
+    def test_failing_callback_does_not_fail_the_worker(self):
+        def _fail(event):
+            raise RuntimeError("status store unavailable")
+
+        with self.assertLogs("citation_badge.service", "ERROR"):
+            completed = run_worker_subprocess(
+                [
+                    sys.executable,
+                    "-c",
+                    "import os\n"
+                    f"stream = os.fdopen(int(os.environ[{PROGRESS_FD_ENV!r}]), 'w')\n"
+                    "for _ in range(1000):\n"
+                    "    stream.write('{\"event\": \"badges\"}\\n')\n",
+                ],
+                working_directory=self.work_dir,
+                timeout_seconds=30,
+                line_callback=None,
+                progress_callback=_fail,
+            )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+    def test_main_reports_each_stage_from_a_subprocess(self):
+        deps_dir = tempfile.mkdtemp(prefix="citation-badge-progress-deps-")
+        self.addCleanup(shutil.rmtree, deps_dir, True)
+        os.makedirs(os.path.join(deps_dir, "scholarly"))
+        with open(os.path.join(deps_dir, "scholarly", "__init__.py"), "w") as handle:
+            handle.write(FAKE_SCHOLARLY)
+        with open(os.path.join(deps_dir, "requests.py"), "w") as handle:
+            handle.write(FAKE_REQUESTS)
+
+        completed = run_worker_subprocess(
+            build_worker_argv(
+                scholar="id1,id2",
+                python_executable=sys.executable,
+                script_path=MAIN_PATH,
+            ),
+            working_directory=self.work_dir,
+            timeout_seconds=60,
+            env={"PYTHONPATH": deps_dir},
+            line_callback=None,
+            progress_callback=self.events.append,
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(
+            [
+                (event["event"], event.get("profile"))
+                for event in self.events
+                # Fetch heartbeats depend on timing.
+                if event["event"] != "profile_fetching"
+            ],
+            [
+                ("refresh_started", None),
+                ("profile_started", "id1"),
+                ("profile_fetched", "id1"),
+                ("badges", "id1"),
+                ("profile_finished", "id1"),
+                ("profile_started", "id2"),
+                ("profile_fetched", "id2"),
+                ("badges", "id2"),
+                ("profile_finished", "id2"),
+                ("refresh_finished", None),
+            ],
+        )
+        [finished, _] = [
+            event for event in self.events if event["event"] == "profile_finished"
+        ]
+        self.assertEqual(finished["status"], "success")
+        self.assertEqual(finished["badges_written"], 4)
+        self.assertGreaterEqual(finished["badges_seconds"], 0)
+        self.assertGreaterEqual(finished["fetch_seconds"], 0)
+        self.assertEqual(self.events[-1]["updated"], True)
+
+
+class InProcessProgressTest(unittest.TestCase):
+    def setUp(self):
+        self.authors = {"id1": lambda: _author("id1", 2)}
+        authors = self.authors
+
+        class FakeScholarly:
+            def fill(self, author_seed):
+                return authors[author_seed["scholar_id"]]()
+
+        patcher = mock.patch.dict(
+            sys.modules,
+            {
+                "requests": types.SimpleNamespace(
+                    get=lambda url, timeout: types.SimpleNamespace(content=SVG)
+                ),
+                "scholarly": types.SimpleNamespace(scholarly=FakeScholarly()),
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_profile_reports_its_fetch_time(self):
+        work_dir = tempfile.mkdtemp(prefix="citation-badge-progress-")
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        events = []
+
+        def _fail():
+            raise ValueError("blocked")
+
+        self.authors["id1"] = _fail
+        completed = run_worker_in_process(
+            scholar="id1",
+            script_path=MAIN_PATH,
+            working_directory=work_dir,
+            timeout_seconds=30,
+            line_callback=None,
+            progress_callback=events.append,
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        [finished] = [event for event in events if event["event"] == "profile_finished"]
+        self.assertEqual(finished["status"], "failed")
+        self.assertIsNone(finished["badges_seconds"])
+        self.assertGreaterEqual(finished["fetch_seconds"], 0)
+
+    def test_status_shows_the_running_fetch(self):
+        self.authors["id1"] = lambda: time.sleep(2.5) or _author("id1", 2)
+        state_dir = tempfile.mkdtemp(prefix="citation-badge-progress-state-")
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        running = RunningServer(
+            build_settings(state_dir, scholar="id1", worker_mode=WORKER_MODE_IN_PROCESS),
+            worker_script_path=MAIN_PATH,
+        )
+        self.addCleanup(running.close)
+
+        refresh = threading.Thread(target=running.server.runtime.refresh, args=("manual",))
+        refresh.start()
+        self.addCleanup(refresh.join)
+        deadline = time.monotonic() + 10
+        progress = None
+        while time.monotonic() < deadline:
+            _, payload = running.request_json("/status")
+            progress = payload["service"]["progress"]
+            if progress and progress["timings"].get("id1", {}).get("fetch_seconds"):
+                break
+            time.sleep(0.1)
+
+        self.assertEqual(progress["stage"], STAGE_FETCHING)
+        self.assertEqual(progress["profile"], "id1")
+        self.assertEqual(progress["profiles_total"], 1)
+        self.assertGreater(progress["timings"]["id1"]["fetch_seconds"], 0)
+
+        refresh.join(30)
+        _, payload = running.request_json("/status")
+        self.assertEqual(payload["service"]["status"], "ready")
+        self.assertIsNone(payload["service"]["progress"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from service.statedb import StateDatabase, state_db_path
+from service.usage import (
+    BUDGET_CPU_SECONDS,
+    BUDGET_MAX_RSS_MB,
+    BUDGET_WALL_SECONDS,
+    ResourceUsage,
+    check_budgets,
+)
+from service.worker import run_worker_subprocess
+
+from service_helpers import RunningServer, build_settings
+
+
+FAKE_WORKER_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "fake_worker.py"
+BUSY_SCRIPT = (
+    "import sys, time\n"
+    "block = bytearray(64 * 1024 * 1024)\n"
+    "deadline = time.process_time() + 0.3\n"
+    "while time.process_time() < deadline:\n"
+    "    pass\n"
+    "sys.exit(3)\n"
+)
+
+
+def _usage(cpu_seconds=1.0, max_rss_mb=10):
+    return ResourceUsage(
+        user_cpu_seconds=cpu_seconds,
+        system_cpu_seconds=0.0,
+        max_rss_bytes=max_rss_mb * 1024 * 1024,
+        block_input_ops=0,
+        block_output_ops=0,
+        voluntary_context_switches=0,
+        involuntary_context_switches=0,
+    )
+
+
+class SubprocessUsageTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="citation-badge-usage-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.usages = []
+
+    def run_script(self, script, **kwargs):
+        kwargs.setdefault("timeout_seconds", 30)
+        return run_worker_subprocess(
+            [sys.executable, "-c", script],
+            working_directory=self.work_dir,
+            line_callback=None,
+            usage_callback=self.usages.append,
+            **kwargs,
+        )
+
+    def test_reaped_worker_reports_its_usage_and_exit_code(self):
+        completed = self.run_script(BUSY_SCRIPT)
+
+        self.assertEqual(completed.returncode, 3)
+        [usage] = self.usages
+        self.assertGreaterEqual(usage.cpu_seconds, 0.25)
+        self.assertGreaterEqual(usage.max_rss_bytes, 64 * 1024 * 1024)
+        self.assertGreater(
+            usage.voluntary_context_switches + usage.involuntary_context_switches, 0
+        )
+
+    def test_timed_out_worker_still_reports_usage(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.run_script("import time\ntime.sleep(30)\n", timeout_seconds=1)
+
+        [usage] = self.usages
+        self.assertLess(usage.cpu_seconds, 1)
+
+
+class BudgetTest(unittest.TestCase):
+    def test_only_enabled_budgets_that_are_exceeded_are_reported(self):
+        budgets = {BUDGET_WALL_SECONDS: 10, BUDGET_CPU_SECONDS: 0.5, BUDGET_MAX_RSS_MB: 0}
+
+        self.assertEqual(
+            check_budgets(budgets, usage=_usage(cpu_seconds=2.0), wall_seconds=5.0),
+            [{"budget": BUDGET_CPU_SECONDS, "limit": 0.5, "actual": 2.0}],
+        )
+        self.assertEqual(
+            check_budgets(budgets, usage=None, wall_seconds=12.5),
+            [{"budget": BUDGET_WALL_SECONDS, "limit": 10, "actual": 12.5}],
+        )
+
+
+class RunRecordTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="citation-badge-usage-state-")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def test_version_one_database_gains_the_resources_column(self):
+        path = state_db_path(self.state_dir)
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            """
+            CREATE TABLE refresh_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                trigger TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                duration_seconds REAL,
+                outcome TEXT,
+                exit_code TEXT,
+                error TEXT,
+                release TEXT
+            );
+            INSERT INTO refresh_runs (trigger, started_at) VALUES ('old', 'then');
+            PRAGMA user_version = 1;
+            """
+        )
+        connection.close()
+
+        database = StateDatabase(path)
+        self.addCleanup(database.close)
+        run_id = database.start_run("manual", "2026-01-01T00:00:00+00:00")
+        database.finish_run(
+            run_id,
+            finished_at="2026-01-01T00:00:05+00:00",
+            duration_seconds=5.0,
+            outcome="succeeded",
+            resources={"phases": {"total": 5.0}},
+        )
+
+        new_run, old_run = database.recent_runs()
+        self.assertEqual(new_run["resources"], {"phases": {"total": 5.0}})
+        self.assertIsNone(old_run["resources"])
+
+    def test_refresh_records_phases_usage_and_budget_warnings(self):
+        settings = build_settings(
+            self.state_dir,
+            scholar="usage",
+            state_backend="sqlite",
+            refresh_wall_budget_seconds=0.001,
+        )
+        running = RunningServer(
+            settings,
+            worker_python_executable=sys.executable,
+            worker_script_path=str(FAKE_WORKER_PATH),
+        )
+        self.addCleanup(running.close)
+
+        with self.assertLogs("citation_badge.service", "WARNING") as logs:
+            running.server.runtime.refresh("manual")
+
+        self.assertTrue(
+            any("refresh budget exceeded" in line for line in logs.output), logs.output
+        )
+        _, payload = running.request_json("/status")
+        last_refresh = payload["service"]["last_refresh"]
+        self.assertEqual(
+            (last_refresh["trigger"], last_refresh["outcome"]), ("manual", "succeeded")
+        )
+        self.assertTrue({"worker", "promote", "total"} <= set(last_refresh["phases"]))
+        self.assertGreater(last_refresh["usage"]["max_rss_bytes"], 0)
+        self.assertEqual(
+            [item["budget"] for item in last_refresh["budgets_exceeded"]],
+            [BUDGET_WALL_SECONDS],
+        )
+        [run] = running.server.runtime.state_db.recent_runs()
+        self.assertEqual(run["resources"], last_refresh)
+        self.assertEqual(
+            running.server.runtime.metrics.refresh_budget_exceeded.value(
+                BUDGET_WALL_SECONDS
+            ),
+            1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()